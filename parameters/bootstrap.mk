@@ -0,0 +1,8 @@
+# This file contains the parameters of the bootstrap estimation of the confidence intervals
+
+# Number of resamples of the stress-strain data drawn for each test
+export NB_RESAMPLES := 1000
+# The confidence intervals contain CONFIDENCE_LEVEL percents of the resampled estimates
+export CONFIDENCE_LEVEL := 95
+# Seed of the random generator, the intervals are identical for a same seed
+export BOOTSTRAP_SEED := 0
@@ -17,34 +17,134 @@ VALID_POSITION_DATA := $(wildcard $(TEST_DATA_FOLDER)/*/$(POSITION_FILE_NAME))
 # Path to the folders containing the data computed from the experimental data
 COMPUTED_DATA_FOLDER := computed_data
 
+# Format of the intermediate data files computed for each test, given as their
+# file extension. Can be csv, npz, feather or parquet, the last two requiring
+# the pyarrow package to be installed. The npz files are memory-mapped when
+# read, which keeps the memory usage low for long recordings
+DATA_FORMAT := npz
+
+# Number of samples read and written at once when smoothing the raw data and
+# computing the stress-strain data, which bounds the memory usage for very long
+# recordings. If left empty, the data files are processed entirely at once
+CHUNK_SIZE :=
+
+# Option passing the chunk size to the stages streaming the data, if any
+CHUNK_SIZE_OPTION := $(if $(CHUNK_SIZE),--chunk_size $(CHUNK_SIZE))
+
+# Whether the stages handling all the tests at once record the result of each
+# test along with a fingerprint of its inputs. If true, only the new or
+# modified tests are processed when these stages run again
+INCREMENTAL := true
+RECORDS_FOLDER := $(COMPUTED_DATA_FOLDER)/records
+
+# Option passing the record file to these stages, expanded in each recipe so
+# that every target gets its own record
+RECORD_OPTION = $(if $(filter true,$(INCREMENTAL)),--record $(abspath $(RECORDS_FOLDER)/$(notdir $(basename $@)).pkl))
+# The stage computing several files at once has a single record, as the name of
+# its target depends on which of its files is requested
+FEATURES_RECORD_OPTION := $(if $(filter true,$(INCREMENTAL)),--record $(abspath $(RECORDS_FOLDER)/features.pkl))
+
+# Names of the smoothed data files, in the format of the intermediate data
+SMOOTH_EFFORT_FILE_NAME := $(basename $(EFFORT_FILE_NAME)).$(DATA_FORMAT)
+SMOOTH_POSITION_FILE_NAME := $(basename $(POSITION_FILE_NAME)).$(DATA_FORMAT)
+
 # Paths to the smoothed data folder and files
 SMOOTH_DATA_FOLDER := $(COMPUTED_DATA_FOLDER)/smooth
-SMOOTH_EFFORT_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(SMOOTH_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(VALID_EFFORT_DATA))
-SMOOTH_POSITION_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(POSITION_FILE_NAME), $(SMOOTH_DATA_FOLDER)/%/$(POSITION_FILE_NAME), $(VALID_POSITION_DATA))
+SMOOTH_EFFORT_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(SMOOTH_DATA_FOLDER)/%/$(SMOOTH_EFFORT_FILE_NAME), $(VALID_EFFORT_DATA))
+SMOOTH_POSITION_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(POSITION_FILE_NAME), $(SMOOTH_DATA_FOLDER)/%/$(SMOOTH_POSITION_FILE_NAME), $(VALID_POSITION_DATA))
 
 # Paths to the stress-strain data folder and files
 STRESS_STRAIN_DATA_FOLDER := $(COMPUTED_DATA_FOLDER)/stress_strain
-STRESS_STRAIN_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(STRESS_STRAIN_DATA_FOLDER)/%.csv, $(VALID_EFFORT_DATA))
+STRESS_STRAIN_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(STRESS_STRAIN_DATA_FOLDER)/%.$(DATA_FORMAT), $(VALID_EFFORT_DATA))
 # Paths to the end-only trimmed stress-strain data folder and files
 END_TRIMMED_STRESS_STRAIN_DATA_FOLDER := $(COMPUTED_DATA_FOLDER)/end_trimmed_stress_strain
-END_TRIMMED_STRESS_STRAIN_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(END_TRIMMED_STRESS_STRAIN_DATA_FOLDER)/%.csv, $(VALID_EFFORT_DATA))
+END_TRIMMED_STRESS_STRAIN_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(END_TRIMMED_STRESS_STRAIN_DATA_FOLDER)/%.$(DATA_FORMAT), $(VALID_EFFORT_DATA))
 # Paths to the fully trimmed stress-strain data folder and files
 TRIMMED_STRESS_STRAIN_DATA_FOLDER := $(COMPUTED_DATA_FOLDER)/trimmed_stress_strain
-TRIMMED_STRESS_STRAIN_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(TRIMMED_STRESS_STRAIN_DATA_FOLDER)/%.csv, $(VALID_EFFORT_DATA))
+TRIMMED_STRESS_STRAIN_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(TRIMMED_STRESS_STRAIN_DATA_FOLDER)/%.$(DATA_FORMAT), $(VALID_EFFORT_DATA))
 # Paths to the trimmed stress-strain data folder and files to use for Yeoh interpolation
 TRIMMED_FIT_STRESS_STRAIN_DATA_FOLDER := $(COMPUTED_DATA_FOLDER)/trimmed_fit_stress_strain
-TRIMMED_FIT_STRESS_STRAIN_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(TRIMMED_FIT_STRESS_STRAIN_DATA_FOLDER)/%.csv, $(VALID_EFFORT_DATA))
+TRIMMED_FIT_STRESS_STRAIN_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(TRIMMED_FIT_STRESS_STRAIN_DATA_FOLDER)/%.$(DATA_FORMAT), $(VALID_EFFORT_DATA))
+
+# Mode of the trimming stages, either files or index. In the files mode, the
+# trimmed stress-strain data of each test is written to new data files. In the
+# index mode, only the range of samples to keep and the normalisation to apply
+# are recorded in small index files, and the trimming is applied on the fly to
+# the stress-strain data by the stages that read it
+TRIM_MODE := files
+
+# Paths to the trimming index files, only used in the index mode
+END_TRIM_INDEX_FILE := $(COMPUTED_DATA_FOLDER)/end_trim_index.csv
+TRIM_INDEX_FILE := $(COMPUTED_DATA_FOLDER)/trim_index.csv
+TRIM_FIT_INDEX_FILE := $(COMPUTED_DATA_FOLDER)/trim_fit_index.csv
+
+# Folders and files containing the data to read for each trimming stage, and
+# the index to apply to it if any
+ifeq ($(TRIM_MODE),index)
+	END_TRIMMED_SOURCE_FOLDER := $(STRESS_STRAIN_DATA_FOLDER)
+	END_TRIMMED_SOURCE_FILES := $(STRESS_STRAIN_FILES)
+	END_TRIMMED_INDEX := $(END_TRIM_INDEX_FILE)
+	TRIMMED_SOURCE_FOLDER := $(STRESS_STRAIN_DATA_FOLDER)
+	TRIMMED_SOURCE_FILES := $(STRESS_STRAIN_FILES)
+	TRIMMED_INDEX := $(TRIM_INDEX_FILE)
+	TRIMMED_FIT_SOURCE_FOLDER := $(STRESS_STRAIN_DATA_FOLDER)
+	TRIMMED_FIT_SOURCE_FILES := $(STRESS_STRAIN_FILES)
+	TRIMMED_FIT_INDEX := $(TRIM_FIT_INDEX_FILE)
+else
+	END_TRIMMED_SOURCE_FOLDER := $(END_TRIMMED_STRESS_STRAIN_DATA_FOLDER)
+	END_TRIMMED_SOURCE_FILES := $(END_TRIMMED_STRESS_STRAIN_FILES)
+	END_TRIMMED_INDEX :=
+	TRIMMED_SOURCE_FOLDER := $(TRIMMED_STRESS_STRAIN_DATA_FOLDER)
+	TRIMMED_SOURCE_FILES := $(TRIMMED_STRESS_STRAIN_FILES)
+	TRIMMED_INDEX :=
+	TRIMMED_FIT_SOURCE_FOLDER := $(TRIMMED_FIT_STRESS_STRAIN_DATA_FOLDER)
+	TRIMMED_FIT_SOURCE_FILES := $(TRIMMED_FIT_STRESS_STRAIN_FILES)
+	TRIMMED_FIT_INDEX :=
+endif
+
+# Options passing the trimming index to the stages reading the trimmed data
+END_TRIMMED_INDEX_OPTION := $(if $(END_TRIMMED_INDEX),--index $(abspath $(END_TRIMMED_INDEX)))
+TRIMMED_INDEX_OPTION := $(if $(TRIMMED_INDEX),--index $(abspath $(TRIMMED_INDEX)))
+TRIMMED_FIT_INDEX_OPTION := $(if $(TRIMMED_FIT_INDEX),--index $(abspath $(TRIMMED_FIT_INDEX)))
+
+# Paths to the folder and files where the intermediate data files of each test
+# are exported to the .csv format
+CSV_EXPORT_FOLDER := $(COMPUTED_DATA_FOLDER)/csv_export
+CSV_EXPORT_FILES := $(patsubst $(COMPUTED_DATA_FOLDER)/%.$(DATA_FORMAT), $(CSV_EXPORT_FOLDER)/%.csv, $(sort $(SMOOTH_EFFORT_FILES) $(SMOOTH_POSITION_FILES) $(STRESS_STRAIN_FILES) $(END_TRIMMED_SOURCE_FILES) $(TRIMMED_SOURCE_FILES) $(TRIMMED_FIT_SOURCE_FILES)))
+
+# Whether the processing and plotting stages log the time, the memory and the
+# amount of data they use for each test, to be summarized by "make report"
+PROFILE := false
+PROFILE_LOG := $(COMPUTED_DATA_FOLDER)/profile.jsonl
+
+# Environment variable enabling the logging in the Python scripts, expanded in
+# each directory so that every directory gets its own log
+export TENSILE_PROFILE = $(if $(filter true,$(PROFILE)),$(abspath $(PROFILE_LOG)))
+
+# Folder where "make benchmark" saves the timings of each run, and sizes of the
+# synthetic tests it times, as numbers of tests and of samples per test
+BENCHMARK_FOLDER := benchmarks
+BENCHMARK_SCALES := 5x10000 5x100000 5x1000000
+
+# Paths to the metrics of each test and of each combination of parameters
+# computed by "make sweep", and to their summary over all the tests
+SWEEP_FILE := sweep.csv
+SWEEP_SUMMARY_FILE := sweep_summary.csv
 
 # Paths to the data computed from the experimental data
 RESULTS_FILE := results.csv
+RUN_REPORT_FILE := run_report.json
 GLOBAL_RESULTS_FILE := global_results.csv
+CAMPAIGN_STATUS_FILE := campaign_status.csv
 END_FILE := $(COMPUTED_DATA_FOLDER)/end.csv
+PEAK_INDEX_FILE := $(COMPUTED_DATA_FOLDER)/peak_index.npz
 BEGIN_FILE := $(COMPUTED_DATA_FOLDER)/begin.csv
 END_FIT_FILE := $(COMPUTED_DATA_FOLDER)/end_fit.csv
 YEOH_INTERPOLATION_FILE := $(COMPUTED_DATA_FOLDER)/yeoh_interpolation.csv
 ULTIMATE_STRENGTH_FILE := $(COMPUTED_DATA_FOLDER)/ultimate_strength.csv
 EXTENSIBILITY_FILE := $(COMPUTED_DATA_FOLDER)/extensibility.csv
 TANGENT_MODULI_FILE := $(COMPUTED_DATA_FOLDER)/tangent_moduli.csv
+BOOTSTRAP_FILE := $(COMPUTED_DATA_FOLDER)/bootstrap.csv
 
 # The folder containing all the plots
 PLOTS_FOLDER := plots
@@ -80,4 +180,28 @@ INTERPOLATION_PLOTS_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME
 
 # Paths to the tangent moduli plots folder and files
 TANGENT_MODULI_CURVES_FOLDER := $(PLOTS_FOLDER)/tangent_moduli_curves
-TANGENT_MODULI_PLOTS_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(TANGENT_MODULI_CURVES_FOLDER)/%.tiff, $(VALID_EFFORT_DATA))
\ No newline at end of file
+TANGENT_MODULI_PLOTS_FILES := $(patsubst $(TEST_DATA_FOLDER)/%/$(EFFORT_FILE_NAME), $(TANGENT_MODULI_CURVES_FOLDER)/%.tiff, $(VALID_EFFORT_DATA))
+
+# Whether all the plots of a same kind are drawn at once by a single Python
+# process, or by NB_JOBS processes, instead of running one process per plot. In
+# this mode, all the plots of a kind are drawn again as soon as one of them is
+# outdated
+BATCH_PLOTS := false
+
+# Files marking when each kind of plots was last drawn in the batch mode
+RAW_PLOTS_EFFORT_BATCH := $(RAW_PLOTS_EFFORT_FOLDER)/.batch
+RAW_PLOTS_POSITION_BATCH := $(RAW_PLOTS_POSITION_FOLDER)/.batch
+SMOOTH_PLOTS_EFFORT_BATCH := $(SMOOTH_PLOTS_EFFORT_FOLDER)/.batch
+SMOOTH_PLOTS_POSITION_BATCH := $(SMOOTH_PLOTS_POSITION_FOLDER)/.batch
+BEGIN_END_PLOTS_BATCH := $(BEGIN_END_PLOTS_FOLDER)/.batch
+STRESS_STRAIN_PLOTS_BATCH := $(STRESS_STRAIN_PLOTS_FOLDER)/.batch
+INTERPOLATION_PLOTS_BATCH := $(INTERPOLATION_CURVES_FOLDER)/.batch
+TANGENT_MODULI_PLOTS_BATCH := $(TANGENT_MODULI_CURVES_FOLDER)/.batch
+
+# Options enabling the decimation of the curves for each kind of plots
+DECIMATE_RAW_OPTION = $(if $(filter true,$(DECIMATE_RAW_PLOTS)),--decimate)
+DECIMATE_SMOOTH_OPTION = $(if $(filter true,$(DECIMATE_SMOOTH_PLOTS)),--decimate)
+DECIMATE_BEGIN_END_OPTION = $(if $(filter true,$(DECIMATE_BEGIN_END_PLOTS)),--decimate)
+DECIMATE_STRESS_STRAIN_OPTION = $(if $(filter true,$(DECIMATE_STRESS_STRAIN_PLOTS)),--decimate)
+DECIMATE_INTERPOLATION_OPTION = $(if $(filter true,$(DECIMATE_INTERPOLATION_PLOTS)),--decimate)
+DECIMATE_TANGENT_MODULI_OPTION = $(if $(filter true,$(DECIMATE_TANGENT_MODULI_PLOTS)),--decimate)
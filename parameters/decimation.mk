@@ -0,0 +1,12 @@
+# This file contains the parameters of the decimation of the curves before plotting them
+
+# For each kind of plots, whether the curves are reduced to the minimum and
+# maximum stress of each pixel column before being drawn. This keeps the drawn
+# curves and their peaks unchanged, while making the plotting of very long
+# recordings much faster
+export DECIMATE_RAW_PLOTS := true
+export DECIMATE_SMOOTH_PLOTS := true
+export DECIMATE_BEGIN_END_PLOTS := true
+export DECIMATE_STRESS_STRAIN_PLOTS := true
+export DECIMATE_INTERPOLATION_PLOTS := true
+export DECIMATE_TANGENT_MODULI_PLOTS := true
@@ -3,45 +3,111 @@
 # Path to the Python interpreter to use
 export PYTHON_EXE := $(abspath venv/bin/python)
 
+# Number of processes over which the tests are distributed in the processing
+# stages that handle all the tests at once
+export NB_JOBS := 1
+
+# Folder where the results computed for each test are cached, indexed by the
+# content of the data, the parameters and the code version, so that they are
+# not computed again when only the timestamps of the files change. Leave empty
+# for disabling the cache
+export CACHE_FOLDER :=
+# Maximum size of the cache in MB, beyond which the least recently used
+# results are discarded
+export CACHE_SIZE := 1024
+export CACHE_OPTION := $(if $(CACHE_FOLDER),--cache $(abspath $(CACHE_FOLDER)) --cache_size $(CACHE_SIZE))
+
 # Path to the source Python files for data processing
 export PYTHON_FOLDER := src/tensile_processing
 
 # Name of the Python module to execute (must be installed for the given interpreter)
 export PYTHON_MODULE := tensile_processing
 
+# Path to the Unix socket of the worker server, started with "make server",
+# that keeps the Python modules loaded and runs the scripts of all the recipes
+# in forked processes. The scripts run in a new interpreter when the server is
+# not running. Leave empty for never using the server
+export SERVER_SOCKET :=
+# Maximum number of scripts the worker server runs at once, the other ones
+# waiting for one to finish. Leave empty for using the number of CPUs
+NB_SERVER_WORKERS :=
+# Prefix of the commands running the Python scripts
+export PYTHON_RUN := $(if $(SERVER_SOCKET),$(PYTHON_EXE) -m $(PYTHON_MODULE).client --socket $(abspath $(SERVER_SOCKET)),$(PYTHON_EXE) -m)
+
 # Paths to the Python scripts to execute for processing data
 export SMOOTH_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/smooth.py)
 export END_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/end.py)
+export PEAK_INDEX_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/peak_index.py)
 export BEGIN_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/begin.py)
 export END_FIT_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/end_fit.py)
 export TRIM_END_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/trim_end.py)
 export TRIM_BEGIN_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/trim_begin.py)
 export TRIM_END_FIT_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/trim_end_fit.py)
+export TRIM_INDEX_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/trim_index.py)
 export STRESS_STRAIN_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/stress_strain.py)
 export YEOH_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/yeoh.py)
 export ULTIMATE_STRENGTH_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/ultimate_strength.py)
 export EXTENSIBILITY_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/extensibility.py)
+export FEATURES_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/features.py)
 export TANGENT_MODULI_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/tangent_moduli.py)
+export BOOTSTRAP_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/bootstrap.py)
 export RESULTS_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/results.py)
+export CONVERT_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/convert.py)
 # Doesn't need to be exported as it is only run by the top-level Makefile
 GLOBAL_RESULTS_EXE_FILE := $(abspath $(PYTHON_FOLDER)/processing/global_results.py)
+# Path to the Python script running the entire processing chain in one process
+export PIPELINE_EXE_FILE := $(abspath $(PYTHON_FOLDER)/pipeline.py)
+# Path to the Python script running the processing of all the directories as a graph of tasks
+SCHEDULER_EXE_FILE := $(abspath $(PYTHON_FOLDER)/scheduler.py)
+# Path to the Python script running the pipeline on several directories at once
+CAMPAIGN_EXE_FILE := $(abspath $(PYTHON_FOLDER)/campaign.py)
+# Doesn't need to be exported as it is only run by the top-level Makefile
+STARTUP_EXE_FILE := $(abspath $(PYTHON_FOLDER)/startup.py)
+SERVER_EXE_FILE := $(abspath $(PYTHON_FOLDER)/server.py)
+# Path to the Python script summarizing the measurements of the stages
+export REPORT_EXE_FILE := $(abspath $(PYTHON_FOLDER)/report.py)
+# Path to the Python script timing the stages on synthetic tests
+BENCHMARK_EXE_FILE := $(abspath $(PYTHON_FOLDER)/benchmark/suite.py)
+# Path to the Python script sweeping the detection parameters
+export SWEEP_EXE_FILE := $(abspath $(PYTHON_FOLDER)/sweep.py)
 
 # Executables for processing the data
-export SMOOTH_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.smooth
-export END_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.end
-export BEGIN_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.begin
-export END_FIT_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.end_fit
-export TRIM_END_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.trim_end
-export TRIM_BEGIN_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.trim_begin
-export TRIM_END_FIT_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.trim_end_fit
-export STRESS_STRAIN_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.stress_strain
-export YEOH_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.yeoh
-export ULTIMATE_STRENGTH_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.ultimate_strength
-export EXTENSIBILITY_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.extensibility
-export TANGENT_MODULI_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.tangent_moduli
-export RESULTS_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.results
+export SMOOTH_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.smooth
+export END_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.end
+export PEAK_INDEX_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.peak_index
+export BEGIN_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.begin
+export END_FIT_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.end_fit
+export TRIM_END_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.trim_end
+export TRIM_BEGIN_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.trim_begin
+export TRIM_END_FIT_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.trim_end_fit
+export TRIM_INDEX_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.trim_index
+export STRESS_STRAIN_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.stress_strain
+export YEOH_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.yeoh
+export ULTIMATE_STRENGTH_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.ultimate_strength
+export EXTENSIBILITY_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.extensibility
+export FEATURES_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.features
+export TANGENT_MODULI_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.tangent_moduli
+export BOOTSTRAP_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.bootstrap
+export RESULTS_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.results
+export CONVERT_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.convert
 # Doesn't need to be exported as it is only run by the top-level Makefile
-GLOBAL_RESULTS_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).processing.global_results
+GLOBAL_RESULTS_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).processing.global_results
+# Executable running the entire processing chain in one process
+export PIPELINE_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).pipeline
+# Executable running the processing of all the directories as a graph of tasks
+SCHEDULER_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).scheduler
+# Executable running the pipeline on several directories at once
+CAMPAIGN_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).campaign
+# Executable checking the startup time of all the other executables
+STARTUP_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).startup
+# Executable running the worker server
+SERVER_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).server
+# Executable summarizing the measurements of the stages into a run report
+export REPORT_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).report
+# Executable timing the stages on synthetic tests
+BENCHMARK_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).benchmark.suite
+# Executable sweeping the detection parameters
+export SWEEP_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).sweep
 
 # Paths to the Python scripts to execute for plotting data
 export SAVE_CURVE_EXE_FILE := $(abspath $(PYTHON_FOLDER)/plotting/save_curve.py)
@@ -49,10 +115,12 @@ export BEGIN_END_CURVE_EXE_FILE := $(abspath $(PYTHON_FOLDER)/plotting/begin_end
 export ALL_STRESS_STRAIN_EXE_FILE := $(abspath $(PYTHON_FOLDER)/plotting/all_stress_strain_curves.py)
 export INTERPOLATED_CURVE_EXE_FILE := $(abspath $(PYTHON_FOLDER)/plotting/interpolated_curve.py)
 export TANGENT_MODULI_CURVE_EXE_FILE := $(abspath $(PYTHON_FOLDER)/plotting/moduli_curve.py)
+export BATCH_PLOT_EXE_FILE := $(abspath $(PYTHON_FOLDER)/plotting/batch.py)
 
 # Paths to the Python scripts to execute for plotting data
-export SAVE_CURVE_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).plotting.save_curve
-export BEGIN_END_CURVE_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).plotting.begin_end_curve
-export ALL_STRESS_STRAIN_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).plotting.all_stress_strain_curves
-export INTERPOLATED_CURVE_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).plotting.interpolated_curve
-export TANGENT_MODULI_CURVE_EXE := $(PYTHON_EXE) -m $(PYTHON_MODULE).plotting.moduli_curve
+export SAVE_CURVE_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).plotting.save_curve
+export BEGIN_END_CURVE_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).plotting.begin_end_curve
+export ALL_STRESS_STRAIN_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).plotting.all_stress_strain_curves
+export INTERPOLATED_CURVE_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).plotting.interpolated_curve
+export TANGENT_MODULI_CURVE_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).plotting.moduli_curve
+export BATCH_PLOT_EXE := $(PYTHON_RUN) $(PYTHON_MODULE).plotting.batch
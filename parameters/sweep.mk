@@ -0,0 +1,11 @@
+# This file contains the values of the detection parameters tried by "make sweep"
+
+# Each variable lists the values to try, separated by spaces, in the same units
+# as the parameter it sweeps. By default, only the current value of each
+# parameter is tried. All the combinations of the values are tried, except for
+# the parameters not used by the chosen detection methods
+export SWEEP_BEGIN_STRESS_THRESHOLD = $(BEGIN_STRESS_THRESHOLD)
+export SWEEP_SECOND_DERIVATIVE_THRESHOLD = $(SECOND_DERIVATIVE_THRESHOLD)
+export SWEEP_PEAK_THRESHOLD = $(PEAK_THRESHOLD)
+export SWEEP_PEAK_RANGE = $(PEAK_RANGE)
+export SWEEP_NB_POINTS_SMOOTH_END = $(NB_POINTS_SMOOTH_END)
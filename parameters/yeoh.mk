@@ -0,0 +1,6 @@
+# This file contains the parameters of the fit of the Yeoh model
+
+# Number of terms of the Yeoh model, from 2 to 4
+export YEOH_ORDER := 2
+# Whether all the Yeoh coefficients are constrained to be positive
+export YEOH_POSITIVE := false
@@ -0,0 +1,3 @@
+# coding: utf-8
+
+"""This file is only here to make the folder a Python module."""
@@ -0,0 +1,307 @@
+# coding: utf-8
+
+"""This script times each processing stage and the entire pipeline on
+synthetic tests of several sizes, and saves the timings along with the
+versions of the dependencies. The timings are compared to the ones of a
+previous run, so that slowdowns caused by a change in the code or in a
+dependency are detected."""
+
+import argparse
+from collections.abc import Callable, Sequence
+from contextlib import redirect_stdout
+from datetime import datetime
+from importlib.metadata import version, PackageNotFoundError
+import io
+import json
+from pathlib import Path
+import platform
+from tempfile import TemporaryDirectory
+import time
+from typing import Any, Optional
+import pandas as pd
+
+from .synthetic import generate_directory
+from ..pipeline import run_pipeline
+from ..processing.smooth import smooth_data
+from ..processing.stress_strain import compute_stress_strain
+from ..processing.end import detect_end
+from ..processing.trim_end import trim_end
+from ..processing.peak_index import index_peaks
+from ..processing.begin import detect_begin
+from ..processing.trim_begin import trim_begin
+from ..processing.ultimate_strength import compute_ultimate_strength
+from ..processing.extensibility import compute_extensibility
+from ..processing.features import compute_features
+from ..processing.end_fit import detect_end_fit
+from ..processing.trim_end_fit import trim_end_fit
+from ..processing.yeoh import fit_yeoh
+from ..processing.tangent_moduli import compute_tangent_moduli
+from ..processing.bootstrap import bootstrap_test
+from ..tools.argparse_checkers import checker_positive_int
+from ..tools.cache import code_version
+from ..tools.get_nr import get_nr
+from ..tools.storage import read_data, write_data
+from ..tools.yeoh_model import positive_bounds
+
+# The parameters of the processing stages, as in the parameters folder
+parameters = dict(nb_points_smooth=400,
+                  use_second_dev_begin=True,
+                  stress_threshold=.02,
+                  sec_dev_thresh=.3,
+                  use_second_dev_end=True,
+                  nb_points_smooth_end=2000,
+                  peak_prominence=.01,
+                  nb_points_peak=10000,
+                  young_threshold=.1,
+                  hyper_threshold=.05,
+                  nb_resamples=1000,
+                  confidence=.95,
+                  seed=0)
+
+# The bounds of the Yeoh coefficients, for timing the iterative solver
+_yeoh_bounds = ((0., 0.), (1e4, 1e4))
+
+
+def best_time(function: Callable[..., Any],
+              inputs: Sequence[tuple],
+              repeat: int) -> float:
+  """Returns the shortest time, in s, over several repetitions of calling the
+  function on all the inputs."""
+
+  best = float('inf')
+  for _ in range(repeat):
+    start = time.perf_counter()
+    for args in inputs:
+      function(*args)
+    best = min(best, time.perf_counter() - start)
+  return best
+
+
+def time_stages(folders: list[Path],
+                notes: pd.DataFrame,
+                repeat: int) -> dict[str, float]:
+  """Times each processing stage on all the given tests, in memory.
+
+  The inputs of each stage are computed beforehand by running the previous
+  stages, so that only the stage itself is timed.
+
+  Args:
+    folders: The folders containing the raw data of each test.
+    notes: The DataFrame containing the metadata of the tests.
+    repeat: The number of times each stage is timed, the fastest one being
+      kept.
+
+  Returns:
+    The time taken by each stage for all the tests, in s.
+  """
+
+  p = parameters
+  timings = dict()
+
+  def stage(name: str,
+            function: Callable[..., Any],
+            inputs: list[tuple]) -> list:
+    """Times one stage, and returns its outputs for the next stages."""
+
+    timings[name] = best_time(function, inputs, repeat)
+    return [function(*args) for args in inputs]
+
+  efforts = stage('read_csv', read_data,
+                  [(folder / 'effort.csv',) for folder in folders])
+  positions = [read_data(folder / 'position.csv') for folder in folders]
+  smooth = stage('smooth', smooth_data,
+                 [(effort, p['nb_points_smooth']) for effort in efforts])
+  data = stage('stress_strain', compute_stress_strain,
+               [(position, effort, notes, get_nr(folder)) for
+                position, effort, folder in zip(positions, smooth, folders)])
+  ends = stage('end', detect_end, [(test,) for test in data])
+  data = stage('trim_end', trim_end, list(zip(data, ends)))
+  peaks = stage('peak_index', index_peaks, [(test,) for test in data])
+  stage('begin_threshold', detect_begin,
+        [(test, False, p['stress_threshold'], p['sec_dev_thresh'],
+          p['peak_prominence'], p['nb_points_peak']) for test in data])
+  begins = stage('begin_second_derivative', detect_begin,
+                 [(test, True, p['stress_threshold'], p['sec_dev_thresh'],
+                   p['peak_prominence'], p['nb_points_peak'], index)
+                  for test, index in zip(data, peaks)])
+  data = stage('trim_begin', trim_begin, list(zip(data, begins)))
+  strengths = stage('ultimate_strength', compute_ultimate_strength,
+                    [(test,) for test in data])
+  stage('extensibility', compute_extensibility, [(test,) for test in data])
+  stage('features', compute_features, [(test,) for test in data])
+  ends = stage('end_fit', detect_end_fit,
+               [(test, strength, p['use_second_dev_end'],
+                 p['nb_points_smooth_end'], p['peak_prominence'],
+                 p['nb_points_peak'], index)
+                for test, strength, index in zip(data, strengths, peaks)])
+  data = stage('trim_end_fit', trim_end_fit, list(zip(data, ends)))
+  stage('yeoh', fit_yeoh, [(test,) for test in data])
+  stage('yeoh_bounded', fit_yeoh, [(test, _yeoh_bounds) for test in data])
+  stage('yeoh_positive_4', fit_yeoh,
+        [(test, positive_bounds(4), 4) for test in data])
+  stage('tangent_moduli', compute_tangent_moduli,
+        [(test, p['young_threshold'], p['hyper_threshold']) for test in data])
+  stage('bootstrap', bootstrap_test,
+        [(test, p['young_threshold'], p['hyper_threshold'],
+          p['nb_resamples'], p['confidence'], p['seed'], get_nr(folder))
+         for test, folder in zip(data, folders)])
+  stage('bootstrap_positive_4', bootstrap_test,
+        [(test, p['young_threshold'], p['hyper_threshold'],
+          p['nb_resamples'], p['confidence'], p['seed'], get_nr(folder), 4,
+          positive_bounds(4))
+         for test, folder in zip(data, folders)])
+
+  with TemporaryDirectory() as temp:
+    stage('write_npz', write_data,
+          [(test, Path(temp) / f'{i}.npz') for i, test in enumerate(data)])
+    stage('read_npz', read_data,
+          [(Path(temp) / f'{i}.npz',) for i in range(len(data))])
+
+  return timings
+
+
+def time_pipeline(directory: Path,
+                  folders: list[Path],
+                  repeat: int,
+                  jobs: int) -> float:
+  """Times the entire pipeline on the tests of a directory, writing all the
+  intermediate and results files to a temporary folder."""
+
+  def run() -> None:
+    """Runs the pipeline once, without displaying the written files."""
+
+    with TemporaryDirectory() as temp, redirect_stdout(io.StringIO()):
+      out = Path(temp)
+      run_pipeline(
+        folders, 'effort.csv', 'position.csv', 'npz',
+        directory / 'test_data' / 'notes.csv', out / 'smooth',
+        out / 'stress_strain', out / 'end_trimmed', out / 'trimmed',
+        out / 'trimmed_fit', out / 'end.csv', out / 'peak_index.npz',
+        out / 'begin.csv', out / 'end_fit.csv',
+        out / 'ultimate_strength.csv', out / 'extensibility.csv',
+        out / 'yeoh.csv', out / 'tangent_moduli.csv', out / 'bootstrap.csv',
+        out / 'results.csv', jobs=jobs, **parameters)
+
+  return best_time(run, [()], repeat)
+
+
+def environment() -> dict[str, str]:
+  """Returns the versions of Python, of the dependencies and of the code, to
+  be saved along with the timings."""
+
+  packages = dict()
+  for package in ('numpy', 'pandas', 'scipy', 'matplotlib', 'pyarrow'):
+    try:
+      packages[package] = version(package)
+    except PackageNotFoundError:
+      pass
+  return {'python': platform.python_version(),
+          'platform': platform.platform(),
+          'processor': platform.processor(),
+          'code': code_version(),
+          **packages}
+
+
+def compare(current: dict, previous: dict) -> pd.DataFrame:
+  """Returns the ratio of the current timings to the previous ones, for all
+  the scales and stages timed in both runs."""
+
+  rows = list()
+  old = {(scale['tests'], scale['samples'], name): value
+         for scale in previous['scales']
+         for name, value in scale['timings'].items()}
+  for scale in current['scales']:
+    for name, value in scale['timings'].items():
+      key = (scale['tests'], scale['samples'], name)
+      if key in old:
+        rows.append((*key, old[key], value, value / old[key]))
+  return pd.DataFrame(rows, columns=('tests', 'samples', 'stage', 'previous',
+                                     'current', 'ratio'))
+
+
+def _scale(raw: str) -> tuple[int, int]:
+  """Parses a scale given as the number of tests and the number of samples
+  per test, separated by an x."""
+
+  try:
+    tests, samples = map(int, raw.lower().split('x'))
+  except ValueError:
+    raise argparse.ArgumentTypeError(f"Invalid scale {raw}, expected for "
+                                     f"example 5x100000 !")
+  return tests, samples
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Times each processing stage and the entire pipeline on "
+                "synthetic tests of several sizes, saves the timings, and "
+                "compares them to the ones of a previous run.")
+  parser.add_argument('results_folder', type=Path, nargs=1,
+                      help="Path to the folder where to save the timings of "
+                           "each run.")
+  parser.add_argument('--scales', type=_scale, nargs='+',
+                      default=[(5, 10000), (5, 100000), (5, 1000000)],
+                      help="Sizes of the benchmarks, each as the number of "
+                           "tests and the number of samples per test "
+                           "separated by an x.")
+  parser.add_argument('--repeat', type=checker_positive_int, default=3,
+                      help="Number of times each stage is timed, the fastest "
+                           "one being kept.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes used by the pipeline.")
+  parser.add_argument('--seed', type=int, default=0,
+                      help="Seed of the random generator of the synthetic "
+                           "tests.")
+  parser.add_argument('--compare', type=Path, default=None,
+                      help="Path to the timings of a previous run to compare "
+                           "with. By default, the latest run saved in the "
+                           "results folder.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  results_folder = args.results_folder[0]
+  repeat = args.repeat
+  reference: Optional[Path] = args.compare
+  if reference is None:
+    reference = max(results_folder.glob('benchmark_*.json'), default=None)
+
+  run = {'date': datetime.now().isoformat(timespec='seconds'),
+         'environment': environment(),
+         'repeat': repeat,
+         'jobs': args.jobs,
+         'seed': args.seed,
+         'scales': list()}
+
+  for nb_tests, nb_samples in args.scales:
+    print(f"Timing {nb_tests} tests of {nb_samples} samples")
+    with TemporaryDirectory() as folder:
+      directory = Path(folder)
+      folders = generate_directory(directory, nb_tests, nb_samples,
+                                   seed=args.seed)
+      notes = pd.read_csv(directory / 'test_data' / 'notes.csv')
+      timings = time_stages(folders, notes, repeat)
+      timings['pipeline'] = time_pipeline(directory, folders, repeat,
+                                          args.jobs)
+    run['scales'].append({'tests': nb_tests, 'samples': nb_samples,
+                          'timings': timings})
+
+  # Saving the timings of this run
+  results_folder.mkdir(parents=True, exist_ok=True)
+  destination = results_folder / (f"benchmark_"
+                                  f"{datetime.now():%Y%m%d_%H%M%S}.json")
+  with open(destination, 'w') as file:
+    json.dump(run, file, indent=2)
+  print(f"Writing {destination.absolute()}")
+
+  # Displaying the timings, compared to the previous run if any
+  if reference is not None:
+    with open(reference) as file:
+      comparison = compare(run, json.load(file))
+    print(f"Compared to {reference}:\n{comparison.to_string(index=False)}")
+  else:
+    for scale in run['scales']:
+      print(f"{scale['tests']} tests of {scale['samples']} samples:")
+      for name, value in scale['timings'].items():
+        print(f"  {name:<24} {value:10.4f} s")
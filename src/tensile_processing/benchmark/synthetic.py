@@ -0,0 +1,217 @@
+# coding: utf-8
+
+"""This script generates synthetic tensile tests, organized like the raw data
+of real campaigns. The stress follows a second-order Yeoh model, preceded by a
+slack toe region and followed by partial and complete ruptures, and noise is
+added to the effort. The generated data is fully determined by the seed, so
+that it can be used for reproducible benchmarks."""
+
+import argparse
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from ..tools.argparse_checkers import checker_positive_int
+from ..tools.fields import identifier_field, condition_field, type_field, \
+  height_field, width_field, initial_length_field, time_field, \
+  position_field, effort_field
+from ..tools.yeoh_model import yeoh_2
+
+# The conditions and types given to the synthetic tests in the notes file
+_conditions = ('Control', 'Treated')
+_types = ('Longitudinal', 'Transverse')
+
+
+def synthetic_test(nb_samples: int,
+                   rng: np.random.Generator,
+                   length: float = 10.,
+                   width: float = 5.,
+                   height: float = 1.,
+                   c0: float = 20.,
+                   c1: float = 5.,
+                   toe: float = .05,
+                   rupture: float = 1.6,
+                   noise: float = .01,
+                   duration: float = 120.,
+                   position_ratio: int = 10
+                   ) -> tuple[pd.DataFrame, pd.DataFrame]:
+  """Generates the raw effort and position data of one synthetic test.
+
+  The sample is stretched at constant speed up to beyond its rupture. It only
+  starts bearing load once the slack of the toe region is taken up, then
+  follows Yeoh's model, and loses part of its stiffness shortly before its
+  complete rupture.
+
+  Args:
+    nb_samples: The number of effort samples.
+    rng: The random generator used for drawing the noise.
+    length: The initial length of the sample, in mm.
+    width: The width of the sample, in mm.
+    height: The thickness of the sample, in mm.
+    c0: The first Yeoh coefficient, in kPa.
+    c1: The second Yeoh coefficient, in kPa.
+    toe: The extension taken up by the slack before the sample bears load.
+    rupture: The extension at which the sample ruptures.
+    noise: The standard deviation of the noise added to the effort, as a
+      fraction of the maximum effort.
+    duration: The duration of the test, in s.
+    position_ratio: The number of effort samples per position sample, as the
+      position is usually acquired at a lower rate.
+
+  Returns:
+    The DataFrames containing the effort and the position data.
+  """
+
+  time = np.linspace(0, duration, nb_samples)
+  extension = 1 + (rupture + .2 - 1) * time / duration
+
+  # The slack is taken up smoothly over the toe region
+  softness = toe / 5
+  loaded = 1 + softness * np.logaddexp(0, (extension - 1 - toe) / softness)
+  stress = yeoh_2(loaded, c0, c1)
+
+  # A partial rupture slightly before the complete one, then the rupture
+  stress *= 1 - .1 / (1 + np.exp(-(extension - rupture + .08) / .005))
+  stress /= 1 + np.exp((extension - rupture) / .01)
+
+  # Converting the stress in kPa to an effort in N, and adding noise
+  effort = stress * width * height / 1000
+  effort += rng.normal(0, noise * effort.max(), nb_samples)
+
+  position = (extension - 1) * length
+  return (pd.DataFrame({time_field: time, effort_field: effort}),
+          pd.DataFrame({time_field: time[::position_ratio],
+                        position_field: position[::position_ratio]}))
+
+
+def generate_directory(directory: Path,
+                       nb_tests: int,
+                       nb_samples: int,
+                       seed: int = 0,
+                       effort_file_name: str = 'effort.csv',
+                       position_file_name: str = 'position.csv',
+                       test_data_folder: str = 'test_data') -> list[Path]:
+  """Generates the raw data and the notes file of several synthetic tests in
+  a directory, laid out as expected by the Makefile.
+
+  The parameters of the tests are drawn around the default ones of
+  synthetic_test, so that the tests differ from one another.
+
+  Args:
+    directory: The directory where to generate the tests.
+    nb_tests: The number of tests to generate.
+    nb_samples: The number of effort samples of each test.
+    seed: The seed of the random generator.
+    effort_file_name: The name of the raw effort data files.
+    position_file_name: The name of the raw position data files.
+    test_data_folder: The folder of the directory containing the tests.
+
+  Returns:
+    The paths to the folders of the generated tests.
+  """
+
+  rng = np.random.default_rng(seed)
+  folders = list()
+  notes = list()
+  for nr in range(1, nb_tests + 1):
+    parameters = dict(length=rng.uniform(8, 12),
+                      width=rng.uniform(4, 6),
+                      height=rng.uniform(.5, 1.5),
+                      c0=20 * rng.lognormal(0, .3),
+                      c1=5 * rng.lognormal(0, .3),
+                      toe=rng.uniform(.02, .1),
+                      rupture=rng.uniform(1.4, 1.8))
+    effort, position = synthetic_test(nb_samples, rng, **parameters)
+
+    folder = directory / test_data_folder / f'{nr:03d}'
+    folder.mkdir(parents=True, exist_ok=True)
+    effort.to_csv(folder / effort_file_name, index=False)
+    position.to_csv(folder / position_file_name, index=False)
+    folders.append(folder)
+
+    notes.append({identifier_field: nr,
+                  condition_field: _conditions[nr % len(_conditions)],
+                  type_field: _types[(nr // len(_conditions)) % len(_types)],
+                  height_field: parameters['height'],
+                  width_field: parameters['width'],
+                  initial_length_field: parameters['length']})
+
+  pd.DataFrame(notes).to_csv(directory / test_data_folder / 'notes.csv',
+                             index=False)
+  return folders
+
+
+def generate_campaign(root: Path,
+                      nb_donors: int,
+                      nb_timepoints: int,
+                      nb_tests: int,
+                      nb_samples: int,
+                      seed: int = 0) -> list[Path]:
+  """Generates a campaign of synthetic tests, with one directory per donor
+  and time point as expected when running the Makefile with a
+  TARGET_DIRECTORY.
+
+  Args:
+    root: The directory where to generate the campaign.
+    nb_donors: The number of donors.
+    nb_timepoints: The number of time points per donor.
+    nb_tests: The number of tests per donor and time point.
+    nb_samples: The number of effort samples of each test.
+    seed: The seed of the random generator, from which the seed of each
+      directory is derived.
+
+  Returns:
+    The paths to the generated directories.
+  """
+
+  directories = list()
+  for donor in range(1, nb_donors + 1):
+    for timepoint in range(1, nb_timepoints + 1):
+      directory = root / f'D{donor:02d}_synthetic' / f'T{timepoint}'
+      generate_directory(directory, nb_tests, nb_samples,
+                         seed=seed * 1000 + donor * nb_timepoints + timepoint)
+      directories.append(directory)
+  return directories
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Generates a campaign of synthetic tensile tests, with one "
+                "directory per donor and time point.")
+  parser.add_argument('destination', type=Path, nargs=1,
+                      help="Path to the folder where to generate the "
+                           "campaign.")
+  parser.add_argument('--donors', type=checker_positive_int, default=1,
+                      help="Number of donors.")
+  parser.add_argument('--timepoints', type=checker_positive_int, default=1,
+                      help="Number of time points per donor.")
+  parser.add_argument('--tests', type=checker_positive_int, default=10,
+                      help="Number of tests per donor and time point.")
+  parser.add_argument('--samples', type=checker_positive_int, default=100000,
+                      help="Number of effort samples per test.")
+  parser.add_argument('--seed', type=int, default=0,
+                      help="Seed of the random generator.")
+  parser.add_argument('--makefile', type=Path, default=None,
+                      help="Path to a Makefile, linked in each generated "
+                           "directory along with its parameters folder, so "
+                           "that the campaign can be processed with "
+                           "TARGET_DIRECTORY.")
+  args = parser.parse_args()
+
+  directories = generate_campaign(args.destination[0], args.donors,
+                                  args.timepoints, args.tests, args.samples,
+                                  args.seed)
+
+  # Linking the Makefile and its parameters in each directory
+  if args.makefile is not None:
+    makefile = args.makefile.absolute()
+    for directory in directories:
+      for target in (makefile, makefile.parent / 'parameters'):
+        link = directory / target.name
+        if not link.exists():
+          link.symlink_to(target)
+
+  print(f"Generated {len(directories)} directories in "
+        f"{args.destination[0].absolute()}")
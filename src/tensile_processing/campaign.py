@@ -0,0 +1,392 @@
+# coding: utf-8
+
+"""This script runs the entire processing chain on all the donor and time
+point directories of a campaign. Each directory is processed by the pipeline
+in its own process, at most a given number of directories being processed at
+once, and the directories with the most raw data being started first so that
+the campaign ends shortly after its longest directory. The results of each
+directory are added to the global results file as soon as it is done, and the
+status and duration of the processing of each directory are recorded in a
+status file. A directory that fails does not prevent the other ones from being
+processed."""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import nan
+from pathlib import Path
+import sys
+import time
+import traceback
+from typing import Any, NamedTuple, Optional
+import pandas as pd
+
+from .pipeline import run_pipeline
+from .processing.global_results import combine_results, directory_labels
+from .tools.argparse_checkers import checker_is_csv, checker_positive_int, \
+  checker_percentage
+from .tools.cache import ResultCache
+from .tools.fields import directory_field, donor_field, timepoint_field, \
+  status_field, nb_tests_field, start_time_field, duration_field, \
+  error_field, yeoh_fields
+from .tools.get_nr import get_nr
+from .tools.storage import data_formats
+from .tools.table import ResultTable
+
+# The arguments of run_pipeline that are paths relative to each directory
+_directory_paths = ('notes_file', 'smooth_folder', 'stress_strain_folder',
+                    'end_trimmed_folder', 'trimmed_folder',
+                    'trimmed_fit_folder', 'end_file', 'peak_index_file',
+                    'begin_file', 'end_fit_file', 'ultimate_strength_file',
+                    'extensibility_file', 'yeoh_file', 'tangent_moduli_file',
+                    'bootstrap_file', 'results_file')
+
+# The columns of the status file
+_status_fields = (directory_field, donor_field, timepoint_field, status_field,
+                  nb_tests_field, start_time_field, duration_field,
+                  error_field)
+
+
+class DirectoryRun(NamedTuple):
+  """The outcome of the processing of one directory, the results being None if
+  it failed."""
+
+  results: Optional[pd.DataFrame]
+  nb_tests: int
+  start: float
+  duration: float
+  error: str
+
+
+def discover_directories(target_directory: Path) -> list[Path]:
+  """Returns the donor and time point directories of a campaign, as the ones
+  containing a Makefile two levels below the target directory, like the
+  Makefile does in the recursive mode.
+
+  Args:
+    target_directory: The directory containing one folder per donor, each
+      containing one folder per time point.
+
+  Returns:
+    The sorted list of the directories to process.
+  """
+
+  return sorted(path.parent for path in target_directory.glob('*/*/Makefile'))
+
+
+def _test_folders(directory: Path,
+                  test_data_folder: Path,
+                  effort_file_name: str) -> list[Path]:
+  """Returns the folders of the tests of a directory that contain raw effort
+  data."""
+
+  return sorted((path.parent for path in (directory / test_data_folder).glob(
+    f'*/{effort_file_name}')), key=get_nr)
+
+
+def process_directory(directory: Path,
+                      test_data_folder: Path,
+                      settings: dict[str, Any]) -> DirectoryRun:
+  """Runs the pipeline on all the tests of one directory.
+
+  Any error raised while processing the directory is printed and reported in
+  the returned outcome, so that it does not stop the processing of the other
+  directories.
+
+  Args:
+    directory: The directory containing the tests to process.
+    test_data_folder: The folder containing one folder of raw data per test,
+      relative to the directory.
+    settings: The arguments of run_pipeline other than the test folders, the
+      paths being relative to the directory.
+
+  Returns:
+    The results of the directory along with its number of tests, the time at
+    which its processing started, its duration in s, and the error message if
+    it failed.
+  """
+
+  start = time.time()
+  nb_tests = 0
+  try:
+    tests = _test_folders(directory, test_data_folder,
+                          settings['effort_file_name'])
+    nb_tests = len(tests)
+    paths = {name: directory / settings[name] for name in _directory_paths}
+    index_files = (tuple(directory / path for path in settings['index_files'])
+                   if settings['index_files'] is not None else None)
+    results = run_pipeline(tests, **{**settings, **paths,
+                                     'index_files': index_files})
+    return DirectoryRun(results, nb_tests, start, time.time() - start, '')
+  except Exception as error:
+    traceback.print_exc()
+    return DirectoryRun(None, nb_tests, start, time.time() - start,
+                        f"{type(error).__name__}: {error}")
+
+
+def _write_status(path: Path,
+                  directories: list[Path],
+                  runs: dict[Path, DirectoryRun],
+                  origin: float) -> None:
+  """Writes the status of each directory of the campaign to a .csv file, the
+  start times being given relative to the start of the campaign."""
+
+  to_write = ResultTable(len(directories), _status_fields)
+  for directory in directories:
+    donor, timepoint = directory_labels(directory)
+    run = runs.get(directory)
+    to_write.append({
+      directory_field: str(directory), donor_field: donor,
+      timepoint_field: timepoint,
+      status_field: ('pending' if run is None else
+                     'failed' if run.results is None else 'done'),
+      nb_tests_field: run.nb_tests if run is not None else 0,
+      start_time_field: run.start - origin if run is not None else nan,
+      duration_field: run.duration if run is not None else nan,
+      error_field: run.error if run is not None else ''})
+  to_write.to_frame().to_csv(path, index=False)
+
+
+def run_campaign(directories: list[Path],
+                 test_data_folder: Path,
+                 settings: dict[str, Any],
+                 global_results_file: Path,
+                 status_file: Path,
+                 jobs: int = 1) -> dict[Path, DirectoryRun]:
+  """Processes all the directories of a campaign, and combines their results
+  into the global results file as they complete.
+
+  The directories are started by decreasing size of their raw effort data.
+  Each time a directory is done, the global results file is written again
+  with the results of all the directories done so far, in the order of the
+  given directories, and the status file is updated. The results are taken
+  from the memory of the processes, without reading the results files again.
+
+  Args:
+    directories: The donor and time point directories to process.
+    test_data_folder: The folder containing one folder of raw data per test,
+      relative to each directory.
+    settings: The arguments of run_pipeline other than the test folders, the
+      paths being relative to each directory.
+    global_results_file: The .csv file where to combine the results of all
+      the directories.
+    status_file: The .csv file where to record the status and the duration
+      of the processing of each directory.
+    jobs: The maximum number of directories processed at once, each in its
+      own process. If 1, the directories are processed in the current
+      process.
+
+  Returns:
+    The outcome of the processing of each directory.
+  """
+
+  def size(directory: Path) -> int:
+    """Returns the total size of the raw effort data of a directory."""
+
+    return sum((folder / settings['effort_file_name']).stat().st_size
+               for folder in _test_folders(directory, test_data_folder,
+                                           settings['effort_file_name']))
+
+  origin = time.time()
+  runs = dict()
+  _write_status(status_file, directories, runs, origin)
+
+  def complete(directory: Path, run: DirectoryRun) -> None:
+    """Records the outcome of a directory, and updates the output files."""
+
+    runs[directory] = run
+    print(f"{'Processed' if run.results is not None else 'Failed'} "
+          f"{directory.absolute()} in {run.duration:.1f} s")
+    done = [(directory / settings['results_file'], runs[directory].results)
+            for directory in directories
+            if directory in runs and runs[directory].results is not None]
+    if done:
+      print(f"Writing {global_results_file.absolute()}")
+      combine_results(done).to_csv(global_results_file, index=False)
+    _write_status(status_file, directories, runs, origin)
+
+  ordered = sorted(directories, key=size, reverse=True)
+  if jobs <= 1:
+    for directory in ordered:
+      complete(directory, process_directory(directory, test_data_folder,
+                                            settings))
+    return runs
+
+  with ProcessPoolExecutor(max_workers=jobs) as pool:
+    futures = {pool.submit(process_directory, directory, test_data_folder,
+                           settings): directory for directory in ordered}
+    for future in as_completed(futures):
+      complete(futures[future], future.result())
+  return runs
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Runs the entire processing chain on all the donor and time "
+                "point directories of a campaign, several directories at once,"
+                " and combines their results into the global results file as "
+                "soon as each directory is done.")
+  parser.add_argument('nb_points_smooth', type=int, nargs=1,
+                      help="The number of points to use for the Savitzky-Golay"
+                           " filter smoothening the raw effort data.")
+  parser.add_argument('use_second_derivative_begin', type=str, nargs=1,
+                      help="Boolean indicating whether to use the second "
+                           "derivative method for detecting the minimum "
+                           "extension. Otherwise, the stress threshold method "
+                           "is used.")
+  parser.add_argument('stress_threshold', type=float, nargs=1,
+                      help="The percentage of the total stress below which the"
+                           " data is not considered valid. Only used with the "
+                           "stress threshold method.")
+  parser.add_argument('second_derivative_threshold', type=float, nargs=1,
+                      help="The percentage of the maximum second derivative "
+                           "value below which the data is not considered "
+                           "valid. Only used with the second derivative "
+                           "method.")
+  parser.add_argument('use_second_derivative_end', type=str, nargs=1,
+                      help="Boolean indicating whether to use the second "
+                           "derivative method for detecting the maximum "
+                           "extension for the fit. Otherwise, the maximum of "
+                           "the first derivative is used.")
+  parser.add_argument('nb_points_smooth_end', type=int, nargs=1,
+                      help="Number of points to use for running the "
+                           "Savitzky-Golay filter for smoothening the first "
+                           "derivative of the stress.")
+  parser.add_argument('peak_prominence', type=float, nargs=1,
+                      help="Minimum percentage of the total stress range in "
+                           "the test above which a local stress peak will "
+                           "be considered as the end of the valid data.")
+  parser.add_argument('nb_points_peak', type=int, nargs=1,
+                      help="Maximum width, in samples, of stress peaks to "
+                           "consider for selecting the end cutoff extension.")
+  parser.add_argument('young_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the Young's modulus should be computed.")
+  parser.add_argument('hyperelastic_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the hyperelastic modulus should be "
+                           "computed.")
+  parser.add_argument('nb_resamples', type=checker_positive_int, nargs=1,
+                      help="The number of bootstrap resamples to draw for "
+                           "each test.")
+  parser.add_argument('confidence_level', type=checker_percentage, nargs=1,
+                      help="The confidence level of the bootstrap intervals, "
+                           "as a percentage.")
+  parser.add_argument('seed', type=int, nargs=1,
+                      help="The seed of the random generator used for "
+                           "bootstrapping.")
+  parser.add_argument('effort_file_name', type=str, nargs=1,
+                      help="Name of the raw effort data file in each test "
+                           "folder.")
+  parser.add_argument('position_file_name', type=str, nargs=1,
+                      help="Name of the raw position data file in each test "
+                           "folder.")
+  parser.add_argument('data_format', type=str, nargs=1, choices=data_formats,
+                      help="Format of the intermediate data files of each "
+                           "test, given as their file extension.")
+  parser.add_argument('test_data_folder', type=Path, nargs=1,
+                      help="Path to the folder containing one folder of raw "
+                           "data per test, relative to each directory.")
+  parser.add_argument('notes_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file containing the metadata "
+                           "collected during the tests, relative to each "
+                           "directory.")
+  for name, description in (
+      ('smooth_folder', "smoothened data"),
+      ('stress_strain_folder', "stress-strain data"),
+      ('end_trimmed_folder', "end-trimmed stress-strain data"),
+      ('trimmed_folder', "trimmed stress-strain data"),
+      ('trimmed_fit_folder', "stress-strain data valid for the Yeoh fit")):
+    parser.add_argument(name, type=Path, nargs=1,
+                        help=f"Path to the folder where to store the "
+                             f"{description}, relative to each directory.")
+  for name, description in (
+      ('end_file', "end extension data"),
+      ('begin_file', "begin extension data"),
+      ('end_fit_file', "end extension data for a fit with Yeoh"),
+      ('ultimate_strength_file', "ultimate strength data"),
+      ('extensibility_file', "extensibility data"),
+      ('yeoh_file', "Yeoh coefficients"),
+      ('tangent_moduli_file', "tangent moduli coefficients"),
+      ('bootstrap_file', "bounds of the bootstrap confidence intervals"),
+      ('results_file', "aggregated results")):
+    parser.add_argument(name, type=checker_is_csv, nargs=1,
+                        help=f"Path to the .csv file where to store the "
+                             f"{description}, relative to each directory.")
+  parser.add_argument('peak_index_file', type=Path, nargs=1,
+                      help="Path to the .npz file where to store the indices "
+                           "of the stress peaks, relative to each directory.")
+  parser.add_argument('target_directory', type=Path, nargs=1,
+                      help="Path to the directory containing one folder per "
+                           "donor, each containing one directory per time "
+                           "point with a Makefile.")
+  parser.add_argument('global_results_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to combine the "
+                           "results of all the directories.")
+  parser.add_argument('status_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to record the status "
+                           "and the duration of the processing of each "
+                           "directory.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Maximum number of directories processed at once, "
+                           "each in its own process.")
+  parser.add_argument('--index_files', type=checker_is_csv, nargs=3,
+                      default=None,
+                      help="Paths to the .csv files where to store the "
+                           "trimming index of the end, begin and end fit "
+                           "trimming stages, relative to each directory. If "
+                           "given, the trimmed data files are not written.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results of "
+                           "the most expensive processing stages, so that "
+                           "they are only computed again if the data or the "
+                           "parameters change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--yeoh_order', type=int, default=2,
+                      choices=range(2, len(yeoh_fields) + 1),
+                      help="Number of terms of the Yeoh model to fit.")
+  parser.add_argument('--yeoh_positive', action='store_true',
+                      help="If given, constrains all the Yeoh coefficients to "
+                           "be positive.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  directories = discover_directories(args.target_directory[0])
+  settings = dict(
+    effort_file_name=args.effort_file_name[0],
+    position_file_name=args.position_file_name[0],
+    data_format=args.data_format[0],
+    **{name: getattr(args, name)[0] for name in _directory_paths},
+    nb_points_smooth=args.nb_points_smooth[0],
+    use_second_dev_begin=args.use_second_derivative_begin[0] == 'true',
+    stress_threshold=args.stress_threshold[0] / 100,
+    sec_dev_thresh=args.second_derivative_threshold[0] / 100,
+    use_second_dev_end=args.use_second_derivative_end[0] == 'true',
+    nb_points_smooth_end=args.nb_points_smooth_end[0],
+    peak_prominence=args.peak_prominence[0] / 100,
+    nb_points_peak=args.nb_points_peak[0],
+    young_threshold=args.young_threshold[0] / 100,
+    hyper_threshold=args.hyperelastic_threshold[0] / 100,
+    nb_resamples=args.nb_resamples[0],
+    confidence=args.confidence_level[0] / 100,
+    seed=args.seed[0],
+    index_files=(tuple(args.index_files) if args.index_files is not None
+                 else None),
+    cache=(ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None),
+    yeoh_order=args.yeoh_order,
+    yeoh_positive=args.yeoh_positive)
+
+  # Processing all the directories, and reporting the failed ones
+  runs = run_campaign(directories, args.test_data_folder[0], settings,
+                      args.global_results_file[0], args.status_file[0],
+                      jobs=args.jobs)
+  failed = [directory for directory, run in runs.items()
+            if run.results is None]
+  for directory in failed:
+    print(f"Processing {directory.absolute()} failed with "
+          f"{runs[directory].error}", file=sys.stderr)
+  sys.exit(1 if failed else 0)
@@ -0,0 +1,87 @@
+# coding: utf-8
+
+"""This script runs one of the executable scripts of the package, through the
+worker server if it is running and in the current process otherwise. It only
+imports modules of the standard library, so that it starts in a few
+milliseconds and leaves the heavy imports to the server."""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import runpy
+import socket
+import sys
+
+
+def run_on_server(server: Path,
+                  module: str,
+                  arguments: list[str]) -> int:
+  """Sends a script to run to the worker server, and waits for it to finish.
+
+  The standard streams of this process are passed to the server, so that the
+  script prints directly to them as if it was running in this process.
+
+  Args:
+    server: The path to the Unix socket of the worker server.
+    module: The full name of the module to run as a script.
+    arguments: The command line arguments to pass to the script.
+
+  Returns:
+    The exit status of the script.
+
+  Raises:
+    OSError: If the server cannot be reached.
+  """
+
+  request = json.dumps({'module': module,
+                        'arguments': arguments,
+                        'directory': os.getcwd(),
+                        'environment': dict(os.environ)}).encode()
+
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+    connection.connect(str(server))
+    socket.send_fds(connection, [request], [sys.stdin.fileno(),
+                                            sys.stdout.fileno(),
+                                            sys.stderr.fileno()])
+    connection.shutdown(socket.SHUT_WR)
+
+    # The server only answers with the exit status once the script is over
+    chunks = list()
+    while chunk := connection.recv(64):
+      chunks.append(chunk)
+
+  if not chunks:
+    print("The worker server stopped while running the script", file=sys.stderr)
+    return 1
+  return int(b''.join(chunks))
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Runs an executable script of the package on the worker "
+                "server, or in this process if the server is not running.")
+  parser.add_argument('--socket', type=Path, default=None,
+                      help="Path to the Unix socket of the worker server.")
+  parser.add_argument('module', type=str,
+                      help="Full name of the module to run as a script.")
+  parser.add_argument('arguments', nargs=argparse.REMAINDER,
+                      help="Command line arguments to pass to the script.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  server = args.socket
+  module = args.module
+  arguments = args.arguments
+
+  if server is not None:
+    try:
+      sys.exit(run_on_server(server, module, arguments))
+    except (FileNotFoundError, ConnectionRefusedError):
+      pass
+
+  # Running the script in this process if the server cannot be reached
+  sys.argv = [module, *arguments]
+  runpy.run_module(module, run_name='__main__', alter_sys=True)
@@ -0,0 +1,540 @@
+# coding: utf-8
+
+"""This script runs the entire processing chain, from the raw effort and
+position data of each test to the final results file, in a single Python
+process. The data of each test is kept in memory between the processing
+stages, and the same intermediate and final files as the ones produced by the
+Makefile are written."""
+
+import argparse
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import repeat
+from pathlib import Path
+from shutil import copyfile
+from typing import Any, Optional
+import pandas as pd
+
+from .processing.smooth import smooth_data
+from .processing.stress_strain import compute_stress_strain
+from .processing.end import detect_end
+from .processing.trim_end import trim_end
+from .processing.begin import detect_begin
+from .processing.trim_begin import trim_begin
+from .processing.peak_index import index_peaks
+from .processing.features import compute_features
+from .processing.end_fit import detect_end_fit
+from .processing.trim_end_fit import trim_end_fit
+from .processing.yeoh import yeoh_normal, fit_yeoh_tests
+from .processing.trim_index import compute_trim_index
+from .processing.tangent_moduli import compute_tangent_moduli
+from .processing.bootstrap import bootstrap_test, interval_fields
+from .processing.results import aggregate_results
+from .tools.argparse_checkers import checker_is_csv, checker_valid_csv, \
+  checker_positive_int, checker_percentage
+from .tools.fields import identifier_field, end_field, begin_field, \
+  end_fit_field, ultimate_strength_field, extensibility_field, \
+  yeoh_fields, young_modulus_field, hyperelastic_offset_field, \
+  hyperelastic_modulus_field, start_index_field, stop_index_field, \
+  extension_scale_field, stress_offset_field
+from .tools.cache import ResultCache, CachedFunction
+from .tools.get_nr import get_nr
+from .tools.parallel import parallel_map
+from .tools.peaks import save_peak_indices
+from .tools.storage import read_data, write_data, data_formats
+from .tools.views import trim_view
+from .tools.yeoh_model import positive_bounds
+
+
+def _save_tests(data: dict[str, pd.DataFrame],
+                folder: Path,
+                data_format: str) -> None:
+  """Saves the data of each test to a file named after the test, in the given
+  folder and with the given format."""
+
+  folder.mkdir(parents=True, exist_ok=True)
+  for name, test_data in data.items():
+    path = folder / f'{name}.{data_format}'
+    print(f"Writing {path.absolute()}")
+    write_data(test_data, path)
+
+
+def _save_table(table: pd.DataFrame, path: Path) -> None:
+  """Saves a table of results to the given .csv file."""
+
+  path.parent.mkdir(parents=True, exist_ok=True)
+  print(f"Writing {path.absolute()}")
+  table.to_csv(path, index=False)
+
+
+def _index_table(nrs: list[int],
+                 index: list[tuple[int, int, float, float]]) -> pd.DataFrame:
+  """Builds the trimming index table from the trimming index of each test."""
+
+  return pd.DataFrame({identifier_field: nrs,
+                       start_index_field: [row[0] for row in index],
+                       stop_index_field: [row[1] for row in index],
+                       extension_scale_field: [row[2] for row in index],
+                       stress_offset_field: [row[3] for row in index]})
+
+
+def _cached(function: Callable[..., Any],
+            cache: Optional[ResultCache]) -> Callable[..., Any]:
+  """Wraps the function so that its results are looked up in the cache, if
+  one is given."""
+
+  return CachedFunction(function, cache) if cache is not None else function
+
+
+def run_pipeline(test_folders: list[Path],
+                 effort_file_name: str,
+                 position_file_name: str,
+                 data_format: str,
+                 notes_file: Path,
+                 smooth_folder: Path,
+                 stress_strain_folder: Path,
+                 end_trimmed_folder: Path,
+                 trimmed_folder: Path,
+                 trimmed_fit_folder: Path,
+                 end_file: Path,
+                 peak_index_file: Path,
+                 begin_file: Path,
+                 end_fit_file: Path,
+                 ultimate_strength_file: Path,
+                 extensibility_file: Path,
+                 yeoh_file: Path,
+                 tangent_moduli_file: Path,
+                 bootstrap_file: Path,
+                 results_file: Path,
+                 nb_points_smooth: int,
+                 use_second_dev_begin: bool,
+                 stress_threshold: float,
+                 sec_dev_thresh: float,
+                 use_second_dev_end: bool,
+                 nb_points_smooth_end: int,
+                 peak_prominence: float,
+                 nb_points_peak: int,
+                 young_threshold: float,
+                 hyper_threshold: float,
+                 nb_resamples: int,
+                 confidence: float,
+                 seed: int,
+                 jobs: int = 1,
+                 index_files: Optional[tuple[Path, Path, Path]] = None,
+                 cache: Optional[ResultCache] = None,
+                 yeoh_order: int = 2,
+                 yeoh_positive: bool = False) -> pd.DataFrame:
+  """Runs all the processing stages on the given tests, and writes the
+  intermediate and final files.
+
+  The stages are run one after the other over all the tests, in the same order
+  as in the Makefile, so that the modification times of the written files are
+  consistent with the dependencies declared in the Makefile.
+
+  Args:
+    test_folders: The folders containing the raw data of each test.
+    effort_file_name: The name of the raw effort data files.
+    position_file_name: The name of the raw position data files.
+    data_format: The format of the intermediate data files of each test, as
+      their file extension.
+    notes_file: The .csv file containing the metadata of the tests.
+    smooth_folder: The folder where to write the smoothened data.
+    stress_strain_folder: The folder where to write the stress-strain data.
+    end_trimmed_folder: The folder where to write the end-trimmed
+      stress-strain data.
+    trimmed_folder: The folder where to write the trimmed stress-strain data.
+    trimmed_fit_folder: The folder where to write the stress-strain data valid
+      for the Yeoh fit.
+    end_file: The .csv file where to write the end extensions.
+    peak_index_file: The .npz file where to write the indices of the stress
+      peaks.
+    begin_file: The .csv file where to write the begin extensions.
+    end_fit_file: The .csv file where to write the end extensions for the fit.
+    ultimate_strength_file: The .csv file where to write the ultimate
+      strengths.
+    extensibility_file: The .csv file where to write the extensibilities.
+    yeoh_file: The .csv file where to write the Yeoh coefficients.
+    tangent_moduli_file: The .csv file where to write the tangent moduli.
+    bootstrap_file: The .csv file where to write the confidence intervals of
+      the Yeoh coefficients and of the tangent moduli.
+    results_file: The .csv file where to write the final results.
+    nb_points_smooth: The number of points of the Savitzky-Golay filter for
+      smoothening the raw effort data.
+    use_second_dev_begin: Whether to use the second derivative method for
+      detecting the begin extension.
+    stress_threshold: The fraction of the total stress used by the stress
+      threshold method for detecting the begin extension.
+    sec_dev_thresh: The fraction of the maximum second derivative used by the
+      second derivative method for detecting the begin extension.
+    use_second_dev_end: Whether to use the second derivative method for
+      detecting the end extension for the fit.
+    nb_points_smooth_end: The number of points of the Savitzky-Golay filter
+      for detecting the end extension for the fit.
+    peak_prominence: The minimum fraction of the stress range above which a
+      local stress peak is considered as the end of the valid data.
+    nb_points_peak: The maximum width, in samples, of the stress peaks.
+    young_threshold: The fraction of the extension range over which the
+      Young's modulus is computed.
+    hyper_threshold: The fraction of the extension range over which the
+      hyperelastic modulus is computed.
+    nb_resamples: The number of bootstrap resamples drawn for each test.
+    confidence: The confidence level of the bootstrap intervals.
+    seed: The seed of the random generator used for bootstrapping.
+    jobs: The number of processes over which to distribute the most expensive
+      processing stages.
+    index_files: If given, the .csv files where to write the trimming index of
+      the end, begin and end fit trimming stages. The trimmed data files are
+      then not written, and the trimmed folders are ignored.
+    cache: If given, the results of the most expensive processing stages are
+      looked up in this cache, and only computed for the tests whose data or
+      parameters changed.
+    yeoh_order: The number of terms of the Yeoh model to fit.
+    yeoh_positive: Whether to constrain all the Yeoh coefficients to be
+      positive, in which case the fit of each test starts from the closest of
+      its linear solution and of the median solution of its condition.
+
+  Returns:
+    The DataFrame containing the final results.
+  """
+
+  # Sorting the tests according to their number
+  test_folders = sorted(test_folders, key=get_nr)
+  names = {folder.name: get_nr(folder) for folder in test_folders}
+  nrs = list(names.values())
+  notes = pd.read_csv(notes_file)
+
+  # A single pool of processes is shared by all the stages, if requested
+  with (ProcessPoolExecutor(max_workers=jobs) if jobs > 1
+        else nullcontext()) as executor:
+
+    # Smoothening the raw data, and copying the already smooth position data
+    smooth_effort = dict(zip(names, parallel_map(
+      _cached(smooth_data, cache),
+      map(read_data, (folder / effort_file_name for folder in test_folders)),
+      repeat(nb_points_smooth), executor=executor)))
+    position = dict()
+    for folder in test_folders:
+      effort_path = (smooth_folder / folder.name /
+                     Path(effort_file_name).with_suffix(f'.{data_format}'))
+      position_path = (smooth_folder / folder.name /
+                       Path(position_file_name).with_suffix(f'.{data_format}'))
+      effort_path.parent.mkdir(parents=True, exist_ok=True)
+
+      print(f"Writing {effort_path.absolute()}")
+      write_data(smooth_effort[folder.name], effort_path)
+
+      # The position data is copied as is if no conversion is needed
+      print(f"Writing {position_path.absolute()}")
+      position[folder.name] = read_data(folder / position_file_name)
+      if position_path.suffix == Path(position_file_name).suffix:
+        copyfile(folder / position_file_name, position_path)
+      else:
+        write_data(position[folder.name], position_path)
+
+    # Computing the stress and the extension
+    stress_strain = {name: compute_stress_strain(position.pop(name),
+                                                 smooth_effort.pop(name),
+                                                 notes, nr)
+                     for name, nr in names.items()}
+    _save_tests(stress_strain, stress_strain_folder, data_format)
+
+    # Detecting the end of the valid data and trimming it
+    ends = [detect_end(stress_strain[name]) for name in names]
+    end_table = pd.DataFrame({identifier_field: nrs, end_field: ends})
+    _save_table(end_table, end_file)
+    if index_files is None:
+      end_trimmed = {name: trim_end(stress_strain[name], end)
+                     for name, end in zip(names, ends)}
+      _save_tests(end_trimmed, end_trimmed_folder, data_format)
+    else:
+      end_index = [compute_trim_index(stress_strain[name], end, 'end')
+                   for name, end in zip(names, ends)]
+      _save_table(_index_table(nrs, end_index), index_files[0])
+      end_trimmed = {name: trim_view(stress_strain[name], *row)
+                     for name, row in zip(names, end_index)}
+
+    # Indexing the stress peaks once for detecting the begin and the end fit
+    peaks = parallel_map(_cached(index_peaks, cache), end_trimmed.values(),
+                         executor=executor)
+    peak_index_file.parent.mkdir(parents=True, exist_ok=True)
+    print(f"Writing {peak_index_file.absolute()}")
+    save_peak_indices(dict(zip(nrs, peaks)), peak_index_file)
+
+    # Detecting the beginning of the valid data and trimming it
+    begins = parallel_map(_cached(detect_begin, cache), end_trimmed.values(),
+                          repeat(use_second_dev_begin),
+                          repeat(stress_threshold), repeat(sec_dev_thresh),
+                          repeat(peak_prominence), repeat(nb_points_peak),
+                          peaks, executor=executor)
+    begin_table = pd.DataFrame({identifier_field: nrs, begin_field: begins})
+    _save_table(begin_table, begin_file)
+    if index_files is None:
+      trimmed = {name: trim_begin(end_trimmed.pop(name), begin)
+                 for name, begin in zip(names, begins)}
+      _save_tests(trimmed, trimmed_folder, data_format)
+    else:
+      trim_index = [compute_trim_index(end_trimmed.pop(name), begin, 'begin',
+                                       row[0], row[2], row[3])
+                    for name, begin, row in zip(names, begins, end_index)]
+      _save_table(_index_table(nrs, trim_index), index_files[1])
+      trimmed = {name: trim_view(stress_strain[name], *row)
+                 for name, row in zip(names, trim_index)}
+
+    # Computing the ultimate strength and the extensibility in one pass
+    features = [compute_features(trimmed[name]) for name in names]
+    strengths = [feature.ultimate_strength for feature in features]
+    strength_table = pd.DataFrame({identifier_field: nrs,
+                                   ultimate_strength_field: strengths})
+    _save_table(strength_table, ultimate_strength_file)
+    extensibility_table = pd.DataFrame(
+      {identifier_field: nrs,
+       extensibility_field: [feature.extensibility for feature in features]})
+    _save_table(extensibility_table, extensibility_file)
+
+    # Detecting the end of the data valid for the fit and trimming it
+    ends_fit = parallel_map(_cached(detect_end_fit, cache), trimmed.values(),
+                            strengths,
+                            repeat(use_second_dev_end),
+                            repeat(nb_points_smooth_end),
+                            repeat(peak_prominence), repeat(nb_points_peak),
+                            peaks, executor=executor)
+    end_fit_table = pd.DataFrame({identifier_field: nrs,
+                                  end_fit_field: ends_fit})
+    _save_table(end_fit_table, end_fit_file)
+    if index_files is None:
+      trimmed_fit = {name: trim_end_fit(trimmed.pop(name), end)
+                     for name, end in zip(names, ends_fit)}
+      _save_tests(trimmed_fit, trimmed_fit_folder, data_format)
+    else:
+      fit_index = [compute_trim_index(trimmed.pop(name), end, 'end_fit',
+                                      row[0], row[2], row[3])
+                   for name, end, row in zip(names, ends_fit, trim_index)]
+      _save_table(_index_table(nrs, fit_index), index_files[2])
+      trimmed_fit = {name: trim_view(stress_strain[name], *row)
+                     for name, row in zip(names, fit_index)}
+
+    # Fitting the Yeoh model to all the tests at once
+    yeoh_bounds = positive_bounds(yeoh_order) if yeoh_positive else None
+    normal = parallel_map(_cached(yeoh_normal, cache), trimmed_fit.values(),
+                          repeat(yeoh_order), executor=executor)
+    yeoh = fit_yeoh_tests(normal, nrs, notes, yeoh_bounds, yeoh_order)
+    yeoh_table = pd.DataFrame({identifier_field: nrs,
+                               **dict(zip(yeoh_fields, yeoh.T))})
+    _save_table(yeoh_table, yeoh_file)
+
+    # Computing the tangent moduli
+    moduli = parallel_map(_cached(compute_tangent_moduli, cache),
+                          trimmed_fit.values(),
+                          repeat(young_threshold), repeat(hyper_threshold),
+                          executor=executor)
+    moduli_table = pd.DataFrame(
+      {identifier_field: nrs,
+       young_modulus_field: [modulus[0] for modulus in moduli],
+       hyperelastic_offset_field: [modulus[1] for modulus in moduli],
+       hyperelastic_modulus_field: [modulus[2] for modulus in moduli]})
+    _save_table(moduli_table, tangent_moduli_file)
+
+    # Estimating the confidence intervals by bootstrapping
+    intervals = parallel_map(_cached(bootstrap_test, cache),
+                             trimmed_fit.values(),
+                             repeat(young_threshold), repeat(hyper_threshold),
+                             repeat(nb_resamples), repeat(confidence),
+                             repeat(seed), nrs, repeat(yeoh_order),
+                             repeat(yeoh_bounds), executor=executor)
+    bootstrap_table = pd.DataFrame(intervals,
+                                   columns=interval_fields(yeoh_order))
+    bootstrap_table.insert(0, identifier_field, nrs)
+    _save_table(bootstrap_table, bootstrap_file)
+
+  # Aggregating all the results into the final results file
+  results = aggregate_results(notes, end_table, begin_table, end_fit_table,
+                              strength_table, extensibility_table, yeoh_table,
+                              moduli_table, bootstrap_table)
+  _save_table(results, results_file)
+
+  return results
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Runs the entire processing chain on the raw data of the "
+                "source tests in a single process, and writes the same "
+                "intermediate and results files as the Makefile.")
+  parser.add_argument('nb_points_smooth', type=int, nargs=1,
+                      help="The number of points to use for the Savitzky-Golay"
+                           " filter smoothening the raw effort data.")
+  parser.add_argument('use_second_derivative_begin', type=str, nargs=1,
+                      help="Boolean indicating whether to use the second "
+                           "derivative method for detecting the minimum "
+                           "extension. Otherwise, the stress threshold method "
+                           "is used.")
+  parser.add_argument('stress_threshold', type=float, nargs=1,
+                      help="The percentage of the total stress below which the"
+                           " data is not considered valid. Only used with the "
+                           "stress threshold method.")
+  parser.add_argument('second_derivative_threshold', type=float, nargs=1,
+                      help="The percentage of the maximum second derivative "
+                           "value below which the data is not considered "
+                           "valid. Only used with the second derivative "
+                           "method.")
+  parser.add_argument('use_second_derivative_end', type=str, nargs=1,
+                      help="Boolean indicating whether to use the second "
+                           "derivative method for detecting the maximum "
+                           "extension for the fit. Otherwise, the maximum of "
+                           "the first derivative is used.")
+  parser.add_argument('nb_points_smooth_end', type=int, nargs=1,
+                      help="Number of points to use for running the "
+                           "Savitzky-Golay filter for smoothening the first "
+                           "derivative of the stress.")
+  parser.add_argument('peak_prominence', type=float, nargs=1,
+                      help="Minimum percentage of the total stress range in "
+                           "the test above which a local stress peak will "
+                           "be considered as the end of the valid data.")
+  parser.add_argument('nb_points_peak', type=int, nargs=1,
+                      help="Maximum width, in samples, of stress peaks to "
+                           "consider for selecting the end cutoff extension.")
+  parser.add_argument('young_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the Young's modulus should be computed.")
+  parser.add_argument('hyperelastic_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the hyperelastic modulus should be "
+                           "computed.")
+  parser.add_argument('nb_resamples', type=checker_positive_int, nargs=1,
+                      help="The number of bootstrap resamples to draw for "
+                           "each test.")
+  parser.add_argument('confidence_level', type=checker_percentage, nargs=1,
+                      help="The confidence level of the bootstrap intervals, "
+                           "as a percentage.")
+  parser.add_argument('seed', type=int, nargs=1,
+                      help="The seed of the random generator used for "
+                           "bootstrapping.")
+  parser.add_argument('effort_file_name', type=str, nargs=1,
+                      help="Name of the raw effort data file in each test "
+                           "folder.")
+  parser.add_argument('position_file_name', type=str, nargs=1,
+                      help="Name of the raw position data file in each test "
+                           "folder.")
+  parser.add_argument('data_format', type=str, nargs=1, choices=data_formats,
+                      help="Format of the intermediate data files of each "
+                           "test, given as their file extension.")
+  parser.add_argument('notes_file', type=checker_valid_csv, nargs=1,
+                      help="Path to the .csv file containing the metadata "
+                           "collected during the tests.")
+  parser.add_argument('smooth_folder', type=Path, nargs=1,
+                      help="Path to the folder where to store the smoothened "
+                           "data.")
+  parser.add_argument('stress_strain_folder', type=Path, nargs=1,
+                      help="Path to the folder where to store the "
+                           "stress-strain data.")
+  parser.add_argument('end_trimmed_folder', type=Path, nargs=1,
+                      help="Path to the folder where to store the end-trimmed "
+                           "stress-strain data.")
+  parser.add_argument('trimmed_folder', type=Path, nargs=1,
+                      help="Path to the folder where to store the trimmed "
+                           "stress-strain data.")
+  parser.add_argument('trimmed_fit_folder', type=Path, nargs=1,
+                      help="Path to the folder where to store the "
+                           "stress-strain data valid for the Yeoh fit.")
+  parser.add_argument('end_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the end "
+                           "extension data.")
+  parser.add_argument('peak_index_file', type=Path, nargs=1,
+                      help="Path to the .npz file where to store the indices "
+                           "of the stress peaks.")
+  parser.add_argument('begin_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the begin "
+                           "extension data.")
+  parser.add_argument('end_fit_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the end "
+                           "extension data for a fit with Yeoh.")
+  parser.add_argument('ultimate_strength_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the "
+                           "ultimate strength data.")
+  parser.add_argument('extensibility_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the "
+                           "extensibility data.")
+  parser.add_argument('yeoh_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the Yeoh "
+                           "coefficients.")
+  parser.add_argument('tangent_moduli_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the tangent "
+                           "moduli coefficients.")
+  parser.add_argument('bootstrap_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the bounds "
+                           "of the bootstrap confidence intervals.")
+  parser.add_argument('results_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where all the data should be"
+                           " aggregated.")
+  parser.add_argument('test_folders', type=Path, nargs='+',
+                      help="Paths to the folders containing the raw data of "
+                           "each test.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "tests in parallel.")
+  parser.add_argument('--index_files', type=checker_is_csv, nargs=3,
+                      default=None,
+                      help="Paths to the .csv files where to store the "
+                           "trimming index of the end, begin and end fit "
+                           "trimming stages. If given, the trimmed data files"
+                           " are not written.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results of "
+                           "the most expensive processing stages, so that "
+                           "they are only computed again if the data or the "
+                           "parameters change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--yeoh_order', type=int, default=2,
+                      choices=range(2, len(yeoh_fields) + 1),
+                      help="Number of terms of the Yeoh model to fit.")
+  parser.add_argument('--yeoh_positive', action='store_true',
+                      help="If given, constrains all the Yeoh coefficients to "
+                           "be positive.")
+  args = parser.parse_args()
+
+  run_pipeline(
+    test_folders=args.test_folders,
+    effort_file_name=args.effort_file_name[0],
+    position_file_name=args.position_file_name[0],
+    data_format=args.data_format[0],
+    notes_file=args.notes_file[0],
+    smooth_folder=args.smooth_folder[0],
+    stress_strain_folder=args.stress_strain_folder[0],
+    end_trimmed_folder=args.end_trimmed_folder[0],
+    trimmed_folder=args.trimmed_folder[0],
+    trimmed_fit_folder=args.trimmed_fit_folder[0],
+    end_file=args.end_file[0],
+    peak_index_file=args.peak_index_file[0],
+    begin_file=args.begin_file[0],
+    end_fit_file=args.end_fit_file[0],
+    ultimate_strength_file=args.ultimate_strength_file[0],
+    extensibility_file=args.extensibility_file[0],
+    yeoh_file=args.yeoh_file[0],
+    tangent_moduli_file=args.tangent_moduli_file[0],
+    bootstrap_file=args.bootstrap_file[0],
+    results_file=args.results_file[0],
+    nb_points_smooth=args.nb_points_smooth[0],
+    use_second_dev_begin=args.use_second_derivative_begin[0] == 'true',
+    stress_threshold=args.stress_threshold[0] / 100,
+    sec_dev_thresh=args.second_derivative_threshold[0] / 100,
+    use_second_dev_end=args.use_second_derivative_end[0] == 'true',
+    nb_points_smooth_end=args.nb_points_smooth_end[0],
+    peak_prominence=args.peak_prominence[0] / 100,
+    nb_points_peak=args.nb_points_peak[0],
+    young_threshold=args.young_threshold[0] / 100,
+    hyper_threshold=args.hyperelastic_threshold[0] / 100,
+    nb_resamples=args.nb_resamples[0],
+    confidence=args.confidence_level[0] / 100,
+    seed=args.seed[0],
+    jobs=args.jobs,
+    index_files=(tuple(args.index_files) if args.index_files is not None
+                 else None),
+    cache=(ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None),
+    yeoh_order=args.yeoh_order,
+    yeoh_positive=args.yeoh_positive)
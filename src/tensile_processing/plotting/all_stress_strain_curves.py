@@ -9,10 +9,14 @@ from matplotlib import pyplot as plt
 import pandas as pd
 from itertools import cycle
 
-from ..tools.argparse_checkers import checker_is_tiff, checker_valid_csv
+from .decimate import decimate, nb_pixels
+from ..tools.argparse_checkers import checker_is_tiff, checker_valid_csv, \
+  checker_valid_data
 from ..tools.fields import identifier_field, type_field, condition_field, \
   extension_field, stress_field
 from ..tools.get_nr import get_nr
+from ..tools.profiling import profile_stage
+from ..tools.views import read_trimmed
 
 if __name__ == '__main__':
 
@@ -27,15 +31,26 @@ if __name__ == '__main__':
   parser.add_argument('destination_file', type=checker_is_tiff, nargs=1,
                       help="Path where the generated .tiff image should be "
                            "saved.")
-  parser.add_argument('source_files', type=checker_valid_csv, nargs='+',
-                      help='Paths to the .csv files containing the data to '
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help='Paths to the data files containing the data to '
                            'plot.')
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the stress-strain data, in case "
+                           "it is not already trimmed.")
+  parser.add_argument('--decimate', action='store_true',
+                      help="Decimates the curves to about two points per pixel "
+                           "before plotting them, keeping their extremal "
+                           "values.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
   notes_file = args.notes_file[0]
   destination = args.destination_file[0]
   source_files = args.source_files
+  decimated = args.decimate
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
 
   # Extracting the metadata
   notes = pd.read_csv(notes_file)
@@ -48,25 +63,30 @@ if __name__ == '__main__':
 
   color_by_label = dict()
   for path in source_files:
-    # Extracting the data from the file
-    data = pd.read_csv(path)
-    test_nr = get_nr(path)
-    # Extracting data from the notes file
-    condition = notes[condition_field][notes[identifier_field] == test_nr]
-    type_ = notes[type_field][notes[identifier_field] == test_nr]
+    with profile_stage(path) as profile:
+      # Extracting the data from the file
+      data = read_trimmed(path, index)
+      profile['samples'] = len(data)
+      test_nr = get_nr(path)
+      # Extracting data from the notes file
+      condition = notes[condition_field][notes[identifier_field] == test_nr]
+      type_ = notes[type_field][notes[identifier_field] == test_nr]
 
-    # Getting the label associated to the file
-    label = f'{type_.values[0]} {condition.values[0]}'
-    # Getting the color for the current curve
-    if label not in color_by_label:
-      color = next(colors)
-      color_by_label[label] = color
-    else:
-      color = color_by_label[label]
+      # Getting the label associated to the file
+      label = f'{type_.values[0]} {condition.values[0]}'
+      # Getting the color for the current curve
+      if label not in color_by_label:
+        color = next(colors)
+        color_by_label[label] = color
+      else:
+        color = color_by_label[label]
 
-    # Plotting the data
-    ax.plot(data[extension_field].values, data[stress_field].values,
-            label=label, color=color)
+      # Plotting the data, possibly decimated
+      extension = data[extension_field].values
+      stress = data[stress_field].values
+      if decimated:
+        extension, stress = decimate(extension, stress, nb_pixels(fig, 300))
+      ax.plot(extension, stress, label=label, color=color)
 
   # Setting the axes labels and the title
   ax.set_title(f'All stress-strain curves\n'
@@ -0,0 +1,137 @@
+# coding: utf-8
+
+"""This script draws all the figures of a same kind in a single Python process,
+or over a pool of processes. Each process creates the figure only once, and
+then only replaces its data for drawing each test, which is much faster than
+running a plotting script for each test."""
+
+import argparse
+from functools import partial
+import pandas as pd
+
+from .begin_end_curve import BeginEndFigure, get_cutoffs
+from .interpolated_curve import InterpolatedFigure
+from .moduli_curve import ModuliFigure
+from .save_curve import CurveFigure
+from .template import render_figures
+from ..tools.argparse_checkers import checker_is_tiff, checker_valid_csv, \
+  checker_valid_data, checker_positive_int
+from ..tools.fields import identifier_field, yeoh_fields, young_modulus_field, \
+  hyperelastic_modulus_field, hyperelastic_offset_field
+from ..tools.get_nr import get_nr
+from ..tools.storage import read_data
+from ..tools.views import read_trimmed
+
+
+def _get_value(table: pd.DataFrame, field: str, test_nr: int) -> float:
+  """Returns the value of the given field for the given test in a results
+  table."""
+
+  return float(table[field][table[identifier_field] == test_nr].iloc[0])
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Draws all the figures of a same kind at once, for all the "
+                "source files.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for drawing the figures"
+                           " in parallel.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the stress-strain data, in case "
+                           "it is not already trimmed.")
+  kinds = parser.add_subparsers(dest='kind', required=True,
+                                help="The kind of figures to draw.")
+
+  curve = kinds.add_parser(
+    'curve', help="Plots each column of data against the first one.")
+  begin_end = kinds.add_parser(
+    'begin_end', help="Plots the stress-strain data and highlights the valid "
+                      "data as defined in the begin and end files.")
+  begin_end.add_argument('begin_file', type=checker_valid_csv, nargs=1,
+                         help="Path to the .csv file containing the minimum "
+                              "extension of the valid data.")
+  begin_end.add_argument('end_fit_file', type=checker_valid_csv, nargs=1,
+                         help="Path to the .csv file containing the maximum "
+                              "extension of the valid data.")
+  interpolated = kinds.add_parser(
+    'interpolated', help="Plots the stress-strain data and superimposes the "
+                         "stress predicted by Yeoh's model.")
+  interpolated.add_argument('yeoh_file', type=checker_valid_csv, nargs=1,
+                            help="Path to the .csv file containing the Yeoh "
+                                 "parameters.")
+  moduli = kinds.add_parser(
+    'moduli', help="Plots the stress-strain data and superimposes the lines "
+                   "corresponding to the tangent moduli.")
+  moduli.add_argument('young_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the Young's modulus was computed.")
+  moduli.add_argument('hyperelastic_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the hyperelastic modulus was computed.")
+  moduli.add_argument('tangent_moduli_file', type=checker_valid_csv, nargs=1,
+                      help="Path to the .csv file containing the parameters of"
+                           " the tangent moduli.")
+
+  for subparser in (curve, begin_end, interpolated, moduli):
+    subparser.add_argument('source_files', type=checker_valid_data,
+                           nargs='+', help="Paths to the data files containing"
+                                           " the data to plot.")
+    subparser.add_argument('--destination_files', type=checker_is_tiff,
+                           nargs='+', required=True,
+                           help="Paths where the generated .tiff images "
+                                "should be saved, in the same order as the "
+                                "source files.")
+  parser.add_argument('--decimate', action='store_true',
+                      help="Decimates the curves to about two points per pixel "
+                           "before plotting them, keeping their extremal "
+                           "values.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  sources = args.source_files
+  destinations = args.destination_files
+  jobs = args.jobs
+  decimate = args.decimate
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
+  if len(sources) != len(destinations):
+    parser.error("There must be as many destination files as source files !")
+  for destination in destinations:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+  # Getting the template figure and the arguments specific to each test
+  if args.kind == 'curve':
+    template, reader = CurveFigure, read_data
+    params = [() for _ in sources]
+
+  elif args.kind == 'begin_end':
+    template, reader = BeginEndFigure, read_data
+    begins = pd.read_csv(args.begin_file[0], float_precision='round_trip')
+    ends = pd.read_csv(args.end_fit_file[0], float_precision='round_trip')
+    params = [get_cutoffs(begins, ends, get_nr(path)) for path in sources]
+
+  elif args.kind == 'interpolated':
+    template, reader = InterpolatedFigure, partial(read_trimmed, index=index)
+    yeoh_table = pd.read_csv(args.yeoh_file[0], float_precision='round_trip')
+    params = [tuple(_get_value(yeoh_table, field, get_nr(path))
+                    for field in yeoh_fields if field in yeoh_table.columns)
+              for path in sources]
+
+  else:
+    template, reader = ModuliFigure, partial(read_trimmed, index=index)
+    table = pd.read_csv(args.tangent_moduli_file[0])
+    young_threshold = args.young_threshold[0] / 100
+    hyper_threshold = args.hyperelastic_threshold[0] / 100
+    params = [(_get_value(table, young_modulus_field, get_nr(path)),
+               _get_value(table, hyperelastic_modulus_field, get_nr(path)),
+               _get_value(table, hyperelastic_offset_field, get_nr(path)),
+               young_threshold, hyper_threshold) for path in sources]
+
+  # Drawing and saving all the figures
+  render_figures(partial(template, decimate=decimate), reader,
+                 [(destination, source, *param) for destination, source, param
+                  in zip(destinations, sources, params)], jobs=jobs)
@@ -6,13 +6,90 @@ stress-strain curve, along with vertical lines indicating the beginning and end
 cutoffs, and saves the curve to the specified location."""
 
 import argparse
-from matplotlib import pyplot as plt
 import pandas as pd
 
-from ..tools.argparse_checkers import checker_is_tiff, checker_valid_csv
+from .template import FigureTemplate
+
+from ..tools.argparse_checkers import checker_is_tiff, checker_valid_csv, \
+  checker_valid_data
 from ..tools.fields import identifier_field, begin_field, end_fit_field, \
   extension_field, stress_field
 from ..tools.get_nr import get_nr
+from ..tools.profiling import profile_stage
+from ..tools.storage import read_data
+
+
+def get_cutoffs(begins: pd.DataFrame,
+                ends: pd.DataFrame,
+                test_nr: int) -> tuple[float, float]:
+  """Returns the begin and end cutoff extensions of a test, both in the
+  original extension basis.
+
+  Args:
+    begins: The DataFrame containing the begin extension of all the tests.
+    ends: The DataFrame containing the end fit extension of all the tests.
+    test_nr: The number of the test whose cutoffs to return.
+
+  Returns:
+    The begin and the end cutoff extensions.
+  """
+
+  begin = float(begins[begin_field]
+                [begins[identifier_field] == test_nr].iloc[0])
+  end = float(ends[end_fit_field][ends[identifier_field] == test_nr].iloc[0])
+
+  # The end cutoff is calculated in an already re-interpolated extension basis
+  # It needs to be multiplied by the beginning cutoff to obtain the end cutoff
+  # value in the original extension basis, which is needed for display
+  return begin, end * begin
+
+
+class BeginEndFigure(FigureTemplate):
+  """Figure plotting the stress-strain curve, with the data outside of the
+  begin and end cutoffs greyed out and vertical lines at the cutoffs."""
+
+  def __init__(self, decimate: bool = False) -> None:
+    """Creates the lines and the axes labels of the figure.
+
+    Args:
+      decimate: If True, the curves are decimated before being drawn.
+    """
+
+    super().__init__(decimate)
+    self.ax = self.figure.add_subplot()
+    # Line of the valid data
+    self.lines.extend(self.ax.plot([], []))
+    self.begin_line = self.ax.axvline(x=0, color='k')
+    # Line of the data before the begin cutoff
+    self.lines.extend(self.ax.plot([], [], color='#888888'))
+    self.end_line = self.ax.axvline(x=0, color='k')
+    # Line of the data after the end cutoff
+    self.lines.extend(self.ax.plot([], [], color='#888888'))
+    self.ax.set_xlabel(extension_field)
+    self.ax.set_ylabel(stress_field)
+
+  def draw(self, data: pd.DataFrame, begin: float, end: float) -> None:
+    """Replaces the plotted stress-strain data and cutoffs.
+
+    Args:
+      data: The DataFrame containing the stress-strain data.
+      begin: The begin cutoff extension.
+      end: The end cutoff extension, in the original extension basis.
+    """
+
+    # Dividing data into three categories
+    before = data[data[extension_field] < begin]
+    after = data[data[extension_field] > end]
+    valid = data[(data[extension_field] >= begin) &
+                 (data[extension_field] <= end)]
+
+    for line, part in zip(self.lines, (valid, before, after)):
+      line.set_data(*self.reduce(part[extension_field].values,
+                                 part[stress_field].values))
+    self.begin_line.set_xdata([begin, begin])
+    self.end_line.set_xdata([end, end])
+    self.rescale(self.ax)
+
 
 if __name__ == '__main__':
 
@@ -24,8 +101,8 @@ if __name__ == '__main__':
   parser.add_argument('destination_file', type=checker_is_tiff, nargs=1,
                       help="Path where the generated .tiff image should be "
                            "saved.")
-  parser.add_argument('source_file', type=checker_valid_csv, nargs=1,
-                      help="Path to the .csv file containing the stress-strain"
+  parser.add_argument('source_file', type=checker_valid_data, nargs=1,
+                      help="Path to the data file containing the stress-strain"
                            " data to plot.")
   parser.add_argument('begin_file', type=checker_valid_csv, nargs=1,
                       help="Path to the .csv file containing the minimum "
@@ -33,49 +110,31 @@ if __name__ == '__main__':
   parser.add_argument('end_fit_file', type=checker_valid_csv, nargs=1,
                       help="Path to the .csv file containing the maximum "
                            "extension of the valid data.")
+  parser.add_argument('--decimate', action='store_true',
+                      help="Decimates the curves to about two points per pixel "
+                           "before plotting them, keeping their extremal "
+                           "values.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
   destination = args.destination_file[0]
+  decimate = args.decimate
   source = args.source_file[0]
   begin_file = args.begin_file[0]
   end_fit_file = args.end_fit_file[0]
 
-  # Extracting data from the source file
-  test_nr = get_nr(source)
-  data = pd.read_csv(source)
+  with profile_stage(source, BeginEndFigure.__name__) as profile:
+    # Extracting data from the source file
+    test_nr = get_nr(source)
+    data = read_data(source)
+    profile['samples'] = len(data)
 
-  # Extracting the beginning and end timestamps
-  begins = pd.read_csv(begin_file)
-  begin = float(begins[begin_field]
-                [begins[identifier_field] == test_nr].iloc[0])
-  ends = pd.read_csv(end_fit_file)
-  end = float(ends[end_fit_field][ends[identifier_field] == test_nr].iloc[0])
+    # Extracting the beginning and end timestamps
+    begin, end = get_cutoffs(
+      pd.read_csv(begin_file, float_precision='round_trip'),
+      pd.read_csv(end_fit_file, float_precision='round_trip'), test_nr)
 
-  # The end cutoff is calculated in an already re-interpolated extension basis
-  # It needs to be multiplied by the beginning cutoff to obtain the end cutoff
-  # value in the original extension basis, which is needed for display
-  end *= begin
-
-  # Dividing data into three categories
-  before = data[data[extension_field] < begin]
-  after = data[data[extension_field] > end]
-  valid = data[(data[extension_field] >= begin) &
-               (data[extension_field] <= end)]
-
-  # Drawing the figure
-  fig = plt.figure()
-  ax = plt.subplot()
-  # Drawing the valid data
-  ax.plot(valid[extension_field], valid[stress_field])
-  ax.axvline(x=begin, color='k')
-  # Drawing the data before the begin cutoff
-  ax.plot(before[extension_field].values, before[stress_field].values,
-          color='#888888')
-  ax.axvline(x=end, color='k')
-  # Drawing the data after the end cutoff
-  ax.plot(after[extension_field], after[stress_field], color='#888888')
-  # Setting the axes labels and saving the figure
-  ax.set_xlabel(extension_field)
-  ax.set_ylabel(stress_field)
-  plt.savefig(destination, dpi=300)
+    # Drawing the figure and saving it
+    figure = BeginEndFigure(decimate)
+    figure.draw(data, begin, end)
+    figure.save(destination)
@@ -0,0 +1,61 @@
+# coding: utf-8
+
+"""This file contains the functions for reducing the number of points of very
+long curves before plotting them, without visibly altering the drawn curves."""
+
+import numpy as np
+from matplotlib.figure import Figure
+
+
+def nb_pixels(figure: Figure, dpi: float) -> int:
+  """Returns the width in pixels of the given figure once saved with the given
+  resolution, which bounds the number of distinct abscissas of a drawn curve.
+  """
+
+  return max(int(figure.get_figwidth() * dpi), 1)
+
+
+def decimate(x: np.ndarray,
+             y: np.ndarray,
+             nb_bins: int) -> tuple[np.ndarray, np.ndarray]:
+  """Reduces the number of points of a curve, while preserving its envelope.
+
+  The points are split in consecutive bins of equal size, and only the points
+  with the minimum and maximum ordinates are kept in each bin, along with the
+  first and last points of the curve. With one bin per pixel, the drawn curve
+  looks the same as with all the points, and its extremal values such as the
+  ultimate strength are kept exactly.
+
+  Args:
+    x: The abscissas of the points of the curve.
+    y: The ordinates of the points of the curve.
+    nb_bins: The number of bins to split the points in, usually the width of
+      the figure in pixels.
+
+  Returns:
+    The abscissas and the ordinates of the kept points, in their original
+    order.
+  """
+
+  x, y = np.asarray(x), np.asarray(y)
+  size = y.size
+  if size <= 2 * nb_bins:
+    return x, y
+
+  # Finding the extrema in all the complete bins at once
+  bin_size = -(-size // nb_bins)
+  nb_full = size // bin_size
+  bins = y[:nb_full * bin_size].reshape(nb_full, bin_size)
+  offsets = np.arange(nb_full) * bin_size
+  indices = [np.array([0, size - 1]),
+             np.argmin(bins, axis=1) + offsets,
+             np.argmax(bins, axis=1) + offsets]
+
+  # Handling the last incomplete bin, if any
+  if nb_full * bin_size < size:
+    tail = y[nb_full * bin_size:]
+    indices.append(np.array([np.argmin(tail), np.argmax(tail)]) +
+                   nb_full * bin_size)
+
+  kept = np.unique(np.concatenate(indices))
+  return x[kept], y[kept]
@@ -6,14 +6,58 @@ the stress predicted by Yeoh's model, and saves the curve to the specified
 location."""
 
 import argparse
-from matplotlib import pyplot as plt
 import pandas as pd
 
-from ..tools.argparse_checkers import checker_is_tiff, checker_valid_csv
-from ..tools.yeoh_model import yeoh_2
-from ..tools.fields import identifier_field, yeoh_0_field, yeoh_1_field, \
-  extension_field, stress_field
+from .template import FigureTemplate
+
+from ..tools.argparse_checkers import checker_is_tiff, checker_valid_csv, \
+  checker_valid_data
+from ..tools.yeoh_model import yeoh
+from ..tools.fields import identifier_field, yeoh_fields, extension_field, \
+  stress_field
 from ..tools.get_nr import get_nr
+from ..tools.profiling import profile_stage
+from ..tools.views import read_trimmed
+
+
+class InterpolatedFigure(FigureTemplate):
+  """Figure plotting the stress-strain curve, along with the stress predicted
+  by Yeoh's model."""
+
+  def __init__(self, decimate: bool = False) -> None:
+    """Creates the lines, the axes labels and the legend of the figure.
+
+    Args:
+      decimate: If True, the curves are decimated before being drawn.
+    """
+
+    super().__init__(decimate)
+    self.ax = self.figure.add_subplot()
+    # Line of the stress-strain data
+    self.lines.extend(self.ax.plot([], []))
+    # Line of the fitted curve
+    self.lines.extend(self.ax.plot([], [], '--k'))
+    self.ax.set_xlabel(extension_field)
+    self.ax.set_ylabel(stress_field)
+    self.ax.legend(['Raw data', 'Fitted curve'])
+
+  def draw(self, data: pd.DataFrame, *coefficients: float) -> None:
+    """Replaces the plotted stress-strain data and fitted curve.
+
+    Args:
+      data: The DataFrame containing the stress-strain data.
+      *coefficients: The coefficients of Yeoh's model, in increasing order.
+    """
+
+    extension, stress = self.reduce(data[extension_field].values,
+                                    data[stress_field].values)
+    # Calculating the stress with Yeoh's model
+    fitted = yeoh(extension, *coefficients)
+
+    self.lines[0].set_data(extension, stress)
+    self.lines[1].set_data(extension, fitted)
+    self.rescale(self.ax)
+
 
 if __name__ == '__main__':
 
@@ -26,40 +70,43 @@ if __name__ == '__main__':
   parser.add_argument('destination_file', type=checker_is_tiff, nargs=1,
                       help="Path where the generated .tiff image should be "
                            "saved.")
-  parser.add_argument('source_file', type=checker_valid_csv, nargs=1,
-                      help="Path to the .csv file containing the stress-strain"
+  parser.add_argument('source_file', type=checker_valid_data, nargs=1,
+                      help="Path to the data file containing the stress-strain"
                            " data to plot.")
   parser.add_argument('yeoh_file', type=checker_valid_csv, nargs=1,
                       help="Path to the .csv file containing the Yeoh "
                            "parameters.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the stress-strain data, in case "
+                           "it is not already trimmed.")
+  parser.add_argument('--decimate', action='store_true',
+                      help="Decimates the curves to about two points per pixel "
+                           "before plotting them, keeping their extremal "
+                           "values.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
   source = args.source_file[0]
   destination = args.destination_file[0]
+  decimate = args.decimate
   yeoh_file = args.yeoh_file[0]
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
+
+  with profile_stage(source, InterpolatedFigure.__name__) as profile:
+    # Loading data from the source file
+    test_nr = get_nr(source)
+    data = read_trimmed(source, index)
+    profile['samples'] = len(data)
+
+    # Reading data from the Yeoh parameter file
+    yeoh_table = pd.read_csv(yeoh_file, float_precision='round_trip')
+    row = yeoh_table[yeoh_table[identifier_field] == test_nr].iloc[0]
+    coefficients = [float(row[field]) for field in yeoh_fields
+                    if field in yeoh_table.columns]
 
-  # Loading data from the source file
-  test_nr = get_nr(source)
-  data = pd.read_csv(source)
-
-  # Reading data from the Yeoh parameter file
-  yeoh = pd.read_csv(yeoh_file)
-  c0 = float(yeoh[yeoh_0_field][yeoh[identifier_field] == test_nr].iloc[0])
-  c1 = float(yeoh[yeoh_1_field][yeoh[identifier_field] == test_nr].iloc[0])
-
-  # Calculating the stress with Yeoh's model
-  fitted = yeoh_2(data[extension_field].values, c0, c1)
-
-  # Drawing the figure
-  fig = plt.figure()
-  ax = plt.subplot()
-  # Drawing the stress-strain data
-  ax.plot(data[extension_field].values, data[stress_field].values)
-  # Drawing the fitted curve
-  ax.plot(data[extension_field].values, fitted, '--k')
-  # Adding the axes labels, the legend, and saving the figure
-  ax.set_xlabel(extension_field)
-  ax.set_ylabel(stress_field)
-  plt.legend(['Raw data', 'Fitted curve'])
-  plt.savefig(destination, dpi=300)
+    # Drawing the figure and saving it
+    figure = InterpolatedFigure(decimate)
+    figure.draw(data, *coefficients)
+    figure.save(destination)
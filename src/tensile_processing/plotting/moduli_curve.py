@@ -6,16 +6,87 @@ curve, along with the interpolation corresponding to the tangent moduli, and
 saves the curve to the specified location."""
 
 import argparse
-from matplotlib import pyplot as plt
 import numpy as np
 import pandas as pd
 
-from ..tools.argparse_checkers import checker_is_tiff, checker_valid_csv
+from .template import FigureTemplate
+
+from ..tools.argparse_checkers import checker_is_tiff, checker_valid_csv, \
+  checker_valid_data
 from ..tools.fields import identifier_field, \
   hyperelastic_offset_field as offset_field, \
   hyperelastic_modulus_field as hyper_field, \
   young_modulus_field as young_field, extension_field, stress_field
 from ..tools.get_nr import get_nr
+from ..tools.profiling import profile_stage
+from ..tools.views import read_trimmed
+
+
+class ModuliFigure(FigureTemplate):
+  """Figure plotting the stress-strain curve, along with the lines
+  corresponding to the Young's and hyperelastic moduli."""
+
+  def __init__(self, decimate: bool = False) -> None:
+    """Creates the lines, the axes labels and the legend of the figure.
+
+    Args:
+      decimate: If True, the curves are decimated before being drawn.
+    """
+
+    super().__init__(decimate)
+    self.ax = self.figure.add_subplot()
+    # Line of the stress-strain data
+    self.lines.extend(self.ax.plot([], []))
+    # Lines of the Young's and hyperelastic modulus interpolation
+    self.lines.extend(self.ax.plot([], [], '--k'))
+    self.lines.extend(self.ax.plot([], [], '--r'))
+    self.ax.set_xlabel(extension_field)
+    self.ax.set_ylabel(stress_field)
+    self.ax.legend(['Raw data', "Young's modulus", 'Hyperelastic modulus'])
+
+  def draw(self,
+           data: pd.DataFrame,
+           young: float,
+           hyper: float,
+           offset: float,
+           young_threshold: float,
+           hyper_threshold: float) -> None:
+    """Replaces the plotted stress-strain data and moduli lines.
+
+    Args:
+      data: The DataFrame containing the stress-strain data.
+      young: The Young's modulus.
+      hyper: The hyperelastic modulus.
+      offset: The offset of the hyperelastic modulus line.
+      young_threshold: The fraction of the total extension range over which
+        the Young's modulus was computed.
+      hyper_threshold: The fraction of the total extension range over which
+        the hyperelastic modulus was computed.
+    """
+
+    # Getting the extension range of the valid data
+    min_extenso = data[extension_field].min()
+    max_extenso = data[extension_field].max()
+    extent = max_extenso - min_extenso
+
+    # Generating the data for drawing the Young's modulus interpolation
+    young_curve = (
+      np.linspace(min_extenso, min_extenso + 3 * young_threshold * extent,
+                  100),
+      young * np.linspace(min_extenso - 1,
+                          min_extenso + 3 * young_threshold * extent - 1, 100))
+    # Generating the data for drawing the hyperelastic modulus interpolation
+    hyper_curve = (
+      np.linspace(max_extenso - 3 * hyper_threshold * extent, max_extenso,
+                  100),
+      offset + hyper * np.linspace(
+        max_extenso - 3 * hyper_threshold * extent, max_extenso, 100))
+
+    self.lines[0].set_data(*self.reduce(data[extension_field].values,
+                                        data[stress_field].values))
+    self.lines[1].set_data(*young_curve)
+    self.lines[2].set_data(*hyper_curve)
+    self.rescale(self.ax)
 
 if __name__ == '__main__':
 
@@ -34,60 +105,48 @@ if __name__ == '__main__':
   parser.add_argument('hyperelastic_threshold', type=float, nargs=1,
                       help="The percentage of the total extension range over "
                            "which the hyperelastic modulus was computed.")
-  parser.add_argument('source_file', type=checker_valid_csv, nargs=1,
-                      help="Path to the .csv file containing the stress-strain"
+  parser.add_argument('source_file', type=checker_valid_data, nargs=1,
+                      help="Path to the data file containing the stress-strain"
                            " data to plot.")
   parser.add_argument('tangent_moduli_file', type=checker_valid_csv, nargs=1,
                       help="Path to the .csv file containing the parameters of"
                            " the tangent moduli.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the stress-strain data, in case "
+                           "it is not already trimmed.")
+  parser.add_argument('--decimate', action='store_true',
+                      help="Decimates the curves to about two points per pixel "
+                           "before plotting them, keeping their extremal "
+                           "values.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
   source = args.source_file[0]
   destination = args.destination_file[0]
+  decimate = args.decimate
   moduli_file = args.tangent_moduli_file[0]
   young_threshold = args.young_threshold[0] / 100
   hyper_threshold = args.hyperelastic_threshold[0] / 100
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
+
+  with profile_stage(source, ModuliFigure.__name__) as profile:
+    # Loading data from the source file
+    test_nr = get_nr(source)
+    data = read_trimmed(source, index)
+    profile['samples'] = len(data)
+
+    # Reading data from the moduli file
+    moduli = pd.read_csv(moduli_file)
+    young = float(moduli[young_field]
+                  [moduli[identifier_field] == test_nr].iloc[0])
+    hyper = float(moduli[hyper_field]
+                  [moduli[identifier_field] == test_nr].iloc[0])
+    offset = float(moduli[offset_field]
+                   [moduli[identifier_field] == test_nr].iloc[0])
 
-  # Loading data from the source file
-  test_nr = get_nr(source)
-  data = pd.read_csv(source)
-
-  # Reading data from the moduli file
-  moduli = pd.read_csv(moduli_file)
-  young = float(moduli[young_field]
-                [moduli[identifier_field] == test_nr].iloc[0])
-  hyper = float(moduli[hyper_field]
-                [moduli[identifier_field] == test_nr].iloc[0])
-  offset = float(moduli[offset_field]
-                 [moduli[identifier_field] == test_nr].iloc[0])
-
-  # Getting the extension range of the valid data
-  min_extenso = data[extension_field].min()
-  max_extenso = data[extension_field].max()
-  extent = max_extenso - min_extenso
-
-  # Generating the data for drawing the Young's modulus interpolation
-  young_curve = (
-    np.linspace(min_extenso, min_extenso + 3 * young_threshold * extent, 100),
-    young * np.linspace(min_extenso - 1,
-                        min_extenso + 3 * young_threshold * extent - 1, 100))
-  # Generating the data for drawing the hyperelastic modulus interpolation
-  hyper_curve = (
-    np.linspace(max_extenso - 3 * hyper_threshold * extent, max_extenso, 100),
-    offset + hyper * np.linspace(
-      max_extenso - 3 * hyper_threshold * extent, max_extenso, 100))
-
-  # Drawing the figure
-  fig = plt.figure()
-  ax = plt.subplot()
-  # Drawing the stress-strain curve
-  ax.plot(data[extension_field].values, data[stress_field].values)
-  # Drawing the Young's and hyperelastic modulus interpolation
-  ax.plot(young_curve[0], young_curve[1], '--k')
-  ax.plot(hyper_curve[0], hyper_curve[1], '--r')
-  # Setting the labels, legend, and saving the figure
-  ax.set_xlabel(extension_field)
-  ax.set_ylabel(stress_field)
-  plt.legend(['Raw data', "Young's modulus", 'Hyperelastic modulus'])
-  plt.savefig(destination, dpi=300)
+    # Drawing the figure and saving it
+    figure = ModuliFigure(decimate)
+    figure.draw(data, young, hyper, offset, young_threshold, hyper_threshold)
+    figure.save(destination)
@@ -5,10 +5,40 @@ against the first column. The generated figure is then saved to the specified
 location."""
 
 import argparse
-from matplotlib import pyplot as plt
 import pandas as pd
 
-from ..tools import checker_is_tiff, checker_valid_csv
+from .template import FigureTemplate
+from ..tools import checker_is_tiff, checker_valid_data, read_data, \
+  profile_stage
+
+
+class CurveFigure(FigureTemplate):
+  """Figure plotting each column of data against the first one, in a separate
+  subplot."""
+
+  def draw(self, data: pd.DataFrame) -> None:
+    """Replaces the plotted data, and only creates new subplots if the number
+    of columns changed since the last drawing.
+
+    Args:
+      data: The DataFrame containing the data to plot.
+    """
+
+    # Creating one subplot and one line for each column except the first
+    if len(self.lines) != data.shape[1] - 1:
+      self.figure.clear()
+      self.lines = list()
+      for i in range(1, data.shape[1]):
+        ax = self.figure.add_subplot(data.shape[1] - 1, 1, i)
+        self.lines.extend(ax.plot([], []))
+
+    # Plotting each column from the source file
+    for i, line in enumerate(self.lines, start=1):
+      line.set_data(*self.reduce(data.iloc[:, 0].to_numpy(),
+                                 data.iloc[:, i].to_numpy()))
+      line.axes.set_xlabel(data.keys()[0])
+      line.axes.set_ylabel(data.keys()[i])
+      self.rescale(line.axes)
 
 
 if __name__ == '__main__':
@@ -18,28 +48,29 @@ if __name__ == '__main__':
     description="Plots the data contained in the source file into the "
                 "destination file. The data of each columns is plotted against"
                 "that of the first column.")
-  parser.add_argument('source_file', type=checker_valid_csv, nargs=1,
-                      help="Path to the .csv file containing the data to "
+  parser.add_argument('source_file', type=checker_valid_data, nargs=1,
+                      help="Path to the data file containing the data to "
                            "plot.")
   parser.add_argument('destination_file', type=checker_is_tiff, nargs=1,
                       help="Path where the generated .tiff image should be "
                            "saved.")
+  parser.add_argument('--decimate', action='store_true',
+                      help="Decimates the curves to about two points per pixel "
+                           "before plotting them, keeping their extremal "
+                           "values.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
   source = args.source_file[0]
   destination = args.destination_file[0]
+  decimate = args.decimate
+
+  with profile_stage(source, CurveFigure.__name__) as profile:
+    # Loading data from the source file
+    data = read_data(source)
+    profile['samples'] = len(data)
 
-  # Loading data from the source file
-  data = pd.read_csv(source)
-
-  # Drawing the figure
-  fig = plt.figure()
-  # Plotting each column from the source file
-  for i in range(1, data.shape[1]):
-    ax = plt.subplot(data.shape[1] - 1, 1, i)
-    ax.plot(data.iloc[:, 0], data.iloc[:, i])
-    ax.set_xlabel(data.keys()[0])
-    ax.set_ylabel(data.keys()[i])
-  # Saving the figure
-  plt.savefig(destination, dpi=300)
+    # Drawing the figure and saving it
+    figure = CurveFigure(decimate)
+    figure.draw(data)
+    figure.save(destination)
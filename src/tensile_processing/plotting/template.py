@@ -0,0 +1,118 @@
+# coding: utf-8
+
+"""This file contains the base class for the figures that are drawn many times
+with different data, and the function rendering many of them in a single
+process or over a pool of processes."""
+
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from .decimate import decimate, nb_pixels
+from ..tools.parallel import parallel_map
+from ..tools.profiling import profile_stage
+
+
+class FigureTemplate:
+  """Base class for the figures whose artists are created once, and whose data
+  is then replaced for drawing each new test.
+
+  The figures are not managed by pyplot and are rendered with the Agg backend,
+  so that no memory is kept from one figure to the next.
+  """
+
+  dpi = 300
+
+  def __init__(self, decimate: bool = False) -> None:
+    """Creates an empty figure rendered with the Agg backend.
+
+    Args:
+      decimate: If True, the curves are decimated to about two points per
+        pixel before being drawn.
+    """
+
+    self.figure = Figure()
+    FigureCanvasAgg(self.figure)
+    self.lines: list[Line2D] = list()
+    self.decimate = decimate
+
+  def draw(self, *args: Any) -> None:
+    """Replaces the data of the figure, to be implemented by the subclasses."""
+
+    raise NotImplementedError
+
+  def save(self, destination: Path) -> None:
+    """Saves the figure to the given location, and then releases the data it
+    holds."""
+
+    self.figure.savefig(destination, dpi=self.dpi)
+    for line in self.lines:
+      line.set_data(np.empty(0), np.empty(0))
+
+  def reduce(self,
+             x: np.ndarray,
+             y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the points of the curve to draw, decimated according to the
+    width of the figure if the decimation is enabled."""
+
+    if not self.decimate:
+      return x, y
+    return decimate(x, y, nb_pixels(self.figure, self.dpi))
+
+  @staticmethod
+  def rescale(ax: Axes) -> None:
+    """Adapts the limits of the axes to the data they now contain."""
+
+    ax.relim()
+    ax.autoscale_view()
+
+
+def _render_chunk(template: Callable[[], FigureTemplate],
+                  reader: Callable[[Path], Any],
+                  tasks: Sequence[tuple]) -> None:
+  """Draws and saves the figures of the given tasks, all on a same template
+  figure.
+
+  Each task contains the destination of the figure, the path to the data to
+  read, and the other arguments to pass to the draw method of the template.
+  """
+
+  figure = template()
+  for destination, source, *args in tasks:
+    print(f"Writing {destination}")
+    with profile_stage(source, type(figure).__name__) as profile:
+      data = reader(source)
+      profile['samples'] = len(data)
+      figure.draw(data, *args)
+      figure.save(destination)
+
+
+def render_figures(template: Callable[[], FigureTemplate],
+                   reader: Callable[[Path], Any],
+                   tasks: Sequence[tuple],
+                   jobs: int = 1) -> None:
+  """Draws and saves many figures of a same kind, possibly over a pool of
+  processes.
+
+  Each process draws its share of the figures on its own template figure, so
+  that the figure and its artists are only created once per process.
+
+  Args:
+    template: The class of the template figure to draw the data on.
+    reader: The function reading the data to draw from a given path. It must
+      be picklable if several processes are used.
+    tasks: For each figure, the path where to save it, the path to the data to
+      read, and the other arguments to pass to the draw method of the
+      template.
+    jobs: The number of processes to use.
+  """
+
+  jobs = max(min(jobs, len(tasks)), 1)
+  chunks = [tasks[i::jobs] for i in range(jobs)]
+  parallel_map(_render_chunk, [template] * jobs, [reader] * jobs, chunks,
+               jobs=jobs)
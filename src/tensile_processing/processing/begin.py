@@ -8,15 +8,222 @@ the second derivative of the stress. The minimum extensions are finally saved
 at the provided location."""
 
 import argparse
+from collections.abc import Sequence
+from pathlib import Path
+from typing import NamedTuple, Optional
 import pandas as pd
-from typing import Optional
-from scipy.signal import savgol_filter, find_peaks
 import numpy as np
+from itertools import repeat
 
-from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
+from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv, \
+  checker_valid_data, checker_positive_int
 from ..tools.fields import (identifier_field, begin_field, extension_field,
                             stress_field)
+from ..tools.cache import ResultCache
 from ..tools.get_nr import get_nr
+from ..tools.packing import pack_rows, row_batches
+from ..tools.parallel import map_files
+from ..tools.peaks import PeakIndex, first_peak, load_peak_indices
+from ..tools.savgol import batch_savgol_filter
+from ..tools.table import ResultTable
+
+
+# The maximum number of samples packed at once when computing the second
+# derivatives of several tests, which limits the memory used
+_max_cells = 2 ** 22
+
+
+class SecondDerivatives(NamedTuple):
+  """The second derivatives of the stress of several tests, concatenated and
+  cut at their maximum, along with the quantities of each test that do not
+  depend on the threshold."""
+
+  extension: np.ndarray
+  sec_dev: np.ndarray
+  lengths: np.ndarray
+  max_sec_dev: np.ndarray
+  nonzero: np.ndarray
+  min_extension: np.ndarray
+  min_extension_cut: np.ndarray
+
+
+def _restrict(data: pd.DataFrame) -> tuple[pd.DataFrame, float, int]:
+  """Restricts the data to the portion between the minimum stress and the
+  maximum stress, and returns it along with the total stress range and the
+  position of its first sample in the data."""
+
+  idx_max = data[stress_field].idxmax()
+  idx_min = data.iloc[:idx_max][stress_field].idxmin()
+  stress_amp = data[stress_field].max() - data[stress_field].min()
+  return data.iloc[idx_min: idx_max], stress_amp, idx_min
+
+
+def restrict_second_dev(data: pd.DataFrame,
+                        peak_prominence: float,
+                        nb_points_peak: int,
+                        peaks: Optional[PeakIndex] = None
+                        ) -> tuple[np.ndarray, np.ndarray]:
+  """Selects the part of the stress-strain data over which the second
+  derivative of the stress is computed.
+
+  This part does not depend on the threshold on the second derivative, so that
+  it can be computed once when trying several thresholds.
+
+  Args:
+    data: The DataFrame containing the end-trimmed stress-strain data.
+    peak_prominence: The minimum fraction of the total stress range above which
+      a local stress peak is considered as the end of the valid data.
+    nb_points_peak: The maximum width, in samples, of the stress peaks to
+      consider.
+    peaks: The index of the stress peaks of the data, if already computed.
+
+  Returns:
+    The extension and the stress over the selected part of the data.
+  """
+
+  data, stress_amp, start = _restrict(data)
+
+  # Searching for a sudden drop in the stress values
+  drop = first_peak(data[stress_field].values, peak_prominence * stress_amp,
+                    nb_points_peak, peaks, start)
+
+  # Excluding data after the drop in stress values, if one was detected
+  if drop is not None:
+    data = data.iloc[:drop]
+
+  # Restricting to the first part of the curve to limit noise on the
+  # second derivative
+  data = data[data[stress_field] <
+              data[stress_field].min() + 0.15 * stress_amp]
+  return data[extension_field].to_numpy(), data[stress_field].to_numpy()
+
+
+def compute_second_derivatives(
+    restricted: Sequence[tuple[np.ndarray, np.ndarray]]) -> SecondDerivatives:
+  """Computes the second derivative of the stress of several tests at once.
+
+  The stress of each test is first extremely smoothened, with a window
+  spanning half of its samples, and then differentiated with the same window.
+  The tests are packed by batches of similar lengths into 2D arrays, on which
+  the filters of all the tests are applied at once.
+
+  Args:
+    restricted: The extension and the stress of each test, as returned by
+      restrict_second_dev.
+
+  Returns:
+    The second derivatives of all the tests, only until their maximum.
+  """
+
+  lengths = np.array([stress.size for _, stress in restricted],
+                     dtype=np.int64)
+  cuts = np.empty(len(restricted), dtype=np.int64)
+  sec_devs = [np.empty(0)] * len(restricted)
+
+  for rows in row_batches(lengths, _max_cells):
+    stress, sizes = pack_rows([restricted[row][1] for row in rows])
+    smooth = batch_savgol_filter(stress, sizes, sizes // 2, 3, deriv=0)
+    sec_dev = batch_savgol_filter(smooth, sizes, sizes // 2, 3, deriv=2)
+
+    # Only the part of the second derivative until the maximum is of interest
+    cuts[rows] = np.where(np.isnan(sec_dev), -np.inf, sec_dev).argmax(axis=1)
+    for row, values in zip(rows, sec_dev):
+      sec_devs[row] = values[:cuts[row]]
+
+  extension = [ext for ext, _ in restricted]
+  with np.errstate(invalid='ignore'):
+    return SecondDerivatives(
+      np.concatenate([ext[:cut] for ext, cut in zip(extension, cuts)]),
+      np.concatenate(sec_devs),
+      cuts,
+      np.array([np.nanmax(values, initial=-np.inf) for values in sec_devs]),
+      np.array([values.any() for values in sec_devs]),
+      np.array([np.nanmin(ext, initial=np.inf) for ext in extension]),
+      np.array([np.nanmin(ext[:cut], initial=np.inf)
+                for ext, cut in zip(extension, cuts)]))
+
+
+def begins_from_second_derivatives(second_derivatives: SecondDerivatives,
+                                   sec_dev_thresh: float) -> np.ndarray:
+  """Determines the begin extension of several tests from their second
+  derivatives, with vectorized operations over all the tests.
+
+  Args:
+    second_derivatives: The second derivatives of the tests, as returned by
+      compute_second_derivatives.
+    sec_dev_thresh: The fraction of the maximum second derivative below which
+      the data is not considered valid.
+
+  Returns:
+    The begin extension of each test.
+  """
+
+  derivatives = second_derivatives
+  lengths = derivatives.lengths
+
+  # Cutting at the last value below threshold, so that everything after it
+  # is above
+  with np.errstate(invalid='ignore'):
+    thresholds = sec_dev_thresh * derivatives.max_sec_dev
+  below = derivatives.sec_dev < np.repeat(thresholds, lengths)
+  last = np.full(lengths.size, -np.inf)
+  filled = lengths > 0
+  if filled.any():
+    starts = np.cumsum(lengths) - lengths
+    last[filled] = np.fmax.reduceat(
+      np.where(below, derivatives.extension, -np.inf), starts[filled])
+
+  # Falling back to the minimum extension if no value is below threshold, or
+  # if the second derivative is null
+  begins = np.where(last > -np.inf, last, derivatives.min_extension_cut)
+  begins = np.where(derivatives.nonzero, begins, derivatives.min_extension)
+  return np.where(np.isinf(begins), np.nan, begins)
+
+
+def detect_begin(data: pd.DataFrame,
+                 use_second_dev: bool,
+                 stress_threshold: float,
+                 sec_dev_thresh: float,
+                 peak_prominence: float,
+                 nb_points_peak: int,
+                 peaks: Optional[PeakIndex] = None) -> float:
+  """Determines the minimum extension above which the stress-strain data is
+  considered valid.
+
+  Args:
+    data: The DataFrame containing the end-trimmed stress-strain data.
+    use_second_dev: If True, the second derivative method is used for
+      detecting the minimum extension. Otherwise, the stress threshold method
+      is used.
+    stress_threshold: The fraction of the total stress below which the data is
+      not considered valid, for the stress threshold method.
+    sec_dev_thresh: The fraction of the maximum second derivative below which
+      the data is not considered valid, for the second derivative method.
+    peak_prominence: The minimum fraction of the total stress range above which
+      a local stress peak is considered as the end of the valid data.
+    nb_points_peak: The maximum width, in samples, of the stress peaks to
+      consider.
+    peaks: The index of the stress peaks of the data, if already computed.
+
+  Returns:
+    The begin extension of the valid stress-strain data.
+  """
+
+  # Determining the beginning point of the valid data based on the value of
+  # the second derivative, as a batch of a single test
+  if use_second_dev:
+    restricted = restrict_second_dev(data, peak_prominence, nb_points_peak,
+                                     peaks)
+    second_derivatives = compute_second_derivatives([restricted])
+    return float(begins_from_second_derivatives(second_derivatives,
+                                                sec_dev_thresh)[0])
+
+  # Determining the beginning point of the valid data based on a stress
+  # threshold
+  data, stress_amp, _ = _restrict(data)
+  thresh = data[stress_field].min() + stress_threshold * stress_amp
+  return data[extension_field][data[stress_field] > thresh].min()
+
 
 if __name__ == '__main__':
 
@@ -49,9 +256,33 @@ if __name__ == '__main__':
   parser.add_argument('nb_points_peak', type=int, nargs=1,
                       help="Maximum width, in samples, of stress peaks to "
                            "consider for selecting the end cutoff extension.")
-  parser.add_argument('source_files', type=checker_valid_csv, nargs='+',
-                      help="Paths to the .csv files containing the "
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help="Paths to the data files containing the "
                            "stress-strain data.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the source files, in case they "
+                           "contain untrimmed stress-strain data.")
+  parser.add_argument('--peak_index', type=Path, default=None,
+                      help="Path to the .npz file containing the index of the "
+                           "stress peaks of each source file, so that the "
+                           "peaks are not searched again.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "source files in parallel.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results "
+                           "computed for each source file, so that they are "
+                           "only computed again if the data or the parameters "
+                           "change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--record', type=Path, default=None,
+                      help="Path to the file where to record the result of "
+                           "each source file along with a fingerprint of its "
+                           "inputs, so that only the new or modified source "
+                           "files are processed on the next run.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
@@ -59,82 +290,49 @@ if __name__ == '__main__':
   use_second_dev = True if args.use_second_derivative[0] == 'true' else False
   sec_dev_thresh = args.second_derivative_threshold[0] / 100
   source_files = args.source_files
+  jobs = args.jobs
+  cache = (ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None)
+  record = args.record
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
   stress_threshold = args.stress_threshold[0] / 100
   peak_prominence = args.peak_prominence[0] / 100
   nb_points_peak = args.nb_points_peak[0]
+  peak_indices = (load_peak_indices(args.peak_index)
+                  if args.peak_index is not None else dict())
 
-  # Creating the dataframe to save
-  to_write: Optional[pd.DataFrame] = None
+  # Creating the table to save
+  to_write = ResultTable(len(source_files), (identifier_field, begin_field))
 
   # Sorting the source files according to the test number
   source_files = sorted(source_files, key=get_nr)
+  peaks = [peak_indices.get(get_nr(path)) for path in source_files]
+
+  # Detecting the beginning of the valid data for each source file
+  # With the second derivative method, the part of the data not depending on
+  # the threshold is selected for each file, and all the files are then
+  # processed at once
+  if use_second_dev:
+    restricted = map_files(restrict_second_dev, source_files,
+                           repeat(peak_prominence), repeat(nb_points_peak),
+                           peaks, jobs=jobs, index=index, cache=cache,
+                           record=record)
+    begins = begins_from_second_derivatives(
+      compute_second_derivatives(restricted), sec_dev_thresh)
+  else:
+    begins = map_files(detect_begin, source_files, repeat(use_second_dev),
+                       repeat(stress_threshold), repeat(sec_dev_thresh),
+                       repeat(peak_prominence), repeat(nb_points_peak),
+                       peaks, jobs=jobs, index=index, cache=cache,
+                       record=record)
 
   # Iterating over the source files
-  for path in source_files:
-    # Reading data from the source file
+  for path, begin in zip(source_files, begins):
     test_nr = get_nr(path)
-    data = pd.read_csv(path)
-
-    # Restricting data to the portion of interest
-    idx_max = data[stress_field].idxmax()
-    idx_min = data.iloc[:idx_max][stress_field].idxmin()
-    stress_amp = data[stress_field].max() - data[stress_field].min()
-    data = data.iloc[idx_min: idx_max]
-
-    # Determining the beginning point of the valid data based on the value of
-    # the second derivative
-    if use_second_dev:
-
-      # Searching for a sudden drop in the stress values
-      max_indices, _ = find_peaks(data[stress_field].values,
-                                  prominence=(peak_prominence * stress_amp,
-                                              None),
-                                  width=(None, nb_points_peak),
-                                  rel_height=1)
-
-      # Excluding data after the drop in stress values, if one was detected
-      if max_indices.size:
-        data = data.iloc[:np.min(max_indices)]
-
-      # Restricting to the first part of the curve to limit noise on the
-      # second derivative
-      data = data[data[stress_field] <
-                  data[stress_field].min() + 0.15 * stress_amp]
-      min_ext = data[extension_field].min()
-
-      # Extreme curve smoothening before computing the second derivative
-      smooth = savgol_filter(data[stress_field].values,
-                             len(data[stress_field]) // 2, 3, deriv=0)
-      sec_dev = savgol_filter(smooth, len(smooth) // 2, 3, deriv=2)
-
-      # Only the part of the second derivative until the maximum is of interest
-      data = data.iloc[:sec_dev.argmax()]
-      sec_dev = sec_dev[:sec_dev.argmax()]
-
-      # Cutting at the last value below threshold, so that everything after it
-      # is above
-      if sec_dev.any():
-        mask = sec_dev < sec_dev_thresh * sec_dev.max()
-        if mask.any():
-          begin = data[extension_field][mask].max()
-        else:
-          begin = data[extension_field].min()
-      else:
-        begin = min_ext
-
-    # Determining the beginning point of the valid data based on a stress
-    # threshold
-    else:
-      thresh = data[stress_field].min() + stress_threshold * stress_amp
-      begin = data[extension_field][data[stress_field] > thresh].min()
-
-    # Adding the values to the dataframe to save
-    if to_write is None:
-      to_write = pd.DataFrame({identifier_field: [test_nr],
-                               begin_field: [begin]})
-    else:
-      to_write = pd.concat((to_write, pd.DataFrame(
-        {identifier_field: [test_nr], begin_field: [begin]})))
+
+    # Adding the values to the table to save
+    to_write.append({identifier_field: test_nr, begin_field: begin})
 
   # Saving the values to the destination file
-  to_write.to_csv(destination, index=False)
+  to_write.to_frame().to_csv(destination, index=False)
@@ -0,0 +1,237 @@
+# coding: utf-8
+
+"""This script reads the stress-strain data from source files, then estimates
+by bootstrapping the confidence intervals of the Yeoh coefficients and of the
+tangent moduli, and saves the bounds of the intervals at the provided
+location."""
+
+import argparse
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pandas as pd
+from itertools import repeat
+
+from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv, \
+  checker_valid_data, checker_positive_int, checker_percentage
+from ..tools.fields import identifier_field, yeoh_interval_fields, \
+  young_modulus_low_field, young_modulus_high_field, \
+  hyperelastic_modulus_low_field, hyperelastic_modulus_high_field, \
+  extension_field, stress_field
+from ..tools.cache import ResultCache
+from ..tools.get_nr import get_nr
+from ..tools.parallel import map_files
+from ..tools.yeoh_model import yeoh_basis, positive_bounds, \
+  solve_yeoh_normal
+
+# The maximum number of sample weights drawn at once, which limits the memory
+# used when bootstrapping long recordings
+_max_weights = 2 ** 22
+
+
+def interval_fields(order: int = 2) -> tuple[str, ...]:
+  """Returns the fields of the bounds of the confidence intervals returned by
+  bootstrap_test for the Yeoh model with the given number of terms."""
+
+  return (*yeoh_interval_fields[:2 * order], young_modulus_low_field,
+          young_modulus_high_field, hyperelastic_modulus_low_field,
+          hyperelastic_modulus_high_field)
+
+
+def bootstrap_test(data: pd.DataFrame,
+                   young_threshold: float,
+                   hyper_threshold: float,
+                   nb_resamples: int,
+                   confidence: float,
+                   seed: int,
+                   test_nr: int,
+                   order: int = 2,
+                   bounds: Optional[tuple[Sequence[float],
+                                          Sequence[float]]] = None
+                   ) -> tuple[float, ...]:
+  """Estimates the confidence intervals of the Yeoh coefficients, of the
+  Young's modulus and of the hyperelastic modulus by resampling the
+  stress-strain data with replacement.
+
+  All the estimated quantities are least squares solutions, that only depend
+  on weighted sums of products of the data. The sums of all the resamples are
+  therefore obtained from a single matrix product between the resampling
+  weights and the products, and the quantities are then solved from their
+  normal equations for all the resamples at once. The Yeoh model is the one
+  with the given number of terms and bounds, as fitted by fit_yeoh_n.
+
+  The ranges of data over which the moduli are computed are the ones of the
+  original data, as determined by compute_tangent_moduli.
+
+  Args:
+    data: The DataFrame containing the stress-strain data.
+    young_threshold: The fraction of the total extension range over which the
+      Young's modulus is computed.
+    hyper_threshold: The fraction of the total extension range over which the
+      hyperelastic modulus is computed.
+    nb_resamples: The number of bootstrap resamples to draw.
+    confidence: The confidence level of the intervals, between 0 and 1.
+    seed: The seed of the random generator. It is combined with the test
+      number, so that the result of a test does not depend on the other tests
+      or on the order in which they are processed.
+    test_nr: The number of the test.
+    order: The number of terms of the Yeoh model.
+    bounds: The lower and upper bounds of the Yeoh coefficients, as a tuple
+      containing the lower bounds and a tuple containing the upper bounds. If
+      not given, the coefficients are not constrained.
+
+  Returns:
+    The lower and upper bounds of the confidence intervals of each Yeoh
+    coefficient, of the Young's modulus and of the hyperelastic modulus, in
+    this order, as named by interval_fields.
+  """
+
+  extension = data[extension_field].to_numpy()
+  stress = data[stress_field].to_numpy()
+  size = extension.size
+
+  # Getting subsets of the data for each modulus
+  min_extenso = extension.min()
+  max_extenso = extension.max()
+  extent = max_extenso - min_extenso
+  young = extension <= min_extenso + young_threshold * extent
+  hyper = extension >= max_extenso - hyper_threshold * extent
+
+  # The products whose weighted sums give the least squares solutions
+  # The extension is centered for the hyperelastic modulus, to avoid losing
+  # precision when computing its variance
+  # Only the upper triangle of the products of the basis functions is needed
+  basis = yeoh_basis(extension, order)
+  rows, columns = np.triu_indices(order)
+  strain = extension - 1
+  centered = extension - extension[hyper].mean()
+  products = np.concatenate(
+    (basis[:, rows] * basis[:, columns], basis * stress[:, np.newaxis],
+     np.stack((young * strain ** 2, young * strain * stress,
+               hyper * 1., hyper * centered, hyper * stress,
+               hyper * centered ** 2, hyper * centered * stress), axis=1)),
+    axis=1)
+
+  # Drawing the resamples by chunks, each resample being described by the
+  # number of times each sample is drawn
+  rng = np.random.default_rng((seed, test_nr))
+  chunk = max(1, min(nb_resamples, _max_weights // max(size, 1)))
+  sums = np.empty((nb_resamples, products.shape[1]))
+  for first in range(0, nb_resamples, chunk):
+    nb = min(chunk, nb_resamples - first)
+    draws = rng.integers(0, size, size=(nb, size))
+    draws += size * np.arange(nb)[:, np.newaxis]
+    weights = np.bincount(draws.ravel(), minlength=nb * size)
+    sums[first:first + nb] = (weights.reshape(nb, size).astype(np.float64)
+                              @ products)
+
+  # Solving the least squares problems of all the resamples at once
+  nb_pairs = rows.size
+  gram = np.empty((nb_resamples, order, order))
+  gram[:, rows, columns] = sums[:, :nb_pairs]
+  gram[:, columns, rows] = sums[:, :nb_pairs]
+  coefficients = solve_yeoh_normal(gram,
+                                   sums[:, nb_pairs:nb_pairs + order], bounds)
+  (yxx, yxy, hn, hx, hy, hxx, hxy) = sums[:, nb_pairs + order:].T
+  with np.errstate(divide='ignore', invalid='ignore'):
+    estimates = np.column_stack((coefficients, yxy / yxx,
+                                 (hn * hxy - hx * hy) / (hn * hxx - hx ** 2)))
+
+  # Taking the percentiles of the estimates as the bounds of the intervals
+  alpha = (1 - confidence) / 2
+  low, high = np.nanquantile(estimates, (alpha, 1 - alpha), axis=0)
+  return tuple(float(bound) for bounds in zip(low, high) for bound in bounds)
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="For each source file estimates by bootstrapping the "
+                "confidence intervals of the Yeoh coefficients and of the "
+                "tangent moduli, and then stores the bounds of the intervals "
+                "in the destination file.")
+  parser.add_argument('destination_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the bounds "
+                           "of the confidence intervals.")
+  parser.add_argument('nb_resamples', type=checker_positive_int, nargs=1,
+                      help="The number of bootstrap resamples to draw for "
+                           "each test.")
+  parser.add_argument('confidence_level', type=checker_percentage, nargs=1,
+                      help="The confidence level of the intervals, as a "
+                           "percentage.")
+  parser.add_argument('seed', type=int, nargs=1,
+                      help="The seed of the random generator, for "
+                           "reproducibility.")
+  parser.add_argument('young_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the Young's modulus should be computed.")
+  parser.add_argument('hyperelastic_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the hyperelastic modulus should be "
+                           "computed.")
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help="Paths to the data files containing the "
+                           "stress-strain data.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the source files, in case they "
+                           "contain untrimmed stress-strain data.")
+  parser.add_argument('--order', type=int, default=2,
+                      choices=range(2, len(yeoh_interval_fields) // 2 + 1),
+                      help="Number of terms of the Yeoh model whose "
+                           "coefficients are bootstrapped.")
+  parser.add_argument('--positive', action='store_true',
+                      help="If given, constrains all the Yeoh coefficients to "
+                           "be positive.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "source files in parallel.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results "
+                           "computed for each source file, so that they are "
+                           "only computed again if the data or the parameters "
+                           "change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--record', type=Path, default=None,
+                      help="Path to the file where to record the result of "
+                           "each source file along with a fingerprint of its "
+                           "inputs, so that only the new or modified source "
+                           "files are processed on the next run.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  destination = args.destination_file[0]
+  source_files = args.source_files
+  jobs = args.jobs
+  cache = (ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None)
+  record = args.record
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
+  nb_resamples = args.nb_resamples[0]
+  confidence = args.confidence_level[0] / 100
+  seed = args.seed[0]
+  young_threshold = args.young_threshold[0] / 100
+  hyper_threshold = args.hyperelastic_threshold[0] / 100
+  order = args.order
+  bounds = positive_bounds(order) if args.positive else None
+
+  # Sorting the source files according to the test number
+  source_files = sorted(source_files, key=get_nr)
+  nrs = [get_nr(path) for path in source_files]
+
+  # Bootstrapping the estimates of each source file
+  intervals = map_files(bootstrap_test, source_files, repeat(young_threshold),
+                        repeat(hyper_threshold), repeat(nb_resamples),
+                        repeat(confidence), repeat(seed), nrs,
+                        repeat(order), repeat(bounds), jobs=jobs,
+                        index=index, cache=cache, record=record)
+
+  # Saving the values to the destination file
+  to_write = pd.DataFrame(intervals, columns=interval_fields(order))
+  to_write.insert(0, identifier_field, nrs)
+  to_write.to_csv(destination, index=False)
@@ -0,0 +1,50 @@
+# coding: utf-8
+
+"""This script reads data from the source file, and saves it at the provided
+location. The formats of the source and destination files are determined from
+their extensions, which allows converting the data from one format to
+another."""
+
+import argparse
+
+from ..tools.argparse_checkers import checker_is_data, checker_valid_data, \
+  checker_positive_int
+from ..tools.profiling import profile_stage
+from ..tools.storage import read_data, write_data
+from ..tools.streaming import iter_chunks, ChunkWriter
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Reads data from the source file, and saves it to the "
+                "destination file in the format given by its extension.")
+  parser.add_argument('source_file', type=checker_valid_data, nargs=1,
+                      help="Path to the data file containing the data to "
+                           "convert.")
+  parser.add_argument('destination_file', type=checker_is_data, nargs=1,
+                      help="Path to the data file where the converted data "
+                           "should be saved.")
+  parser.add_argument('--chunk_size', type=checker_positive_int, default=None,
+                      help="If given, the data is read and written by chunks "
+                           "of this number of samples, instead of all at "
+                           "once.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  source = args.source_file[0]
+  destination = args.destination_file[0]
+  chunk_size = args.chunk_size
+
+  with profile_stage(source) as profile:
+    # Converting the data to the destination format
+    if chunk_size is not None:
+      profile['samples'] = 0
+      with ChunkWriter(destination) as writer:
+        for chunk in iter_chunks(source, chunk_size):
+          writer.write(chunk)
+          profile['samples'] += len(chunk)
+    else:
+      data = read_data(source)
+      profile['samples'] = len(data)
+      write_data(data, destination)
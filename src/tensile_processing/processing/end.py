@@ -5,13 +5,31 @@ source file the extensibility where the maximums tress is reached, and saves
 the extensibilities at the provided location."""
 
 import argparse
+from pathlib import Path
 import pandas as pd
-from typing import Optional
 
-from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
-from ..tools.fields import (identifier_field, stress_field, extension_field,
-                            end_field)
+from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv, \
+  checker_valid_data, checker_positive_int
+from .features import compute_features
+from ..tools.fields import identifier_field, end_field
+from ..tools.cache import ResultCache
 from ..tools.get_nr import get_nr
+from ..tools.parallel import map_files
+from ..tools.table import ResultTable
+
+
+def detect_end(data: pd.DataFrame) -> float:
+  """Returns the extension at which the maximum stress is reached.
+
+  Args:
+    data: The DataFrame containing the stress-strain data.
+
+  Returns:
+    The end extension of the stress-strain data.
+  """
+
+  return compute_features(data).end
+
 
 if __name__ == '__main__':
 
@@ -22,36 +40,49 @@ if __name__ == '__main__':
   parser.add_argument('destination_file', type=checker_is_csv, nargs=1,
                       help="Path to the .csv file where to store the "
                            "end extensibility data.")
-  parser.add_argument('source_files', type=checker_valid_csv, nargs='+',
-                      help="Paths to the .csv files containing the "
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help="Paths to the data files containing the "
                            "stress-strain data.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "source files in parallel.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results "
+                           "computed for each source file, so that they are "
+                           "only computed again if the data or the parameters "
+                           "change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--record', type=Path, default=None,
+                      help="Path to the file where to record the result of "
+                           "each source file along with a fingerprint of its "
+                           "inputs, so that only the new or modified source "
+                           "files are processed on the next run.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
   destination = args.destination_file[0]
   source_files = args.source_files
+  jobs = args.jobs
+  cache = (ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None)
+  record = args.record
   source_files = sorted(source_files, key=get_nr)
 
-  # Creating the dataframe to save
-  to_write: Optional[pd.DataFrame] = None
+  # Creating the table to save
+  to_write = ResultTable(len(source_files), (identifier_field, end_field))
+
+  # Retrieving the extension at the maximum stress for each source file
+  ends = map_files(detect_end, source_files, jobs=jobs, cache=cache,
+                   record=record)
 
   # Iterating over the source files
-  for path in source_files:
-    # Reading data from the source file
+  for path, end_ext in zip(source_files, ends):
     test_nr = get_nr(path)
-    data = pd.read_csv(path)
-
-    # Retrieving the ultimate strength
-    index_max = data[stress_field].idxmax()
-    end_ext = data[extension_field].iloc[index_max]
 
-    # Adding the values to the dataframe to save
-    if to_write is None:
-      to_write = pd.DataFrame(
-        {identifier_field: [test_nr], end_field: [end_ext]})
-    else:
-      to_write = pd.concat((to_write, pd.DataFrame(
-        {identifier_field: [test_nr], end_field: [end_ext]})))
+    # Adding the values to the table to save
+    to_write.append({identifier_field: test_nr, end_field: end_ext})
 
   # Saving the values to the destination file
-  to_write.to_csv(destination, index=False)
+  to_write.to_frame().to_csv(destination, index=False)
@@ -8,17 +8,93 @@ value of the first derivative of the stress. The maximum extensions are finally
 saved at the provided location."""
 
 import argparse
+from pathlib import Path
 import numpy as np
 import pandas as pd
-from scipy.signal import savgol_filter, find_peaks
+from itertools import repeat
 from typing import Optional
 from warnings import warn
 
-from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
+from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv, \
+  checker_valid_data, checker_positive_int
 from ..tools.fields import (identifier_field, end_fit_field,
                             extension_field, stress_field,
                             ultimate_strength_field)
+from ..tools.cache import ResultCache
 from ..tools.get_nr import get_nr
+from ..tools.parallel import map_files
+from ..tools.peaks import PeakIndex, first_peak, load_peak_indices
+from ..tools.savgol import savgol_filter
+from ..tools.table import ResultTable
+
+
+def detect_end_fit(data: pd.DataFrame,
+                   max_stress: float,
+                   use_second_dev: bool,
+                   nb_points_smooth: int,
+                   peak_prominence: float,
+                   nb_points_peak: int,
+                   peaks: Optional[PeakIndex] = None) -> float:
+  """Determines the maximum extension below which the stress-strain data is
+  considered valid for a fit with Yeoh.
+
+  Args:
+    data: The DataFrame containing the trimmed stress-strain data.
+    max_stress: The ultimate strength of the tested sample.
+    use_second_dev: If True, the first cancellation point of the second
+      derivative is used for detecting the maximum extension. Otherwise, the
+      maximum of the first derivative is used.
+    nb_points_smooth: The number of points to use for the Savitzky-Golay filter
+      computing the first derivative.
+    peak_prominence: The minimum fraction of the ultimate strength above which
+      a local stress peak is considered as the end of the valid data.
+    nb_points_peak: The maximum width, in samples, of the stress peaks to
+      consider.
+    peaks: The index of the stress peaks of the end-trimmed data, if already
+      computed. The trimmed data is the end of the end-trimmed data.
+
+  Returns:
+    The end extension of the stress-strain data valid for the fit.
+  """
+
+  # Searching for a sudden drop in the stress values
+  start = peaks.length - len(data) if peaks is not None else 0
+  drop = first_peak(data[stress_field].values, peak_prominence * max_stress,
+                    nb_points_peak, peaks, start)
+
+  # Excluding data after the drop in stress values, if one was detected
+  if drop is not None:
+    data = data.iloc[:drop]
+
+  # In case the number of points for smoothening is greater than the number
+  # of data points
+  if nb_points_smooth > len(data):
+    warn(f"Reduced the number of points from {nb_points_smooth} to "
+         f"{int(len(data) / 2)} !", RuntimeWarning)
+    nb_points_smooth = int(len(data) / 2)
+
+  # Retrieving the first point where the second derivative cancels
+  if use_second_dev:
+    # Extreme curve smoothening before computing the second derivative
+    smooth = savgol_filter(data[stress_field].values,
+                           len(data[stress_field]) // 2, 3, deriv=0)
+    # The maximum extension is determined as the first cancellation point of
+    # the second derivative of the stress
+    sec_dev = savgol_filter(smooth, len(smooth) // 2, 3, deriv=2)
+    cancel = np.diff(np.sign(sec_dev))
+    if np.any(cancel < 0):
+      end = data[extension_field].values[np.min(np.where(cancel < 0))]
+    else:
+      end = data[extension_field].max()
+  else:
+    # The maximum extension is determined as the maximum of the first
+    # derivative of the stress
+    filtered = savgol_filter(data[stress_field].values, nb_points_smooth, 3,
+                             deriv=1)
+    end = data[extension_field].values[np.argmax(filtered)]
+
+  return end
+
 
 if __name__ == '__main__':
 
@@ -50,81 +126,77 @@ if __name__ == '__main__':
   parser.add_argument('ultimate_strength_file', type=checker_valid_csv,
                       nargs=1, help="Path to the .csv file containing the "
                                     "ultimate strength data.")
-  parser.add_argument('source_files', type=checker_valid_csv, nargs='+',
-                      help="Paths to the .csv files containing the "
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help="Paths to the data files containing the "
                            "stress-strain data.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the source files, in case they "
+                           "contain untrimmed stress-strain data.")
+  parser.add_argument('--peak_index', type=Path, default=None,
+                      help="Path to the .npz file containing the index of the "
+                           "stress peaks of each end-trimmed source file, so "
+                           "that the peaks are not searched again.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "source files in parallel.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results "
+                           "computed for each source file, so that they are "
+                           "only computed again if the data or the parameters "
+                           "change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--record', type=Path, default=None,
+                      help="Path to the file where to record the result of "
+                           "each source file along with a fingerprint of its "
+                           "inputs, so that only the new or modified source "
+                           "files are processed on the next run.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
   destination = args.destination_file[0]
   source_files = args.source_files
+  jobs = args.jobs
+  cache = (ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None)
+  record = args.record
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
   use_second_dev = True if args.use_second_derivative[0] == 'true' else False
   ultimate_strength_file = args.ultimate_strength_file[0]
   nb_points_smooth = args.nb_points_smooth[0]
   peak_prominence = args.peak_prominence[0] / 100
   nb_points_peak = args.nb_points_peak[0]
+  peak_indices = (load_peak_indices(args.peak_index)
+                  if args.peak_index is not None else dict())
 
-  to_write: Optional[pd.DataFrame] = None
+  # Creating the table to save
+  to_write = ResultTable(len(source_files), (identifier_field, end_fit_field))
 
   # Sorting the source files according to the test number
   source_files = sorted(source_files, key=get_nr)
+  peaks = [peak_indices.get(get_nr(path)) for path in source_files]
 
   # Reading the ultimate strength file and sorting the stress values
-  ultimate_strength = pd.read_csv(ultimate_strength_file).sort_values(
-    by=[identifier_field])
+  ultimate_strength = pd.read_csv(
+    ultimate_strength_file,
+    float_precision='round_trip').sort_values(by=[identifier_field])
   max_stresses = ultimate_strength[ultimate_strength_field]
 
+  # Detecting the end of the data valid for the fit for each source file
+  ends = map_files(detect_end_fit, source_files, max_stresses,
+                   repeat(use_second_dev), repeat(nb_points_smooth),
+                   repeat(peak_prominence), repeat(nb_points_peak), peaks,
+                   jobs=jobs, index=index, cache=cache, record=record)
+
   # Iterating over the source files
-  for path, max_stress in zip(source_files, max_stresses):
-    # Reading data from the source file
+  for path, end in zip(source_files, ends):
     test_nr = get_nr(path)
-    data = pd.read_csv(path)
-
-    # Searching for a sudden drop in the stress values
-    max_indices, _ = find_peaks(data[stress_field].values,
-                                prominence=(peak_prominence * max_stress,
-                                            None),
-                                width=(None, nb_points_peak),
-                                rel_height=1)
-
-    # Excluding data after the drop in stress values, if one was detected
-    if max_indices.size:
-      data = data.iloc[:np.min(max_indices)]
-
-    # In case the number of points for smoothening is greater than the number
-    # of data points
-    if nb_points_smooth > len(data):
-      warn(f"Reduced the number of points from {nb_points_smooth} to "
-           f"{int(len(data) / 2)} !", RuntimeWarning)
-      nb_points_smooth = int(len(data) / 2)
-
-    # Retrieving the first point where the second derivative cancels
-    if use_second_dev:
-      # Extreme curve smoothening before computing the second derivative
-      smooth = savgol_filter(data[stress_field].values,
-                             len(data[stress_field]) // 2, 3, deriv=0)
-      # The maximum extension is determined as the first cancellation point of
-      # the second derivative of the stress
-      sec_dev = savgol_filter(smooth, len(smooth) // 2, 3, deriv=2)
-      cancel = np.diff(np.sign(sec_dev))
-      if np.any(cancel < 0):
-        end = data[extension_field].values[np.min(np.where(cancel < 0))]
-      else:
-        end = data[extension_field].max()
-    else:
-      # The maximum extension is determined as the maximum of the first
-      # derivative of the stress
-      filtered = savgol_filter(data[stress_field].values, nb_points_smooth, 3,
-                               deriv=1)
-      end = data[extension_field].values[np.argmax(filtered)]
-
-    # Adding the values to the dataframe to save
-    if to_write is None:
-      to_write = pd.DataFrame({identifier_field: [test_nr],
-                               end_fit_field: [end]})
-    else:
-      to_write = pd.concat((to_write, pd.DataFrame(
-        {identifier_field: [test_nr], end_fit_field: [end]})))
+
+    # Adding the values to the table to save
+    to_write.append({identifier_field: test_nr, end_fit_field: end})
 
   # Saving the values to the destination file
-  to_write.to_csv(destination, index=False)
+  to_write.to_frame().to_csv(destination, index=False)
@@ -0,0 +1,150 @@
+# coding: utf-8
+
+"""This script reads stress-strain data from source files, computes for each
+source file all the scalar descriptors derived from the maximum and minimum of
+the extension and of the stress, and saves the requested ones at the provided
+locations. Each data file is thus only read once for computing the end
+extension, the ultimate strength and the extensibility."""
+
+import argparse
+from pathlib import Path
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv, \
+  checker_valid_data, checker_positive_int
+from ..tools.fields import (identifier_field, stress_field, extension_field,
+                            end_field, ultimate_strength_field,
+                            extensibility_field)
+from ..tools.cache import ResultCache
+from ..tools.get_nr import get_nr
+from ..tools.parallel import map_files
+
+
+class Features(NamedTuple):
+  """The scalar descriptors of the stress-strain data of one test."""
+
+  index_max: int
+  end: float
+  min_extension: float
+  max_stress: float
+  min_stress: float
+
+  @property
+  def ultimate_strength(self) -> float:
+    """The ultimate strength, as the amplitude of the stress."""
+
+    return self.max_stress - self.min_stress
+
+  @property
+  def extensibility(self) -> float:
+    """The extensibility, as the difference between the extension at the
+    maximum stress and the minimum extension."""
+
+    return self.end - self.min_extension
+
+
+def compute_features(data: pd.DataFrame) -> Features:
+  """Computes all the scalar descriptors of the stress-strain data at once.
+
+  The stress is only reduced twice, once for its maximum and the position of
+  the maximum, and once for its minimum, and the extension only once. The
+  missing values are ignored, as pandas does.
+
+  Args:
+    data: The DataFrame containing the stress-strain data.
+
+  Returns:
+    The descriptors of the stress-strain data.
+  """
+
+  extension = data[extension_field].to_numpy()
+  stress = data[stress_field].to_numpy()
+
+  # The faster reductions return nan if there are missing values
+  index_max = int(stress.argmax())
+  min_stress = stress.min()
+  if np.isnan(stress[index_max]) or np.isnan(min_stress):
+    index_max = int(np.nanargmax(stress))
+    min_stress = np.nanmin(stress)
+  min_extension = extension.min()
+  if np.isnan(min_extension):
+    min_extension = np.nanmin(extension)
+
+  return Features(index_max, float(extension[index_max]),
+                  float(min_extension), float(stress[index_max]),
+                  float(min_stress))
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="For each source file determines the extension at peak "
+                "stress, the ultimate strength and the extensibility, and "
+                "then saves the requested ones in the destination files.")
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help="Paths to the data files containing the "
+                           "stress-strain data.")
+  parser.add_argument('--end_file', type=checker_is_csv, default=None,
+                      help="Path to the .csv file where to store the "
+                           "end extensibility data.")
+  parser.add_argument('--ultimate_strength_file', type=checker_is_csv,
+                      default=None,
+                      help="Path to the .csv file where to store the "
+                           "ultimate strength data.")
+  parser.add_argument('--extensibility_file', type=checker_is_csv,
+                      default=None,
+                      help="Path to the .csv file where to store the "
+                           "extensibility data.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the source files, in case they "
+                           "contain untrimmed stress-strain data.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "source files in parallel.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results "
+                           "computed for each source file, so that they are "
+                           "only computed again if the data or the parameters "
+                           "change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--record', type=Path, default=None,
+                      help="Path to the file where to record the result of "
+                           "each source file along with a fingerprint of its "
+                           "inputs, so that only the new or modified source "
+                           "files are processed on the next run.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  outputs = [(path, name, field) for path, name, field in (
+    (args.end_file, 'end', end_field),
+    (args.ultimate_strength_file, 'ultimate_strength',
+     ultimate_strength_field),
+    (args.extensibility_file, 'extensibility', extensibility_field))
+             if path is not None]
+  if not outputs:
+    parser.error("At least one destination file must be given !")
+  source_files = args.source_files
+  jobs = args.jobs
+  cache = (ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None)
+  record = args.record
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
+  source_files = sorted(source_files, key=get_nr)
+
+  # Retrieving all the descriptors for each source file
+  features = map_files(compute_features, source_files, jobs=jobs,
+                       index=index, cache=cache, record=record)
+  nrs = [get_nr(path) for path in source_files]
+
+  # Saving the requested descriptors to their destination files
+  for destination, name, field in outputs:
+    values = [getattr(feature, name) for feature in features]
+    pd.DataFrame({identifier_field: nrs,
+                  field: values}).to_csv(destination, index=False)
@@ -5,11 +5,63 @@ running the Make command over an entire directory, and combines it into a
 single global results file at the indicated location."""
 
 import argparse
+from pathlib import Path
 import pandas as pd
-from typing import Optional
 from re import search
 
 from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
+from ..tools.fields import donor_field, timepoint_field
+from ..tools.table import ResultTable
+
+
+def directory_labels(directory: Path) -> tuple[str, str]:
+  """Returns the donor and the time point of a directory of results.
+
+  Args:
+    directory: The directory containing the results of one time point of one
+      donor. The donor is deduced from the name of its parent folder, and the
+      time point is its name.
+
+  Returns:
+    The donor and the time point of the directory.
+  """
+
+  donor, *_ = search(r"(\w+)_", directory.parent.name).groups()
+  return donor, directory.name
+
+
+def combine_results(sources: list[tuple[Path, pd.DataFrame]]) -> pd.DataFrame:
+  """Combines the results tables of several directories into a single one,
+  adding the donor and time point of each directory as the first columns.
+
+  Args:
+    sources: The path to each results file, along with its content. The donor
+      and time point are deduced from the names of the parent folders.
+
+  Returns:
+    The DataFrame containing the combined results.
+  """
+
+  to_write = ResultTable(sum(len(data) for _, data in sources))
+
+  for path, data in sources:
+
+    # Adding the donor and time point information to the existing data
+    data[donor_field], data[timepoint_field] = directory_labels(path.parent)
+
+    # Rearranging the columns to have the donor and time point first
+    labels = data.columns.tolist()
+    labels.remove(donor_field)
+    labels.remove(timepoint_field)
+    labels.insert(0, timepoint_field)
+    labels.insert(0, donor_field)
+    data = data[labels]
+
+    # Adding the values to the table to save
+    to_write.extend(data)
+
+  return to_write.to_frame()
+
 
 if __name__ == '__main__':
 
@@ -29,30 +81,9 @@ if __name__ == '__main__':
   source_results_files = args.source_results_files
   global_results_file = args.global_results_file[0]
 
-  to_write: Optional[pd.DataFrame] = None
-
-  for path in source_results_files:
-
-    # Reading data from the source file
-    data = pd.read_csv(path)
-
-    # Adding the donor and time point information to the existing data
-    data['Donor'], *_ = search(r"(\w+)_", path.parent.parent.name).groups()
-    data['Timepoint'] = path.parent.name
-
-    # Rearranging the columns to have the donor and time point first
-    labels = data.columns.tolist()
-    labels.remove('Donor')
-    labels.remove('Timepoint')
-    labels.insert(0, 'Timepoint')
-    labels.insert(0, 'Donor')
-    data = data[labels]
-
-    # Adding the values to the dataframe to save
-    if to_write is None:
-      to_write = data.copy()
-    else:
-      to_write = pd.concat((to_write, data), ignore_index=True)
+  # Reading the data from all the source files, to know the size of the table
+  sources = [(path, pd.read_csv(path, float_precision='round_trip'))
+             for path in source_results_files]
 
   # Saving the values to the destination file
-  to_write.to_csv(global_results_file, index=False)
+  combine_results(sources).to_csv(global_results_file, index=False)
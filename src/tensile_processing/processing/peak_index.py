@@ -0,0 +1,86 @@
+# coding: utf-8
+
+"""This script reads end-trimmed stress-strain data from source files, and
+indexes for each source file all the local maxima of the stress along with
+their prominences and widths. The indices of all the source files are saved
+at the provided location, so that the detection of the begin and of the end
+of the fit only filter them instead of searching the stress peaks again."""
+
+import argparse
+from pathlib import Path
+import pandas as pd
+
+from ..tools.argparse_checkers import checker_valid_csv, \
+  checker_valid_data, checker_positive_int
+from ..tools.fields import stress_field
+from ..tools.cache import ResultCache
+from ..tools.get_nr import get_nr
+from ..tools.parallel import map_files
+from ..tools.peaks import PeakIndex, compute_peak_index, save_peak_indices
+
+
+def index_peaks(data: pd.DataFrame) -> PeakIndex:
+  """Indexes all the local maxima of the stress, with their prominences and
+  widths.
+
+  Args:
+    data: The DataFrame containing the end-trimmed stress-strain data.
+
+  Returns:
+    The index of the stress peaks.
+  """
+
+  return compute_peak_index(data[stress_field].to_numpy())
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="For each source file indexes all the local maxima of the "
+                "stress with their prominences and widths, and then saves "
+                "the indices in the destination file.")
+  parser.add_argument('destination_file', type=Path, nargs=1,
+                      help="Path to the .npz file where to store the peak "
+                           "indices.")
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help="Paths to the data files containing the "
+                           "end-trimmed stress-strain data.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the source files, in case they "
+                           "contain untrimmed stress-strain data.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "source files in parallel.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results "
+                           "computed for each source file, so that they are "
+                           "only computed again if the data or the parameters "
+                           "change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--record', type=Path, default=None,
+                      help="Path to the file where to record the result of "
+                           "each source file along with a fingerprint of its "
+                           "inputs, so that only the new or modified source "
+                           "files are processed on the next run.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  destination = args.destination_file[0]
+  source_files = sorted(args.source_files, key=get_nr)
+  cache = (ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None)
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
+
+  # Indexing the stress peaks of each source file
+  indices = map_files(index_peaks, source_files, jobs=args.jobs, index=index,
+                      cache=cache, record=args.record)
+
+  # Saving the indices of all the source files together
+  save_peak_indices({get_nr(path): peaks
+                     for path, peaks in zip(source_files, indices)},
+                    destination)
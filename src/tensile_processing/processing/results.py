@@ -9,6 +9,28 @@ import pandas as pd
 from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
 from ..tools.fields import identifier_field
 
+
+def aggregate_results(notes: pd.DataFrame,
+                      *tables: pd.DataFrame) -> pd.DataFrame:
+  """Joins the data of several tables to the metadata of the tests, based on
+  the test number.
+
+  Args:
+    notes: The DataFrame containing the metadata of the tests.
+    *tables: The DataFrames containing the computed data to aggregate, each
+      one indexed by the test number.
+
+  Returns:
+    A DataFrame containing the metadata and all the computed data.
+  """
+
+  results = notes.copy(deep=True)
+  for table in tables:
+    results = results.join(table.set_index(identifier_field),
+                           on=identifier_field)
+  return results
+
+
 if __name__ == '__main__':
 
   # Parser for parsing the command line arguments of the script
@@ -39,6 +61,10 @@ if __name__ == '__main__':
   parser.add_argument('tangent_moduli_file', type=checker_valid_csv, nargs=1,
                       help="Path to the .csv file containing the data on the "
                            "tangent moduli.")
+  parser.add_argument('bootstrap_file', type=checker_valid_csv, nargs=1,
+                      help="Path to the .csv file containing the confidence "
+                           "intervals of the Yeoh coefficients and of the "
+                           "tangent moduli.")
   parser.add_argument('results_file', type=checker_is_csv, nargs=1,
                       help="Path to the .csv file where all the data should be"
                            " aggregated.")
@@ -53,34 +79,24 @@ if __name__ == '__main__':
   extensibility_file = args.extensibility_file[0]
   yeoh_file = args.yeoh_file[0]
   tangent_moduli_file = args.tangent_moduli_file[0]
+  bootstrap_file = args.bootstrap_file[0]
   results_file = args.results_file[0]
 
   # Reading the data files
   notes = pd.read_csv(notes_file)
-  end = pd.read_csv(end_file)
-  begin = pd.read_csv(begin_file)
-  end_fit = pd.read_csv(end_fit_file)
-  ultimate_strength = pd.read_csv(ultimate_strength_file)
-  extensibility = pd.read_csv(extensibility_file)
-  yeoh = pd.read_csv(yeoh_file)
-  moduli = pd.read_csv(tangent_moduli_file)
+  end = pd.read_csv(end_file, float_precision='round_trip')
+  begin = pd.read_csv(begin_file, float_precision='round_trip')
+  end_fit = pd.read_csv(end_fit_file, float_precision='round_trip')
+  ultimate_strength = pd.read_csv(ultimate_strength_file,
+                                  float_precision='round_trip')
+  extensibility = pd.read_csv(extensibility_file, float_precision='round_trip')
+  yeoh = pd.read_csv(yeoh_file, float_precision='round_trip')
+  moduli = pd.read_csv(tangent_moduli_file, float_precision='round_trip')
+  bootstrap = pd.read_csv(bootstrap_file, float_precision='round_trip')
 
   # Aggregating the data into a single results file
-  results = notes.copy(deep=True)
-  results = results.join(end.set_index(identifier_field),
-                         on=identifier_field)
-  results = results.join(begin.set_index(identifier_field),
-                         on=identifier_field)
-  results = results.join(end_fit.set_index(identifier_field),
-                         on=identifier_field)
-  results = results.join(ultimate_strength.set_index(identifier_field),
-                         on=identifier_field)
-  results = results.join(extensibility.set_index(identifier_field),
-                         on=identifier_field)
-  results = results.join(yeoh.set_index(identifier_field),
-                         on=identifier_field)
-  results = results.join(moduli.set_index(identifier_field),
-                         on=identifier_field)
+  results = aggregate_results(notes, end, begin, end_fit, ultimate_strength,
+                              extensibility, yeoh, moduli, bootstrap)
 
   # Saving the results file at the requested destination
   results.to_csv(results_file, index=False)
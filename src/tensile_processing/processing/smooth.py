@@ -5,11 +5,93 @@ Savitzky-Golay filter except for the first column of data, and saves the
 smoothened data at the provided location."""
 
 import argparse
+from collections.abc import Iterable, Iterator
+from typing import Optional
+import numpy as np
 import pandas as pd
-from scipy.signal import savgol_filter
 
-from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
+from ..tools.argparse_checkers import checker_is_data, checker_valid_data, \
+  checker_positive_int
 from ..tools.get_nr import get_nr
+from ..tools.profiling import profile_stage
+from ..tools.savgol import savgol_filter
+from ..tools.storage import read_data, write_data
+from ..tools.streaming import iter_chunks, ChunkWriter
+
+
+def smooth_data(data: pd.DataFrame, nb_points: int) -> pd.DataFrame:
+  """Smoothens the second column of the provided data using a Savitzky-Golay
+  filter.
+
+  Args:
+    data: The DataFrame containing the data to smoothen.
+    nb_points: The number of points to use for the Savitzky-Golay filter.
+
+  Returns:
+    A copy of the data, with its second column smoothened.
+  """
+
+  data = data.copy()
+  labels = data.keys()
+  data[labels[1]] = savgol_filter(data[labels[1]], nb_points, 3)
+  return data
+
+
+def smooth_chunks(chunks: Iterable[pd.DataFrame],
+                  nb_points: int) -> Iterator[pd.DataFrame]:
+  """Smoothens the second column of data read by chunks using a
+  Savitzky-Golay filter, and yields the smoothened data by chunks.
+
+  The data is smoothened over overlapping blocks, each one containing
+  nb_points samples before and after the returned samples. Away from the
+  edges of the data, the filter is a plain convolution over nb_points samples.
+  The result is therefore identical to the one of smooth_data over the entire
+  data for short filters, computed by direct convolution. For the filters
+  computed by FFT, it only agrees to within rounding errors. The memory usage
+  only depends on the sizes of the chunks and of the filter.
+
+  Args:
+    chunks: The DataFrames containing the successive chunks of data to
+      smoothen.
+    nb_points: The number of points to use for the Savitzky-Golay filter.
+
+  Returns:
+    An iterator over the DataFrames containing the successive chunks of
+    smoothened data.
+  """
+
+  # The raw values of the last samples already smoothened
+  context = np.empty(0)
+  # The samples that cannot be smoothened yet, for lack of following samples
+  pending: Optional[pd.DataFrame] = None
+
+  for chunk in chunks:
+    pending = (chunk if pending is None
+               else pd.concat((pending, chunk), ignore_index=True))
+    nb_ready = len(pending) - nb_points
+    if nb_ready <= 0:
+      continue
+
+    # Smoothening all the samples having enough samples around them
+    label = pending.keys()[1]
+    values = pending[label].to_numpy()
+    smoothed = savgol_filter(np.concatenate((context, values)), nb_points, 3)
+    ready = pending.iloc[:nb_ready].copy()
+    ready[label] = smoothed[context.size:context.size + nb_ready]
+    yield ready
+
+    context = np.concatenate((context, values[:nb_ready]))[-nb_points:]
+    pending = pending.iloc[nb_ready:].reset_index(drop=True)
+
+  # Smoothening the last samples, the end of the data being reached
+  if pending is not None and len(pending):
+    label = pending.keys()[1]
+    smoothed = savgol_filter(np.concatenate((context,
+                                             pending[label].to_numpy())),
+                             nb_points, 3)
+    pending = pending.copy()
+    pending[label] = smoothed[context.size:]
+    yield pending
 
 
 if __name__ == '__main__':
@@ -19,29 +101,44 @@ if __name__ == '__main__':
     description="Reads data from the source file, smoothens it using a "
                 "Savitzky-Golay filter, and saves the smoothened data to the "
                 "destination file.")
-  parser.add_argument('source_file', type=checker_valid_csv, nargs=1,
-                      help="Path to the .csv file containing the data to "
+  parser.add_argument('source_file', type=checker_valid_data, nargs=1,
+                      help="Path to the data file containing the data to "
                            "smoothen.")
-  parser.add_argument('destination_file', type=checker_is_csv, nargs=1,
-                      help="Path to the .csv file where the smoothened data "
+  parser.add_argument('destination_file', type=checker_is_data, nargs=1,
+                      help="Path to the data file where the smoothened data "
                            "should be saved.")
   parser.add_argument('nb_points', type=int, nargs=1,
                       help="The number of points to use for the Savitzky-Golay"
                            " filter smoothening the data.")
+  parser.add_argument('--chunk_size', type=checker_positive_int, default=None,
+                      help="If given, the data is read, smoothened and written"
+                           " by chunks of this number of samples, instead of "
+                           "all at once.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
   destination = args.destination_file[0]
   source = args.source_file[0]
   nb_points = args.nb_points[0]
+  chunk_size = args.chunk_size
 
-  # Loading data from the source file
-  test_nr = get_nr(source.parent)
-  data = pd.read_csv(source)
-  labels = data.keys()
+  with profile_stage(source) as profile:
+    if chunk_size is not None:
+      # Smoothening the data while streaming it to the destination file
+      profile['samples'] = 0
+      with ChunkWriter(destination) as writer:
+        for chunk in smooth_chunks(iter_chunks(source, chunk_size), nb_points):
+          writer.write(chunk)
+          profile['samples'] += len(chunk)
 
-  # Smoothening the data
-  data[labels[1]] = savgol_filter(data[labels[1]], nb_points, 3)
+    else:
+      # Loading data from the source file
+      test_nr = get_nr(source.parent)
+      data = read_data(source)
+      profile['samples'] = len(data)
+
+      # Smoothening the data
+      data = smooth_data(data, nb_points)
 
-  # Saving the values to the destination file
-  data.to_csv(destination, index=False)
+      # Saving the values to the destination file
+      write_data(data, destination)
@@ -5,14 +5,172 @@ cross-sections and the initial length from the notes file. It then computes the
 extension and the stress, and saves them at the provided location."""
 
 import argparse
+from collections.abc import Iterable, Iterator
+from itertools import chain
 import numpy as np
 import pandas as pd
 
-from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
+from ..tools.argparse_checkers import checker_is_data, checker_valid_csv, \
+  checker_valid_data, checker_positive_int
 from ..tools.fields import identifier_field, initial_length_field, \
   height_offset_field, height_field, width_offset_field, width_field, \
   extension_field, stress_field, time_field, position_field, effort_field
 from ..tools.get_nr import get_nr
+from ..tools.profiling import profile_stage
+from ..tools.storage import read_data, write_data
+from ..tools.streaming import iter_chunks, ChunkWriter
+
+# The number of samples at the beginning of the test over which the stress
+# offset is computed
+_nb_points_offset = 200
+
+
+def _get_dimensions(notes: pd.DataFrame) -> tuple[float, float]:
+  """Returns the width and the thickness of the sample, read from the metadata
+  of the test."""
+
+  # Getting the thickness of the sample
+  if height_offset_field is not None:
+    height = (float(notes[height_field].iloc[0]) -
+              float(notes[height_offset_field].iloc[0]))
+  else:
+    height = float(notes[height_field].iloc[0])
+
+  # Getting the width of the sample
+  if width_offset_field is not None:
+    width = (float(notes[width_field].iloc[0]) -
+             float(notes[width_offset_field].iloc[0]))
+  else:
+    width = float(notes[width_field].iloc[0])
+
+  return width, height
+
+
+def compute_stress_strain(position: pd.DataFrame,
+                          effort: pd.DataFrame,
+                          notes: pd.DataFrame,
+                          test_nr: int) -> pd.DataFrame:
+  """Computes the extension and the stress from the position and effort data,
+  using the dimensions of the sample read from the notes.
+
+  Args:
+    position: The DataFrame containing the position data.
+    effort: The DataFrame containing the effort data.
+    notes: The DataFrame containing the metadata of all the tests.
+    test_nr: The number of the test to process.
+
+  Returns:
+    A DataFrame containing the extension and the stress data.
+  """
+
+  # Reading the metadata of the test
+  notes = notes[notes[identifier_field] == test_nr]
+  width, height = _get_dimensions(notes)
+
+  # Calculating the extension from the position and the initial distance
+  # The position is interpolated directly at the timestamps of the effort
+  extension = np.interp(effort[time_field].to_numpy(),
+                        position[time_field].to_numpy(),
+                        position[position_field].to_numpy())
+  init_length = float(notes[initial_length_field].iloc[0])
+  extension += init_length - extension[0]
+  extension /= extension[0]
+
+  # Calculating the stress from the effort and the section
+  stress = effort[effort_field].to_numpy() / (width / 1000 * height / 1000)
+  stress -= np.mean(stress[:_nb_points_offset])
+  stress /= 1000
+
+  return pd.DataFrame({extension_field: extension,
+                       stress_field: stress}, copy=False)
+
+
+def stress_strain_chunks(position_chunks: Iterable[pd.DataFrame],
+                         effort_chunks: Iterable[pd.DataFrame],
+                         notes: pd.DataFrame,
+                         test_nr: int) -> Iterator[pd.DataFrame]:
+  """Computes the extension and the stress from position and effort data read
+  by chunks, and yields them by chunks.
+
+  The timestamps of both the position and the effort must be increasing. Only
+  the position samples surrounding the timestamps of the current effort chunk
+  are kept in memory, and the result is identical to the one of
+  compute_stress_strain over the entire data.
+
+  Args:
+    position_chunks: The DataFrames containing the successive chunks of
+      position data.
+    effort_chunks: The DataFrames containing the successive chunks of effort
+      data.
+    notes: The DataFrame containing the metadata of all the tests.
+    test_nr: The number of the test to process.
+
+  Returns:
+    An iterator over the DataFrames containing the successive chunks of
+    extension and stress data.
+  """
+
+  # Reading the metadata of the test
+  notes = notes[notes[identifier_field] == test_nr]
+  width, height = _get_dimensions(notes)
+  init_length = float(notes[initial_length_field].iloc[0])
+
+  # The first chunk must contain all the samples used for the stress offset
+  effort_chunks = iter(effort_chunks)
+  first = list()
+  for chunk in effort_chunks:
+    first.append(chunk)
+    if sum(map(len, first)) >= _nb_points_offset:
+      break
+  if not first:
+    return
+  effort_chunks = chain((pd.concat(first, ignore_index=True),), effort_chunks)
+
+  position_chunks = iter(position_chunks)
+  time = np.empty(0)
+  position = np.empty(0)
+  exhausted = False
+  extension_offset = extension_scale = stress_offset = None
+
+  for effort in effort_chunks:
+    effort_time = effort[time_field].to_numpy()
+    if not effort_time.size:
+      continue
+
+    # Reading the position data until it covers the current effort chunk
+    while not exhausted and (not time.size or time[-1] < effort_time[-1]):
+      chunk = next(position_chunks, None)
+      if chunk is None:
+        exhausted = True
+      else:
+        time = np.concatenate((time, chunk[time_field].to_numpy()))
+        position = np.concatenate((position,
+                                   chunk[position_field].to_numpy()))
+
+    # Calculating the extension from the position and the initial distance
+    extension = np.interp(effort_time, time, position)
+    if extension_offset is None:
+      extension_offset = init_length - extension[0]
+      extension_scale = extension[0] + extension_offset
+    extension += extension_offset
+    extension /= extension_scale
+
+    # Calculating the stress from the effort and the section
+    stress = effort[effort_field].to_numpy() / (width / 1000 * height / 1000)
+    if stress_offset is None:
+      stress_offset = np.mean(stress[:_nb_points_offset])
+    stress -= stress_offset
+    stress /= 1000
+
+    yield pd.DataFrame({extension_field: extension,
+                        stress_field: stress}, copy=False)
+
+    # Only keeping the position samples needed for the next effort chunks
+    keep = max(int(np.searchsorted(time, effort_time[-1], side='right')) - 1,
+               0)
+    time = time[keep:]
+    position = position[keep:]
+
 
 if __name__ == '__main__':
 
@@ -21,18 +179,22 @@ if __name__ == '__main__':
     description="Reads the position and effort data from the source files, and"
                 " metadata from the notes file. From these, the extension and "
                 "the effort are computed and saved in the destination file.")
-  parser.add_argument('source_position_file', type=checker_valid_csv, nargs=1,
-                      help="Path to the .csv file containing the position "
+  parser.add_argument('source_position_file', type=checker_valid_data, nargs=1,
+                      help="Path to the data file containing the position "
                            "data.")
-  parser.add_argument('source_effort_file', type=checker_valid_csv, nargs=1,
-                      help="Path to the .csv file containing the effort "
+  parser.add_argument('source_effort_file', type=checker_valid_data, nargs=1,
+                      help="Path to the data file containing the effort "
                            "data.")
   parser.add_argument('notes_file', type=checker_valid_csv, nargs=1,
                       help="Path to the .csv file containing the metadata "
                            "collected during the tests.")
-  parser.add_argument('destination_file', type=checker_is_csv, nargs=1,
-                      help="Path to the .csv file where to store the extension"
+  parser.add_argument('destination_file', type=checker_is_data, nargs=1,
+                      help="Path to the data file where to store the extension"
                            " and stress data.")
+  parser.add_argument('--chunk_size', type=checker_positive_int, default=None,
+                      help="If given, the data is read, processed and written "
+                           "by chunks of this number of samples, instead of "
+                           "all at once.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
@@ -40,46 +202,31 @@ if __name__ == '__main__':
   effort_file = args.source_effort_file[0]
   notes_file = args.notes_file[0]
   destination = args.destination_file[0]
+  chunk_size = args.chunk_size
 
-  # Reading the data from the source files
-  position = pd.read_csv(position_file)
-  effort = pd.read_csv(effort_file)
-
-  # Reading the metadata from the notes file
-  test_nr = get_nr(destination)
-  notes = pd.read_csv(notes_file)
-  notes = notes[notes[identifier_field] == test_nr]
+  with profile_stage(destination) as profile:
+    # Reading the metadata from the notes file
+    test_nr = get_nr(destination)
+    notes = pd.read_csv(notes_file)
 
-  # Calculating the extension from the position and the initial distance
-  position['Total'] = position[position_field]
-  position_interp = np.stack((effort[time_field].values,
-                              np.interp(effort[time_field].values,
-                                        position[time_field].values,
-                                        position['Total'].values)), axis=1)
-  init_length = float(notes[initial_length_field].iloc[0])
-  position_interp[:, 1] += init_length - position_interp[0, 1]
-  lambda_ = position_interp / [1, position_interp[0, 1]]
+    if chunk_size is not None:
+      # Calculating the stress and the extension while streaming the data
+      profile['samples'] = 0
+      with ChunkWriter(destination) as writer:
+        for chunk in stress_strain_chunks(
+            iter_chunks(position_file, chunk_size),
+            iter_chunks(effort_file, chunk_size), notes, test_nr):
+          writer.write(chunk)
+          profile['samples'] += len(chunk)
 
-  # Getting the thickness of the sample
-  if height_offset_field is not None:
-    height = (float(notes[height_field].iloc[0]) -
-              float(notes[height_offset_field].iloc[0]))
-  else:
-    height = float(notes[height_field].iloc[0])
+    else:
+      # Reading the data from the source files
+      position = read_data(position_file)
+      effort = read_data(effort_file)
+      profile['samples'] = len(effort)
 
-  # Getting the width of the sample
-  if width_offset_field is not None:
-    width = (float(notes[width_field].iloc[0]) -
-             float(notes[width_offset_field].iloc[0]))
-  else:
-    width = float(notes[width_field].iloc[0])
+      # Calculating the stress and the extension
+      data = compute_stress_strain(position, effort, notes, test_nr)
 
-  # Calculating the stress from the effort and the section
-  stress = effort[[time_field,
-                   effort_field]].values / [1, width / 1000 * height / 1000]
-  stress[:, 1] -= np.mean(stress[:200, 1])
-  stress[:, 1] /= 1000
-
-  # Saving the data to the destination file
-  pd.DataFrame({extension_field: lambda_[:, 1],
-                stress_field: stress[:, 1]}).to_csv(destination, index=False)
+      # Saving the data to the destination file
+      write_data(data, destination)
@@ -5,16 +5,66 @@ the Young and hyperelastic modulus, and saves the moduli coefficients at the
 provided location."""
 
 import argparse
+from pathlib import Path
 import numpy as np
 import pandas as pd
 from numpy.polynomial.polynomial import Polynomial
-from typing import Optional
+from itertools import repeat
 
-from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
+from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv, \
+  checker_valid_data, checker_positive_int
 from ..tools.fields import identifier_field, young_modulus_field, \
   hyperelastic_offset_field, hyperelastic_modulus_field, extension_field, \
   stress_field
+from ..tools.cache import ResultCache
 from ..tools.get_nr import get_nr
+from ..tools.parallel import map_files
+from ..tools.table import ResultTable
+from ..tools.views import select_rows
+
+
+def compute_tangent_moduli(data: pd.DataFrame,
+                           young_threshold: float,
+                           hyper_threshold: float
+                           ) -> tuple[float, float, float]:
+  """Computes the Young's modulus at the beginning of the stress-strain data,
+  and the hyperelastic modulus at its end.
+
+  Args:
+    data: The DataFrame containing the stress-strain data.
+    young_threshold: The fraction of the total extension range over which the
+      Young's modulus is computed.
+    hyper_threshold: The fraction of the total extension range over which the
+      hyperelastic modulus is computed.
+
+  Returns:
+    The Young's modulus, the offset of the hyperelastic modulus line, and the
+    hyperelastic modulus.
+  """
+
+  # Getting subsets of the data for each modulus
+  min_extenso = data[extension_field].min()
+  max_extenso = data[extension_field].max()
+  extent = max_extenso - min_extenso
+  data_young = select_rows(data, data[extension_field] <= min_extenso
+                           + young_threshold * extent)
+  data_hyper = select_rows(data, data[extension_field] >= max_extenso -
+                           hyper_threshold * extent)
+
+  # Calculating the Young's modulus
+  young, *_ = np.linalg.lstsq(
+    (data_young[extension_field].values - 1)[:, np.newaxis],
+    data_young[stress_field].values[:, np.newaxis], rcond=None)
+  young = float(np.squeeze(young))
+
+  # Calculating the hyperelastic modulus
+  hyperelastic_fit = Polynomial.fit(data_hyper[extension_field].values,
+                                    data_hyper[stress_field].values, 1)
+  hyperelastic = hyperelastic_fit.convert().coef[1]
+  offset = hyperelastic_fit.convert().coef[0]
+
+  return young, offset, hyperelastic
+
 
 if __name__ == '__main__':
 
@@ -33,60 +83,64 @@ if __name__ == '__main__':
                       help="The percentage of the total extension range over "
                            "which the hyperelastic modulus should be "
                            "computed.")
-  parser.add_argument('source_files', type=checker_valid_csv, nargs='+',
-                      help="Paths to the .csv files containing the "
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help="Paths to the data files containing the "
                            "stress-strain data.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the source files, in case they "
+                           "contain untrimmed stress-strain data.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "source files in parallel.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results "
+                           "computed for each source file, so that they are "
+                           "only computed again if the data or the parameters "
+                           "change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--record', type=Path, default=None,
+                      help="Path to the file where to record the result of "
+                           "each source file along with a fingerprint of its "
+                           "inputs, so that only the new or modified source "
+                           "files are processed on the next run.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
   destination = args.destination_file[0]
   source_files = args.source_files
+  jobs = args.jobs
+  cache = (ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None)
+  record = args.record
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
   young_threshold = args.young_threshold[0] / 100
   hyper_threshold = args.hyperelastic_threshold[0] / 100
 
   # Sorting the source files according to the test number
   source_files = sorted(source_files, key=get_nr)
-  # Creating the dataframe to save
-  to_write: Optional[pd.DataFrame] = None
+  # Creating the table to save
+  to_write = ResultTable(len(source_files),
+                         (identifier_field, young_modulus_field,
+                          hyperelastic_offset_field,
+                          hyperelastic_modulus_field))
+
+  # Calculating the tangent moduli for each source file
+  moduli = map_files(compute_tangent_moduli, source_files,
+                     repeat(young_threshold), repeat(hyper_threshold),
+                     jobs=jobs, index=index, cache=cache, record=record)
 
   # Iterating over the source files
-  for path in source_files:
-    # Reading data from the source file
+  for path, (young, offset, hyperelastic) in zip(source_files, moduli):
     test_nr = get_nr(path)
-    data = pd.read_csv(path)
-
-    # Getting subsets of the data for each modulus
-    min_extenso = data[extension_field].min()
-    max_extenso = data[extension_field].max()
-    extent = max_extenso - min_extenso
-    data_young = data[data[extension_field] <= min_extenso
-                      + young_threshold * extent]
-    data_hyper = data[data[extension_field] >= max_extenso -
-                      hyper_threshold * extent]
-
-    # Calculating the Young's modulus
-    young, *_ = np.linalg.lstsq(
-      (data_young[extension_field].values - 1)[:, np.newaxis],
-      data_young[stress_field].values[:, np.newaxis], rcond=None)
-    young = float(np.squeeze(young))
-
-    # Calculating the hyperelastic modulus
-    hyperelastic_fit = Polynomial.fit(data_hyper[extension_field].values,
-                                      data_hyper[stress_field].values, 1)
-    hyperelastic = hyperelastic_fit.convert().coef[1]
-    offset = hyperelastic_fit.convert().coef[0]
-
-    # Adding the values to the dataframe to save
-    if to_write is None:
-      to_write = pd.DataFrame(
-        {identifier_field: [test_nr], young_modulus_field: [young],
-         hyperelastic_offset_field: [offset],
-         hyperelastic_modulus_field: [hyperelastic]})
-    else:
-      to_write = pd.concat((to_write, pd.DataFrame(
-        {identifier_field: [test_nr], young_modulus_field: [young],
-         hyperelastic_offset_field: [offset],
-         hyperelastic_modulus_field: [hyperelastic]})))
+
+    # Adding the values to the table to save
+    to_write.append({identifier_field: test_nr, young_modulus_field: young,
+                     hyperelastic_offset_field: offset,
+                     hyperelastic_modulus_field: hyperelastic})
 
   # Saving the values to the destination file
-  to_write.to_csv(destination, index=False)
+  to_write.to_frame().to_csv(destination, index=False)
@@ -8,10 +8,34 @@ location."""
 import argparse
 import pandas as pd
 
-from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
+from ..tools.argparse_checkers import checker_is_data, checker_valid_csv, \
+  checker_valid_data
 from ..tools.fields import (identifier_field, begin_field, extension_field,
                             stress_field)
 from ..tools.get_nr import get_nr
+from ..tools.profiling import profile_stage
+from ..tools.storage import read_data, write_data
+from ..tools.views import select_rows
+
+
+def trim_begin(data: pd.DataFrame, begin: float) -> pd.DataFrame:
+  """Discards the stress-strain data below the begin extension cutoff, and
+  offsets the remaining data so that it starts at an extension of 1 and a
+  stress of 0.
+
+  Args:
+    data: The DataFrame containing the end-trimmed stress-strain data.
+    begin: The begin extension cutoff.
+
+  Returns:
+    The valid and offset part of the stress-strain data.
+  """
+
+  valid = select_rows(data, data[extension_field] >= begin)
+  valid /= [valid[extension_field].iloc[0], 1]
+  valid -= [0, valid[stress_field].iloc[0]]
+  return valid
+
 
 if __name__ == '__main__':
 
@@ -21,11 +45,11 @@ if __name__ == '__main__':
                 "files, as well as the begin cutoff extension values. Then, "
                 "trims the beginning of the stress-strain data and saves the "
                 "trimmed data in the destination file.")
-  parser.add_argument('destination_file', type=checker_is_csv, nargs=1,
-                      help="Path to the .csv file where to save the trimmed "
+  parser.add_argument('destination_file', type=checker_is_data, nargs=1,
+                      help="Path to the data file where to save the trimmed "
                            "stress-strain data.")
-  parser.add_argument('source_file', type=checker_valid_csv, nargs=1,
-                      help="Path to the .csv files containing the end-trimmed"
+  parser.add_argument('source_file', type=checker_valid_data, nargs=1,
+                      help="Path to the data file containing the end-trimmed"
                            "stress-strain data.")
   parser.add_argument('begin_file', type=checker_valid_csv, nargs=1,
                       help="Path to the .csv file containing the begin cutoff "
@@ -37,18 +61,19 @@ if __name__ == '__main__':
   source = args.source_file[0]
   begin_file = args.begin_file[0]
 
-  # Loading data from the source file
-  test_nr = get_nr(source)
-  data = pd.read_csv(source)
+  with profile_stage(source) as profile:
+    # Loading data from the source file
+    test_nr = get_nr(source)
+    data = read_data(source)
+    profile['samples'] = len(data)
 
-  # Reading the beginning from the data files
-  begin = pd.read_csv(begin_file)
-  begin = float(begin[begin_field][begin[identifier_field] == test_nr].iloc[0])
+    # Reading the beginning from the data files
+    begin = pd.read_csv(begin_file, float_precision='round_trip')
+    begin = float(begin[begin_field]
+                  [begin[identifier_field] == test_nr].iloc[0])
 
-  # Keeping only the valid data and offsetting the extension and the stress
-  valid = data[data[extension_field] >= begin]
-  valid /= [valid[extension_field].iloc[0], 1]
-  valid -= [0, valid[stress_field].iloc[0]]
+    # Keeping only the valid data and offsetting the extension and the stress
+    valid = trim_begin(data, begin)
 
-  # Saving the values to the destination file
-  valid.to_csv(destination, index=False)
+    # Saving the values to the destination file
+    write_data(valid, destination)
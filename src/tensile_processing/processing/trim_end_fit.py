@@ -7,9 +7,29 @@ stress-strain data, and saves the trimmed data at the provided location."""
 import argparse
 import pandas as pd
 
-from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
+from ..tools.argparse_checkers import checker_is_data, checker_valid_csv, \
+  checker_valid_data
 from ..tools.fields import identifier_field, end_fit_field, extension_field
 from ..tools.get_nr import get_nr
+from ..tools.profiling import profile_stage
+from ..tools.storage import read_data, write_data
+from ..tools.views import select_rows
+
+
+def trim_end_fit(data: pd.DataFrame, end: float) -> pd.DataFrame:
+  """Discards the stress-strain data above the end extension cutoff for the
+  Yeoh fit.
+
+  Args:
+    data: The DataFrame containing the trimmed stress-strain data.
+    end: The end extension cutoff for the fit.
+
+  Returns:
+    The part of the stress-strain data valid for the fit.
+  """
+
+  return select_rows(data, data[extension_field] <= end)
+
 
 if __name__ == '__main__':
 
@@ -19,11 +39,11 @@ if __name__ == '__main__':
                 "as well as the end extension values. Then, trims the end of "
                 "the stress-strain data and saves the trimmed data in the "
                 "destination file.")
-  parser.add_argument('destination_file', type=checker_is_csv, nargs=1,
-                      help="Path to the .csv file where to save the trimmed "
+  parser.add_argument('destination_file', type=checker_is_data, nargs=1,
+                      help="Path to the data file where to save the trimmed "
                            "stress-strain data.")
-  parser.add_argument('source_file', type=checker_valid_csv, nargs=1,
-                      help="Path to the .csv files containing the "
+  parser.add_argument('source_file', type=checker_valid_data, nargs=1,
+                      help="Path to the data file containing the "
                            "stress-strain data.")
   parser.add_argument('end_file', type=checker_valid_csv, nargs=1,
                       help="Path to the .csv file containing the end "
@@ -35,16 +55,18 @@ if __name__ == '__main__':
   source = args.source_file[0]
   end_file = args.end_file[0]
 
-  # Loading data from the source file
-  test_nr = get_nr(source)
-  data = pd.read_csv(source)
+  with profile_stage(source) as profile:
+    # Loading data from the source file
+    test_nr = get_nr(source)
+    data = read_data(source)
+    profile['samples'] = len(data)
 
-  # Reading the end extensions from the data files
-  end = pd.read_csv(end_file)
-  end = float(end[end_fit_field][end[identifier_field] == test_nr].iloc[0])
+    # Reading the end extensions from the data files
+    end = pd.read_csv(end_file, float_precision='round_trip')
+    end = float(end[end_fit_field][end[identifier_field] == test_nr].iloc[0])
 
-  # Keeping only the valid data
-  valid = data[data[extension_field] <= end]
+    # Keeping only the valid data
+    valid = trim_end_fit(data, end)
 
-  # Saving the values to the destination file
-  valid.to_csv(destination, index=False)
+    # Saving the values to the destination file
+    write_data(valid, destination)
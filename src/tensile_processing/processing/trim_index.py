@@ -0,0 +1,191 @@
+# coding: utf-8
+
+"""This script reads stress-strain data from source files, as well as the
+cutoff extensions of one trimming stage from another file. Instead of writing
+the trimmed data, it determines for each source file the range of samples to
+keep and the normalisation to apply, and saves them in a trimming index file.
+The trimming is then applied lazily by the next stages when reading the
+stress-strain data."""
+
+import argparse
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from itertools import repeat
+from typing import Optional
+from warnings import warn
+
+from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv, \
+  checker_valid_data, checker_positive_int
+from ..tools.fields import identifier_field, end_field, begin_field, \
+  end_fit_field, extension_field, stress_field, start_index_field, \
+  stop_index_field, extension_scale_field, stress_offset_field
+from ..tools.cache import ResultCache
+from ..tools.get_nr import get_nr
+from ..tools.parallel import map_files
+
+# For each trimming stage, the field containing its cutoff extension and
+# whether the data above the cutoff is the one to keep
+trim_stages = {'end': (end_field, False),
+               'begin': (begin_field, True),
+               'end_fit': (end_fit_field, False)}
+
+
+def trim_range(data: pd.DataFrame,
+               cutoff: float,
+               keep_above: bool) -> tuple[int, int]:
+  """Determines the range of samples to keep in the stress-strain data, given
+  a cutoff extension.
+
+  The range extends from the first to the last sample on the valid side of the
+  cutoff. It is therefore identical to the selection performed by the trimming
+  scripts as long as the extension is monotonic. Otherwise, the samples on the
+  wrong side of the cutoff that lie within the range are kept, whereas the
+  trimming scripts discard them, and a warning is issued.
+
+  Args:
+    data: The DataFrame containing the stress-strain data.
+    cutoff: The cutoff extension.
+    keep_above: If True, the data above the cutoff is kept, otherwise the data
+      below it.
+
+  Returns:
+    The index of the first sample to keep, and the index following the last
+    sample to keep.
+  """
+
+  extension = data[extension_field].to_numpy()
+  mask = extension >= cutoff if keep_above else extension <= cutoff
+  if not mask.any():
+    return 0, 0
+  first = int(np.argmax(mask))
+  last = mask.size - int(np.argmax(mask[::-1]))
+  if not mask[first:last].all():
+    warn(f"The extension crosses the cutoff {cutoff} several times, keeping "
+         f"{last - first - int(mask[first:last].sum())} samples that the "
+         f"trimming scripts would discard !")
+  return first, last
+
+
+def compute_trim_index(data: pd.DataFrame,
+                       cutoff: float,
+                       stage: str,
+                       start: int = 0,
+                       extension_scale: float = 1.,
+                       stress_offset: float = 0.
+                       ) -> tuple[int, int, float, float]:
+  """Computes the trimming index of one test for the given trimming stage.
+
+  The begin stage also normalises the data so that it starts at an extension of
+  1 and a stress of 0, as the trim_begin script does.
+
+  Args:
+    data: The DataFrame containing the stress-strain data, already trimmed
+      according to the index of the previous trimming stage.
+    cutoff: The cutoff extension of the test for this stage.
+    stage: The name of the trimming stage, one of the keys of trim_stages.
+    start: The start index of the previous trimming stage, relative to the
+      untrimmed stress-strain data.
+    extension_scale: The extension scale of the previous trimming stage.
+    stress_offset: The stress offset of the previous trimming stage.
+
+  Returns:
+    The start and stop indices relative to the untrimmed stress-strain data,
+    the extension scale and the stress offset to apply.
+  """
+
+  _, keep_above = trim_stages[stage]
+  first, last = trim_range(data, cutoff, keep_above)
+
+  if stage == 'begin':
+    extension_scale *= float(data[extension_field].iloc[first])
+    stress_offset += float(data[stress_field].iloc[first])
+
+  return start + first, start + last, extension_scale, stress_offset
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="For each source file, determines the range of stress-strain "
+                "data to keep for the given trimming stage, as well as the "
+                "normalisation to apply to it. The trimming index is then "
+                "saved to the destination file.")
+  parser.add_argument('destination_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the trimming "
+                           "index.")
+  parser.add_argument('stage', type=str, nargs=1, choices=tuple(trim_stages),
+                      help="The trimming stage for which to compute the "
+                           "index.")
+  parser.add_argument('cutoff_file', type=checker_valid_csv, nargs=1,
+                      help="Path to the .csv file containing the cutoff "
+                           "extensions of the trimming stage.")
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help="Paths to the data files containing the untrimmed "
+                           "stress-strain data.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index of the previous trimming stage, if any.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "source files in parallel.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results "
+                           "computed for each source file, so that they are "
+                           "only computed again if the data or the parameters "
+                           "change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--record', type=Path, default=None,
+                      help="Path to the file where to record the result of "
+                           "each source file along with a fingerprint of its "
+                           "inputs, so that only the new or modified source "
+                           "files are processed on the next run.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  destination = args.destination_file[0]
+  stage = args.stage[0]
+  cutoff_file = args.cutoff_file[0]
+  source_files = args.source_files
+  jobs = args.jobs
+  cache = (ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None)
+  record = args.record
+  previous: Optional[pd.DataFrame] = (
+    pd.read_csv(args.index, float_precision='round_trip')
+    if args.index is not None else None)
+
+  # Sorting the source files according to the test number
+  source_files = sorted(source_files, key=get_nr)
+  nrs = [get_nr(path) for path in source_files]
+
+  # Reading the cutoff extensions of each test
+  cutoff_field, _ = trim_stages[stage]
+  cutoffs = pd.read_csv(cutoff_file, float_precision='round_trip')
+  cutoffs = cutoffs.set_index(identifier_field)[cutoff_field]
+  cutoffs = [float(cutoffs[nr]) for nr in nrs]
+
+  # Reading the trimming of the previous stage, if any
+  if previous is not None:
+    by_nr = previous.set_index(identifier_field)
+    starts = [int(by_nr[start_index_field][nr]) for nr in nrs]
+    scales = [float(by_nr[extension_scale_field][nr]) for nr in nrs]
+    offsets = [float(by_nr[stress_offset_field][nr]) for nr in nrs]
+  else:
+    starts, scales, offsets = repeat(0), repeat(1.), repeat(0.)
+
+  # Computing the trimming index of each test
+  index = map_files(compute_trim_index, source_files, cutoffs, repeat(stage),
+                    starts, scales, offsets, jobs=jobs, index=previous,
+                    cache=cache, record=record)
+
+  # Saving the values to the destination file
+  pd.DataFrame({identifier_field: nrs,
+                start_index_field: [row[0] for row in index],
+                stop_index_field: [row[1] for row in index],
+                extension_scale_field: [row[2] for row in index],
+                stress_offset_field: [row[3] for row in index]}
+               ).to_csv(destination, index=False)
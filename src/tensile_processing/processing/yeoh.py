@@ -1,62 +1,193 @@
 # coding: utf-8
 
 """This script reads the stress-strain data from source files, then computes
-the Yeoh coefficients, and saves the coefficients at the provided location."""
+the Yeoh coefficients of all the source files in a single vectorized fit, and
+saves the coefficients at the provided location."""
 
 import argparse
+from collections.abc import Sequence
+from itertools import repeat
+from pathlib import Path
+import numpy as np
 import pandas as pd
-from scipy.optimize import curve_fit
 from typing import Optional
+from warnings import warn
 
-from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv
-from ..tools.yeoh_model import yeoh_2
-from ..tools.fields import identifier_field, yeoh_0_field, yeoh_1_field, \
+from ..tools.argparse_checkers import checker_is_csv, checker_valid_csv, \
+  checker_valid_data, checker_positive_int
+from ..tools.yeoh_model import fit_yeoh_n, positive_bounds, \
+  yeoh_normal_equations, solve_yeoh_normal
+from ..tools.fields import identifier_field, condition_field, yeoh_fields, \
   extension_field, stress_field
+from ..tools.cache import ResultCache
 from ..tools.get_nr import get_nr
+from ..tools.parallel import map_files
+from ..tools.table import ResultTable
+
+
+def fit_yeoh(data: pd.DataFrame,
+             bounds: Optional[tuple[Sequence[float],
+                                    Sequence[float]]] = None,
+             order: int = 2) -> tuple[float, ...]:
+  """Fits a Yeoh model to the stress-strain data.
+
+  As the model is linear in its coefficients, the fit is solved directly by
+  linear least squares. If the coefficients are bounded, the fit is refined
+  by a projected Newton method starting from the linear solution.
+
+  Args:
+    data: The DataFrame containing the stress-strain data to fit.
+    bounds: The lower and upper bounds of the coefficients, as a tuple
+      containing the lower bounds and a tuple containing the upper bounds. If
+      not given, the coefficients are not constrained.
+    order: The number of terms of the Yeoh model.
+
+  Returns:
+    The fitted Yeoh coefficients, in increasing order.
+  """
+
+  fit, = fit_yeoh_n((data[extension_field].values,),
+                    (data[stress_field].values,), order, bounds)
+  return tuple(float(value) for value in fit)
+
+
+def yeoh_normal(data: pd.DataFrame,
+                order: int = 2) -> tuple[np.ndarray, np.ndarray]:
+  """Computes the normal equations of the fit of a Yeoh model to the
+  stress-strain data of a test, to be solved along with the ones of the other
+  tests by fit_yeoh_tests.
+
+  Args:
+    data: The DataFrame containing the stress-strain data to fit.
+    order: The number of terms of the Yeoh model.
+
+  Returns:
+    The sums of the products of the basis functions of the model, and the sums
+    of their products with the stress.
+  """
+
+  return yeoh_normal_equations(data[extension_field].values,
+                               data[stress_field].values, order)
+
+
+def fit_yeoh_tests(normal: Sequence[tuple[np.ndarray, np.ndarray]],
+                   nrs: Sequence[int],
+                   notes: pd.DataFrame,
+                   bounds: Optional[tuple[Sequence[float],
+                                          Sequence[float]]] = None,
+                   order: int = 2) -> np.ndarray:
+  """Fits a Yeoh model to the stress-strain data of several tests at once,
+  from the normal equations of each test computed by yeoh_normal.
+
+  Only the small normal equations of the tests are needed at once, so the
+  memory used does not depend on the length of the tests. If the coefficients
+  are bounded, the fit of each test starts from the closest of its linear
+  solution and of the median solution of the tests sharing its condition in
+  the notes. The tests whose fit is underdetermined, for example because they
+  contain too few points, get NaN coefficients and a warning is issued.
+
+  Args:
+    normal: The normal equations of each test, as returned by yeoh_normal.
+    nrs: The number of each test.
+    notes: The DataFrame containing the metadata of the tests.
+    bounds: The lower and upper bounds of the coefficients, as a tuple
+      containing the lower bounds and a tuple containing the upper bounds. If
+      not given, the coefficients are not constrained.
+    order: The number of terms of the Yeoh model.
+
+  Returns:
+    An array of shape (number of tests, order) containing the fitted Yeoh
+    coefficients of each test.
+  """
+
+  if not len(normal):
+    return np.empty((0, order))
+
+  conditions = (notes.set_index(identifier_field)[condition_field]
+                .reindex(nrs).to_numpy()
+                if condition_field in notes.columns else None)
+  fits = solve_yeoh_normal(np.array([gram for gram, _ in normal]),
+                           np.array([moments for _, moments in normal]),
+                           bounds, conditions)
+
+  failed = [nr for nr, fit in zip(nrs, fits) if np.isnan(fit).any()]
+  if failed:
+    warn(f"The Yeoh model could not be fitted to the tests "
+         f"{', '.join(map(str, failed))} !")
+  return fits
+
 
 if __name__ == '__main__':
+
   # Parser for parsing the command line arguments of the script
   parser = argparse.ArgumentParser(
-    description="For each source file determines the Yeoh coefficients from "
-                "the stress-strain data, and then stores the coefficients in "
-                "the destination file.")
+    description="Determines the Yeoh coefficients from the stress-strain "
+                "data of all the source files at once, and then stores the "
+                "coefficients in the destination file.")
+  parser.add_argument('notes_file', type=checker_valid_csv, nargs=1,
+                      help="Path to the .csv file containing the metadata "
+                           "collected during the tests.")
   parser.add_argument('destination_file', type=checker_is_csv, nargs=1,
                       help="Path to the .csv file where to store the Yeoh "
                            "coefficients.")
-  parser.add_argument('source_files', type=checker_valid_csv, nargs='+',
-                      help="Paths to the .csv files containing the "
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help="Paths to the data files containing the "
                            "stress-strain data.")
+  parser.add_argument('--order', type=int, default=2,
+                      choices=range(2, len(yeoh_fields) + 1),
+                      help="Number of terms of the Yeoh model to fit.")
+  parser.add_argument('--positive', action='store_true',
+                      help="If given, constrains all the Yeoh coefficients to "
+                           "be positive.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the source files, in case they "
+                           "contain untrimmed stress-strain data.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "source files in parallel.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results "
+                           "computed for each source file, so that they are "
+                           "only computed again if the data or the parameters "
+                           "change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--record', type=Path, default=None,
+                      help="Path to the file where to record the result of "
+                           "each source file along with a fingerprint of its "
+                           "inputs, so that only the new or modified source "
+                           "files are processed on the next run.")
   args = parser.parse_args()
 
   # Getting the arguments from the parser
+  notes = pd.read_csv(args.notes_file[0])
   destination = args.destination_file[0]
   source_files = args.source_files
+  jobs = args.jobs
+  cache = (ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None)
+  record = args.record
+  order = args.order
+  bounds = positive_bounds(order) if args.positive else None
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
 
   # Sorting the source files according to the test number
   source_files = sorted(source_files, key=get_nr)
-  # Creating the dataframe to save
-  to_write: Optional[pd.DataFrame] = None
-
-  # Iterating over the source files
-  for path in source_files:
-    # Reading data from the source file
-    test_nr = get_nr(path)
-    data = pd.read_csv(path)
-
-    # Fitting the Yeoh coefficients to the experimental data
-    fit, *_ = curve_fit(yeoh_2, data[extension_field].values,
-                        data[stress_field].values)
-
-    # Adding the values to the dataframe to save
-    if to_write is None:
-      to_write = pd.DataFrame({identifier_field: [test_nr],
-                               yeoh_0_field: [fit[0]],
-                               yeoh_1_field: [fit[1]]})
-    else:
-      to_write = pd.concat((to_write, pd.DataFrame(
-        {identifier_field: [test_nr],
-         yeoh_0_field: [fit[0]],
-         yeoh_1_field: [fit[1]]})))
+  nrs = [get_nr(path) for path in source_files]
+  # Creating the table to save
+  fields = yeoh_fields[:order]
+  to_write = ResultTable(len(source_files), (identifier_field, *fields))
+
+  # Computing the normal equations of each file, then fitting the Yeoh
+  # coefficients of all the files at once
+  normal = map_files(yeoh_normal, source_files, repeat(order), jobs=jobs,
+                     index=index, cache=cache, record=record)
+  fits = fit_yeoh_tests(normal, nrs, notes, bounds, order)
+  to_write.extend({identifier_field: np.array(nrs),
+                   **dict(zip(fields, fits.T))})
 
   # Saving the values to the destination file
-  to_write.to_csv(destination, index=False)
+  to_write.to_frame().to_csv(destination, index=False)
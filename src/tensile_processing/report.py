@@ -0,0 +1,106 @@
+# coding: utf-8
+
+"""This script reads the measurements logged by the processing and plotting
+stages when profiling is enabled, and summarizes them in a run report. The
+report lists the resources used by each stage for each test, the totals of
+each stage, and the slowest tests and stages."""
+
+import argparse
+import json
+from pathlib import Path
+import pandas as pd
+
+from .tools.argparse_checkers import checker_positive_int
+
+
+def read_log(log: Path) -> pd.DataFrame:
+  """Reads the measurements from the log file, keeping only the latest one for
+  each stage and source file so that the stages run again are not counted
+  twice."""
+
+  records = pd.read_json(log, lines=True)
+  records = records.sort_values('timestamp')
+  records = records.drop_duplicates(['stage', 'source'], keep='last')
+  return records.reset_index(drop=True)
+
+
+def summarize_stages(records: pd.DataFrame) -> pd.DataFrame:
+  """Computes the total resources used by each stage over all the tests,
+  sorted from the slowest to the fastest stage."""
+
+  stages = records.groupby('stage').agg(
+    tests=('test', 'nunique'),
+    wall_time=('wall_time', 'sum'),
+    cpu_time=('cpu_time', 'sum'),
+    peak_rss=('peak_rss', 'max'),
+    bytes_read=('bytes_read', 'sum'),
+    bytes_written=('bytes_written', 'sum'),
+    samples=('samples', 'sum'))
+  stages['samples_per_second'] = stages['samples'] / stages['wall_time']
+  return stages.sort_values('wall_time', ascending=False).reset_index()
+
+
+def summarize_tests(records: pd.DataFrame) -> pd.DataFrame:
+  """Computes the total time spent on each test over all the stages, sorted
+  from the slowest to the fastest test."""
+
+  tests = records.groupby('test').agg(wall_time=('wall_time', 'sum'),
+                                      cpu_time=('cpu_time', 'sum'),
+                                      peak_rss=('peak_rss', 'max'),
+                                      samples=('samples', 'max'))
+  return tests.sort_values('wall_time', ascending=False).reset_index()
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Summarizes the measurements logged by the processing and "
+                "plotting stages into a run report.")
+  parser.add_argument('log_file', type=Path, nargs=1,
+                      help="Path to the log file containing the measurements, "
+                           "one JSON record per line.")
+  parser.add_argument('report_file', type=Path, nargs=1,
+                      help="Path to the .json file where to save the report. "
+                           "The measurements of each stage and test are also "
+                           "saved to a .csv file with the same name.")
+  parser.add_argument('--top', type=checker_positive_int, default=10,
+                      help="Number of slowest tests and stages to display.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  log_file = args.log_file[0]
+  report_file = args.report_file[0]
+  top = args.top
+
+  if not log_file.exists():
+    parser.error(f"No measurements were logged in {log_file}, is profiling "
+                 f"enabled ?")
+
+  # Computing the summaries
+  records = read_log(log_file)
+  stages = summarize_stages(records)
+  tests = summarize_tests(records)
+  slowest = records.sort_values('wall_time', ascending=False).head(top)
+
+  # Saving the report and the measurements
+  report_file.parent.mkdir(parents=True, exist_ok=True)
+  records.to_csv(report_file.with_suffix('.csv'), index=False)
+  # Going through pandas for converting the missing values to null
+  report = {name: json.loads(table.to_json(orient='records',
+                                            date_format='iso'))
+            for name, table in (('stages', stages), ('tests', tests),
+                                ('slowest', slowest),
+                                ('measurements', records))}
+  with open(report_file, 'w') as file:
+    json.dump(report, file, indent=2)
+
+  # Displaying a summary
+  columns = ['stage', 'tests', 'wall_time', 'cpu_time', 'peak_rss']
+  print(f"Slowest stages, times in s and memory in MB:\n"
+        f"{stages[columns].head(top).to_string(index=False)}\n")
+  print(f"Slowest tests over all the stages:\n"
+        f"{tests.head(top).to_string(index=False)}\n")
+  columns = ['stage', 'test', 'wall_time', 'samples']
+  print(f"Slowest stages for a single test:\n"
+        f"{slowest[columns].to_string(index=False)}")
@@ -0,0 +1,659 @@
+# coding: utf-8
+
+"""This script runs the entire processing chain on the tests of one or several
+directories, as a graph of tasks with one task per test and processing stage.
+Each task starts as soon as the stages it depends on are done for its test,
+regardless of the other tests and directories, so that a slow test or
+directory does not hold back the others. The same intermediate and final files
+as the ones produced by the Makefile are written in each directory."""
+
+import argparse
+from functools import partial
+from operator import attrgetter
+import os
+from pathlib import Path
+from shutil import copyfile
+import time
+from typing import Any, Optional
+import pandas as pd
+
+from .processing.smooth import smooth_data
+from .processing.stress_strain import compute_stress_strain
+from .processing.end import detect_end
+from .processing.trim_end import trim_end
+from .processing.begin import detect_begin
+from .processing.trim_begin import trim_begin
+from .processing.peak_index import index_peaks
+from .processing.features import compute_features
+from .processing.end_fit import detect_end_fit
+from .processing.trim_end_fit import trim_end_fit
+from .processing.trim_index import compute_trim_index
+from .processing.tangent_moduli import compute_tangent_moduli
+from .processing.bootstrap import bootstrap_test, interval_fields
+from .processing.results import aggregate_results
+from .processing.global_results import combine_results
+from .tools.argparse_checkers import checker_is_csv, checker_positive_int, \
+  checker_percentage
+from .tools.fields import identifier_field, end_field, begin_field, \
+  end_fit_field, ultimate_strength_field, extensibility_field, yeoh_fields, \
+  young_modulus_field, hyperelastic_offset_field, \
+  hyperelastic_modulus_field, start_index_field, stop_index_field, \
+  extension_scale_field, stress_offset_field, extension_field, stress_field
+from .tools.cache import ResultCache, CachedFunction
+from .tools.get_nr import get_nr
+from .tools.peaks import save_peak_indices
+from .tools.storage import read_data, write_data, data_formats
+from .tools.task_graph import Task, run_graph
+from .tools.views import trim_view
+from .tools.yeoh_model import fit_yeoh_n, positive_bounds
+
+# The estimated duration of each processing stage for one MB of raw effort
+# data, in arbitrary units, used for running the longest chains of tasks first
+stage_costs = {'smooth': 3., 'stress_strain': 1., 'end': .5, 'trim_end': 1.,
+               'peak_index': 1., 'begin': 1., 'trim_begin': 1., 'features': .3,
+               'ultimate_strength': 0., 'extensibility': 0., 'end_fit': 1.,
+               'trim_end_fit': 1., 'yeoh': 1., 'tangent_moduli': 1.,
+               'bootstrap': 10.}
+
+# The trimming function of each trimming stage, used in the files mode
+_trim_functions = {'end': trim_end,
+                   'begin': trim_begin,
+                   'end_fit': trim_end_fit}
+
+# The columns of each table written for all the tests of a directory
+_index_fields = (start_index_field, stop_index_field, extension_scale_field,
+                 stress_offset_field)
+_table_fields = {
+  'end': (end_field,),
+  'begin': (begin_field,),
+  'ultimate_strength': (ultimate_strength_field,),
+  'extensibility': (extensibility_field,),
+  'end_fit': (end_fit_field,),
+  'yeoh': yeoh_fields[:2],
+  'tangent_moduli': (young_modulus_field, hyperelastic_offset_field,
+                     hyperelastic_modulus_field),
+  'bootstrap': interval_fields(2)}
+
+# The stress-strain data of a test, as the path to its data file and the
+# trimming index to apply to it, if any
+Source = tuple[Path, Optional[tuple[int, int, float, float]]]
+
+
+def _load(source: Source) -> pd.DataFrame:
+  """Reads the stress-strain data of a test, and trims it if needed."""
+
+  path, row = source
+  data = read_data(path)
+  return trim_view(data, *row) if row is not None else data
+
+
+def _smooth(folder: Path,
+            effort_file_name: str,
+            position_file_name: str,
+            destination: Path,
+            data_format: str,
+            nb_points: int,
+            smooth: Any) -> tuple[Path, Path]:
+  """Smoothens the raw effort data of a test, copies its position data, and
+  returns the paths to the written effort and position files."""
+
+  destination.mkdir(parents=True, exist_ok=True)
+  effort_path = destination / Path(effort_file_name).with_suffix(
+    f'.{data_format}')
+  position_path = destination / Path(position_file_name).with_suffix(
+    f'.{data_format}')
+
+  print(f"Writing {effort_path.absolute()}")
+  write_data(smooth(read_data(folder / effort_file_name), nb_points),
+             effort_path)
+
+  # The position data is copied as is if no conversion is needed
+  print(f"Writing {position_path.absolute()}")
+  if position_path.suffix == Path(position_file_name).suffix:
+    copyfile(folder / position_file_name, position_path)
+  else:
+    write_data(read_data(folder / position_file_name), position_path)
+
+  return effort_path, position_path
+
+
+def _stress_strain(smoothed: tuple[Path, Path],
+                   notes: pd.DataFrame,
+                   nr: int,
+                   destination: Path) -> Source:
+  """Computes the stress-strain data of a test from its smoothened data, and
+  writes it to the destination file."""
+
+  effort_path, position_path = smoothed
+  destination.parent.mkdir(parents=True, exist_ok=True)
+  print(f"Writing {destination.absolute()}")
+  write_data(compute_stress_strain(read_data(position_path),
+                                   read_data(effort_path), notes, nr),
+             destination)
+  return destination, None
+
+
+def _apply(function: Any, source: Source, *args: Any) -> Any:
+  """Returns the result of the function called on the stress-strain data of a
+  test, followed by the other provided arguments."""
+
+  return function(_load(source), *args)
+
+
+def _apply_indexed(function: Any, source: Source, peaks: Any,
+                   *args: Any) -> Any:
+  """Returns the result of the function called on the stress-strain data of a
+  test, followed by the other provided arguments and by the index of the
+  stress peaks of the test."""
+
+  return function(_load(source), *args, peaks)
+
+
+def _trim(source: Source,
+          cutoff: float,
+          stage: str,
+          destination: Optional[Path]) -> Source:
+  """Trims the stress-strain data of a test for the given trimming stage.
+
+  In the files mode, the trimmed data is written to the destination file.
+  Otherwise, only the trimming index relative to the untrimmed data is
+  computed.
+  """
+
+  data = _load(source)
+  if destination is None:
+    path, row = source
+    start, _, scale, offset = row if row is not None else (0, 0, 1., 0.)
+    return path, compute_trim_index(data, cutoff, stage, start, scale,
+                                    offset)
+
+  destination.parent.mkdir(parents=True, exist_ok=True)
+  print(f"Writing {destination.absolute()}")
+  write_data(_trim_functions[stage](data, cutoff), destination)
+  return destination, None
+
+
+def _fit_yeoh(source: Source,
+              order: int,
+              bounds: Optional[tuple]) -> tuple[float, ...]:
+  """Fits Yeoh's model to the stress-strain data of a test."""
+
+  data = _load(source)
+  fit, = fit_yeoh_n([data[extension_field].values],
+                    [data[stress_field].values], order, bounds)
+  return tuple(float(value) for value in fit)
+
+
+def _write_table(path: Path,
+                 nrs: list[int],
+                 fields: tuple[str, ...],
+                 *values: Any) -> pd.DataFrame:
+  """Writes the values computed for all the tests of a directory to a .csv
+  file, and returns the written table."""
+
+  rows = [(nr, *(value if isinstance(value, tuple) else (value,)))
+          for nr, value in zip(nrs, values)]
+  table = pd.DataFrame(rows, columns=(identifier_field, *fields))
+  path.parent.mkdir(parents=True, exist_ok=True)
+  print(f"Writing {path.absolute()}")
+  table.to_csv(path, index=False)
+  return table
+
+
+def _write_index(path: Path, nrs: list[int], *sources: Source) -> None:
+  """Writes the trimming index of all the tests of a directory to a .csv
+  file."""
+
+  _write_table(path, nrs, _index_fields, *(row for _, row in sources))
+
+
+def _write_peak_index(path: Path, nrs: list[int], *indices: Any) -> None:
+  """Writes the indices of the stress peaks of all the tests of a directory
+  to a .npz file."""
+
+  path.parent.mkdir(parents=True, exist_ok=True)
+  print(f"Writing {path.absolute()}")
+  save_peak_indices(dict(zip(nrs, indices)), path)
+
+
+def _write_results(path: Path,
+                   notes: pd.DataFrame,
+                   *tables: pd.DataFrame) -> tuple[Path, pd.DataFrame]:
+  """Aggregates all the tables of a directory into its results file."""
+
+  results = aggregate_results(notes, *tables)
+  print(f"Writing {path.absolute()}")
+  results.to_csv(path, index=False)
+  return path, results
+
+
+def _write_global_results(path: Path,
+                          *results: tuple[Path, pd.DataFrame]) -> None:
+  """Combines the results of all the directories into the global results
+  file."""
+
+  print(f"Writing {path.absolute()}")
+  combine_results(list(results)).to_csv(path, index=False)
+
+
+def restamp_outputs(directories: list[Path],
+                    outputs: list[Path],
+                    global_results_file: Optional[Path] = None) -> None:
+  """Sets the modification times of the written files in the order of the
+  processing stages.
+
+  As the tasks of different stages run concurrently, the files of a stage may
+  be written before the table of the previous stage, which would make the
+  Makefile consider them outdated. The files of each stage are therefore given
+  a modification time slightly later than the ones of the previous stage.
+
+  Args:
+    directories: The processed directories.
+    outputs: The files and folders written by each stage, relative to each
+      directory and in the order of the stages.
+    global_results_file: The global results file, if one was written.
+  """
+
+  step = 1e-2
+  start = time.time() - (len(outputs) + 1) * step
+  for directory in directories:
+    for rank, output in enumerate(outputs):
+      path = directory / output
+      for file in path.rglob('*') if path.is_dir() else (path,):
+        if file.is_file():
+          os.utime(file, (start + rank * step,) * 2)
+  if global_results_file is not None:
+    os.utime(global_results_file, (start + len(outputs) * step,) * 2)
+
+
+def build_tasks(directories: list[Path],
+                effort_file_name: str,
+                position_file_name: str,
+                data_format: str,
+                test_data_folder: Path,
+                notes_file: Path,
+                smooth_folder: Path,
+                stress_strain_folder: Path,
+                end_trimmed_folder: Path,
+                trimmed_folder: Path,
+                trimmed_fit_folder: Path,
+                files: dict[str, Path],
+                peak_index_file: Path,
+                results_file: Path,
+                nb_points_smooth: int,
+                use_second_dev_begin: bool,
+                stress_threshold: float,
+                sec_dev_thresh: float,
+                use_second_dev_end: bool,
+                nb_points_smooth_end: int,
+                peak_prominence: float,
+                nb_points_peak: int,
+                young_threshold: float,
+                hyper_threshold: float,
+                nb_resamples: int,
+                confidence: float,
+                seed: int,
+                index_files: Optional[tuple[Path, Path, Path]] = None,
+                cache: Optional[ResultCache] = None,
+                global_results_file: Optional[Path] = None,
+                yeoh_order: int = 2,
+                yeoh_positive: bool = False) -> list[Task]:
+  """Builds the graph of tasks processing all the tests of all the given
+  directories.
+
+  All the paths except the directories and the global results file are
+  relative to each directory, as in the Makefile.
+
+  Args:
+    directories: The directories containing the tests to process.
+    effort_file_name: The name of the raw effort data files.
+    position_file_name: The name of the raw position data files.
+    data_format: The format of the intermediate data files of each test.
+    test_data_folder: The folder containing one folder of raw data per test.
+    notes_file: The .csv file containing the metadata of the tests.
+    smooth_folder: The folder where to write the smoothened data.
+    stress_strain_folder: The folder where to write the stress-strain data.
+    end_trimmed_folder: The folder where to write the end-trimmed
+      stress-strain data.
+    trimmed_folder: The folder where to write the trimmed stress-strain data.
+    trimmed_fit_folder: The folder where to write the stress-strain data valid
+      for the Yeoh fit.
+    files: The .csv file where to write the table of each stage, by name of
+      the stage as in _table_fields.
+    peak_index_file: The .npz file where to write the indices of the stress
+      peaks.
+    results_file: The .csv file where to write the final results.
+    nb_points_smooth: The number of points of the Savitzky-Golay filter for
+      smoothening the raw effort data.
+    use_second_dev_begin: Whether to use the second derivative method for
+      detecting the begin extension.
+    stress_threshold: The fraction of the total stress used by the stress
+      threshold method for detecting the begin extension.
+    sec_dev_thresh: The fraction of the maximum second derivative used by the
+      second derivative method for detecting the begin extension.
+    use_second_dev_end: Whether to use the second derivative method for
+      detecting the end extension for the fit.
+    nb_points_smooth_end: The number of points of the Savitzky-Golay filter
+      for detecting the end extension for the fit.
+    peak_prominence: The minimum fraction of the stress range above which a
+      local stress peak is considered as the end of the valid data.
+    nb_points_peak: The maximum width, in samples, of the stress peaks.
+    young_threshold: The fraction of the extension range over which the
+      Young's modulus is computed.
+    hyper_threshold: The fraction of the extension range over which the
+      hyperelastic modulus is computed.
+    nb_resamples: The number of bootstrap resamples drawn for each test.
+    confidence: The confidence level of the bootstrap intervals.
+    seed: The seed of the random generator used for bootstrapping.
+    index_files: If given, the .csv files where to write the trimming index of
+      the end, begin and end fit trimming stages. The trimmed data files are
+      then not written.
+    cache: If given, the results of the most expensive processing stages are
+      looked up in this cache.
+    global_results_file: If given, the .csv file where to combine the results
+      of all the directories.
+    yeoh_order: The number of terms of the Yeoh model to fit.
+    yeoh_positive: Whether to constrain all the Yeoh coefficients to be
+      positive.
+
+  Returns:
+    The list of all the tasks of the graph.
+  """
+
+  def cached(function: Any) -> Any:
+    """Wraps the function so that its results are looked up in the cache."""
+
+    return CachedFunction(function, cache) if cache is not None else function
+
+  yeoh_bounds = positive_bounds(yeoh_order) if yeoh_positive else None
+  table_fields = {**_table_fields, 'yeoh': yeoh_fields[:yeoh_order],
+                  'bootstrap': interval_fields(yeoh_order)}
+  tasks = list()
+  for directory in directories:
+    tests = sorted((path.parent for path in
+                    (directory / test_data_folder).glob(
+                      f'*/{effort_file_name}')), key=get_nr)
+    nrs = [get_nr(folder) for folder in tests]
+    notes = pd.read_csv(directory / notes_file)
+    trim_folders = dict(zip(_trim_functions, (end_trimmed_folder,
+                                              trimmed_folder,
+                                              trimmed_fit_folder)))
+
+    for folder, nr in zip(tests, nrs):
+      size = max((folder / effort_file_name).stat().st_size / 2 ** 20, 1e-3)
+
+      def add(stage: str, function: Any, *dependencies: str,
+              arguments: tuple = (), local: bool = False) -> None:
+        """Adds the task of one processing stage of the current test."""
+
+        tasks.append(Task(
+          (directory, folder.name, stage), function,
+          tuple((directory, folder.name, dependency)
+                for dependency in dependencies),
+          arguments, stage_costs[stage] * size, local))
+
+      def add_trim(stage: str, source: str, cutoff: str) -> None:
+        """Adds the task of one trimming stage of the current test."""
+
+        destination = (directory / trim_folders[stage] /
+                       f'{folder.name}.{data_format}'
+                       if index_files is None else None)
+        add(f'trim_{stage}', _trim, source, cutoff,
+            arguments=(stage, destination))
+
+      add('smooth', _smooth, arguments=(
+        folder, effort_file_name, position_file_name,
+        directory / smooth_folder / folder.name, data_format,
+        nb_points_smooth, cached(smooth_data)))
+      add('stress_strain', _stress_strain, 'smooth', arguments=(
+        notes, nr,
+        directory / stress_strain_folder / f'{folder.name}.{data_format}'))
+      add('end', partial(_apply, detect_end), 'stress_strain')
+      add_trim('end', 'stress_strain', 'end')
+      # The stress peaks are indexed once for the begin and the end fit
+      add('peak_index', partial(_apply, cached(index_peaks)), 'trim_end')
+      add('begin', partial(_apply_indexed, cached(detect_begin)), 'trim_end',
+          'peak_index', arguments=(use_second_dev_begin, stress_threshold,
+                                   sec_dev_thresh, peak_prominence,
+                                   nb_points_peak))
+      add_trim('begin', 'trim_end', 'begin')
+      # The scalar descriptors are computed together, then picked apart
+      add('features', partial(_apply, compute_features), 'trim_begin')
+      add('ultimate_strength', attrgetter('ultimate_strength'), 'features',
+          local=True)
+      add('extensibility', attrgetter('extensibility'), 'features',
+          local=True)
+      add('end_fit', partial(_apply_indexed, cached(detect_end_fit)),
+          'trim_begin', 'peak_index', 'ultimate_strength',
+          arguments=(use_second_dev_end, nb_points_smooth_end,
+                     peak_prominence, nb_points_peak))
+      add_trim('end_fit', 'trim_begin', 'end_fit')
+      add('yeoh', _fit_yeoh, 'trim_end_fit',
+          arguments=(yeoh_order, yeoh_bounds))
+      add('tangent_moduli', partial(_apply, cached(compute_tangent_moduli)),
+          'trim_end_fit', arguments=(young_threshold, hyper_threshold))
+      add('bootstrap', partial(_apply, cached(bootstrap_test)),
+          'trim_end_fit', arguments=(young_threshold, hyper_threshold,
+                                     nb_resamples, confidence, seed, nr,
+                                     yeoh_order, yeoh_bounds))
+
+    # The tables of each directory are written once all its tests are done
+    # The arguments of a task come after the results of its dependencies
+    for stage, fields in table_fields.items():
+      tasks.append(Task(
+        (directory, stage),
+        partial(_write_table, directory / files[stage], nrs, fields),
+        tuple((directory, folder.name, stage) for folder in tests),
+        cost=0., local=True))
+    if index_files is not None:
+      for stage, index_file in zip(_trim_functions, index_files):
+        tasks.append(Task(
+          (directory, f'trim_{stage}'),
+          partial(_write_index, directory / index_file, nrs),
+          tuple((directory, folder.name, f'trim_{stage}')
+                for folder in tests),
+          cost=0., local=True))
+    tasks.append(Task(
+      (directory, 'peak_index'),
+      partial(_write_peak_index, directory / peak_index_file, nrs),
+      tuple((directory, folder.name, 'peak_index') for folder in tests),
+      cost=0., local=True))
+
+    tasks.append(Task(
+      (directory, 'results'),
+      partial(_write_results, directory / results_file, notes),
+      tuple((directory, stage) for stage in ('end', 'begin', 'end_fit',
+                                             'ultimate_strength',
+                                             'extensibility', 'yeoh',
+                                             'tangent_moduli', 'bootstrap')),
+      cost=0., local=True))
+
+  if global_results_file is not None:
+    tasks.append(Task(
+      'global_results', partial(_write_global_results, global_results_file),
+      tuple((directory, 'results') for directory in directories),
+      cost=0., local=True))
+
+  return tasks
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Runs the entire processing chain on the raw data of the tests"
+                " of all the given directories at once, as a graph of tasks "
+                "distributed over a pool of processes.")
+  parser.add_argument('nb_points_smooth', type=int, nargs=1,
+                      help="The number of points to use for the Savitzky-Golay"
+                           " filter smoothening the raw effort data.")
+  parser.add_argument('use_second_derivative_begin', type=str, nargs=1,
+                      help="Boolean indicating whether to use the second "
+                           "derivative method for detecting the minimum "
+                           "extension. Otherwise, the stress threshold method "
+                           "is used.")
+  parser.add_argument('stress_threshold', type=float, nargs=1,
+                      help="The percentage of the total stress below which the"
+                           " data is not considered valid. Only used with the "
+                           "stress threshold method.")
+  parser.add_argument('second_derivative_threshold', type=float, nargs=1,
+                      help="The percentage of the maximum second derivative "
+                           "value below which the data is not considered "
+                           "valid. Only used with the second derivative "
+                           "method.")
+  parser.add_argument('use_second_derivative_end', type=str, nargs=1,
+                      help="Boolean indicating whether to use the second "
+                           "derivative method for detecting the maximum "
+                           "extension for the fit. Otherwise, the maximum of "
+                           "the first derivative is used.")
+  parser.add_argument('nb_points_smooth_end', type=int, nargs=1,
+                      help="Number of points to use for running the "
+                           "Savitzky-Golay filter for smoothening the first "
+                           "derivative of the stress.")
+  parser.add_argument('peak_prominence', type=float, nargs=1,
+                      help="Minimum percentage of the total stress range in "
+                           "the test above which a local stress peak will "
+                           "be considered as the end of the valid data.")
+  parser.add_argument('nb_points_peak', type=int, nargs=1,
+                      help="Maximum width, in samples, of stress peaks to "
+                           "consider for selecting the end cutoff extension.")
+  parser.add_argument('young_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the Young's modulus should be computed.")
+  parser.add_argument('hyperelastic_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the hyperelastic modulus should be "
+                           "computed.")
+  parser.add_argument('nb_resamples', type=checker_positive_int, nargs=1,
+                      help="The number of bootstrap resamples to draw for "
+                           "each test.")
+  parser.add_argument('confidence_level', type=checker_percentage, nargs=1,
+                      help="The confidence level of the bootstrap intervals, "
+                           "as a percentage.")
+  parser.add_argument('seed', type=int, nargs=1,
+                      help="The seed of the random generator used for "
+                           "bootstrapping.")
+  parser.add_argument('effort_file_name', type=str, nargs=1,
+                      help="Name of the raw effort data file in each test "
+                           "folder.")
+  parser.add_argument('position_file_name', type=str, nargs=1,
+                      help="Name of the raw position data file in each test "
+                           "folder.")
+  parser.add_argument('data_format', type=str, nargs=1, choices=data_formats,
+                      help="Format of the intermediate data files of each "
+                           "test, given as their file extension.")
+  parser.add_argument('test_data_folder', type=Path, nargs=1,
+                      help="Path to the folder containing one folder of raw "
+                           "data per test, relative to each directory.")
+  parser.add_argument('notes_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file containing the metadata "
+                           "collected during the tests, relative to each "
+                           "directory.")
+  for name, description in (
+      ('smooth_folder', "smoothened data"),
+      ('stress_strain_folder', "stress-strain data"),
+      ('end_trimmed_folder', "end-trimmed stress-strain data"),
+      ('trimmed_folder', "trimmed stress-strain data"),
+      ('trimmed_fit_folder', "stress-strain data valid for the Yeoh fit")):
+    parser.add_argument(name, type=Path, nargs=1,
+                        help=f"Path to the folder where to store the "
+                             f"{description}, relative to each directory.")
+  for name, description in (
+      ('end_file', "end extension data"),
+      ('begin_file', "begin extension data"),
+      ('end_fit_file', "end extension data for a fit with Yeoh"),
+      ('ultimate_strength_file', "ultimate strength data"),
+      ('extensibility_file', "extensibility data"),
+      ('yeoh_file', "Yeoh coefficients"),
+      ('tangent_moduli_file', "tangent moduli coefficients"),
+      ('bootstrap_file', "bounds of the bootstrap confidence intervals"),
+      ('results_file', "aggregated results")):
+    parser.add_argument(name, type=checker_is_csv, nargs=1,
+                        help=f"Path to the .csv file where to store the "
+                             f"{description}, relative to each directory.")
+  parser.add_argument('peak_index_file', type=Path, nargs=1,
+                      help="Path to the .npz file where to store the indices "
+                           "of the stress peaks, relative to each directory.")
+  parser.add_argument('directories', type=Path, nargs='+',
+                      help="Paths to the directories containing the tests to "
+                           "process.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Maximum number of tasks running at once, each in "
+                           "its own process.")
+  parser.add_argument('--index_files', type=checker_is_csv, nargs=3,
+                      default=None,
+                      help="Paths to the .csv files where to store the "
+                           "trimming index of the end, begin and end fit "
+                           "trimming stages, relative to each directory. If "
+                           "given, the trimmed data files are not written.")
+  parser.add_argument('--global_results', type=checker_is_csv, default=None,
+                      help="Path to the .csv file where to combine the results"
+                           " of all the directories.")
+  parser.add_argument('--cache', type=Path, default=None,
+                      help="Path to the folder where to cache the results of "
+                           "the most expensive processing stages, so that "
+                           "they are only computed again if the data or the "
+                           "parameters change.")
+  parser.add_argument('--cache_size', type=checker_positive_int, default=1024,
+                      help="Maximum size of the cache in MB, beyond which the "
+                           "least recently used results are discarded.")
+  parser.add_argument('--yeoh_order', type=int, default=2,
+                      choices=range(2, len(yeoh_fields) + 1),
+                      help="Number of terms of the Yeoh model to fit.")
+  parser.add_argument('--yeoh_positive', action='store_true',
+                      help="If given, constrains all the Yeoh coefficients to "
+                           "be positive.")
+  args = parser.parse_args()
+
+  graph = build_tasks(
+    directories=args.directories,
+    effort_file_name=args.effort_file_name[0],
+    position_file_name=args.position_file_name[0],
+    data_format=args.data_format[0],
+    test_data_folder=args.test_data_folder[0],
+    notes_file=args.notes_file[0],
+    smooth_folder=args.smooth_folder[0],
+    stress_strain_folder=args.stress_strain_folder[0],
+    end_trimmed_folder=args.end_trimmed_folder[0],
+    trimmed_folder=args.trimmed_folder[0],
+    trimmed_fit_folder=args.trimmed_fit_folder[0],
+    files={stage: getattr(args, f'{stage}_file')[0]
+           for stage in _table_fields},
+    peak_index_file=args.peak_index_file[0],
+    results_file=args.results_file[0],
+    nb_points_smooth=args.nb_points_smooth[0],
+    use_second_dev_begin=args.use_second_derivative_begin[0] == 'true',
+    stress_threshold=args.stress_threshold[0] / 100,
+    sec_dev_thresh=args.second_derivative_threshold[0] / 100,
+    use_second_dev_end=args.use_second_derivative_end[0] == 'true',
+    nb_points_smooth_end=args.nb_points_smooth_end[0],
+    peak_prominence=args.peak_prominence[0] / 100,
+    nb_points_peak=args.nb_points_peak[0],
+    young_threshold=args.young_threshold[0] / 100,
+    hyper_threshold=args.hyperelastic_threshold[0] / 100,
+    nb_resamples=args.nb_resamples[0],
+    confidence=args.confidence_level[0] / 100,
+    seed=args.seed[0],
+    index_files=(tuple(args.index_files) if args.index_files is not None
+                 else None),
+    cache=(ResultCache(args.cache, args.cache_size * 2 ** 20)
+           if args.cache is not None else None),
+    global_results_file=args.global_results,
+    yeoh_order=args.yeoh_order,
+    yeoh_positive=args.yeoh_positive)
+
+  run_graph(graph, jobs=args.jobs)
+
+  # Ordering the modification times of the files as the Makefile expects
+  index_files = args.index_files or (args.end_trimmed_folder[0],
+                                     args.trimmed_folder[0],
+                                     args.trimmed_fit_folder[0])
+  restamp_outputs(args.directories,
+                  [args.smooth_folder[0], args.stress_strain_folder[0],
+                   args.end_file[0], index_files[0],
+                   args.peak_index_file[0], args.begin_file[0],
+                   index_files[1], args.ultimate_strength_file[0],
+                   args.extensibility_file[0], args.end_fit_file[0],
+                   index_files[2], args.yeoh_file[0],
+                   args.tangent_moduli_file[0], args.bootstrap_file[0],
+                   args.results_file[0]], args.global_results)
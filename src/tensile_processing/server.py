@@ -0,0 +1,190 @@
+# coding: utf-8
+
+"""This script runs a worker server, that keeps the modules of the package and
+their heavy dependencies loaded, and runs the executable scripts sent by the
+client script. Each script runs in a process forked from the server, so it
+starts without importing anything while still running in a clean process, and
+the Makefile recipes using the client start in milliseconds instead of about a
+second."""
+
+import argparse
+from importlib import import_module
+import json
+import os
+from pathlib import Path
+import pkgutil
+import runpy
+import signal
+import socket
+import socketserver
+import sys
+import traceback
+
+from .tools.argparse_checkers import checker_positive_int
+
+# The data read from the client in one go, larger than most requests
+_chunk_size = 65536
+
+
+def preload() -> None:
+  """Imports the heavy dependencies and all the executable scripts, so that
+  the processes forked from the server do not need to import them again."""
+
+  import matplotlib
+  matplotlib.use('Agg')
+  import_module('scipy.signal')
+  import_module('scipy.optimize')
+
+  for package in ('processing', 'plotting'):
+    path = Path(__file__).parent / package
+    for module in pkgutil.iter_modules([str(path)]):
+      import_module(f'{__package__}.{package}.{module.name}')
+
+
+def clear_socket(path: Path) -> None:
+  """Removes the socket left at the given path by a previous server that did
+  not exit properly, if any.
+
+  The socket is only removed if no server accepts connections on it anymore.
+
+  Args:
+    path: The path where to create the Unix socket of the server.
+
+  Raises:
+    FileExistsError: Raised in case a server is still running on the socket,
+      or in case the path exists and is not a socket.
+  """
+
+  if not path.exists():
+    return
+  if not path.is_socket():
+    raise FileExistsError(f"{path} exists and is not a socket, refusing to "
+                          f"remove it !")
+
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+    try:
+      client.connect(str(path))
+    except ConnectionRefusedError:
+      path.unlink()
+      return
+  raise FileExistsError(f"A server is already running on {path} !")
+
+
+def run_script(module: str,
+               arguments: list[str],
+               directory: str,
+               environment: dict[str, str],
+               streams: list[int]) -> int:
+  """Runs a script as if it was started from the command line by the client.
+
+  Args:
+    module: The full name of the module to run as a script.
+    arguments: The command line arguments to pass to the script.
+    directory: The working directory of the client.
+    environment: The environment variables of the client.
+    streams: The file descriptors of the standard input, output and error of
+      the client.
+
+  Returns:
+    The exit status of the script.
+  """
+
+  # Taking over the streams, the directory and the environment of the client
+  for target, stream in enumerate(streams):
+    os.dup2(stream, target)
+    os.close(stream)
+  os.chdir(directory)
+  os.environ.clear()
+  os.environ.update(environment)
+  sys.argv = [module, *arguments]
+
+  try:
+    runpy.run_module(module, run_name='__main__', alter_sys=True)
+    status = 0
+  except SystemExit as exit_:
+    if exit_.code is None or isinstance(exit_.code, int):
+      status = exit_.code or 0
+    else:
+      print(exit_.code, file=sys.stderr)
+      status = 1
+  except BaseException:
+    traceback.print_exc()
+    status = 1
+  finally:
+    sys.stdout.flush()
+    sys.stderr.flush()
+  return status
+
+
+class _ScriptHandler(socketserver.BaseRequestHandler):
+  """Runs the script requested by a client, in the process forked for the
+  request."""
+
+  def handle(self) -> None:
+    """Reads the request and the streams of the client, runs the script, and
+    sends its exit status back."""
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    message, streams, *_ = socket.recv_fds(self.request, _chunk_size, 3)
+    # Nothing is sent by the clients only checking that the server is running
+    if not message:
+      return
+    chunks = [message]
+    while chunk := self.request.recv(_chunk_size):
+      chunks.append(chunk)
+    request = json.loads(b''.join(chunks))
+
+    if not request['module'].startswith(f'{__package__}.'):
+      print(f"Refusing to run {request['module']}, not in {__package__}",
+            file=sys.stderr)
+      status = 1
+    else:
+      status = run_script(request['module'], request['arguments'],
+                          request['directory'], request['environment'],
+                          streams)
+    self.request.sendall(str(status).encode())
+
+
+class _Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+  """Unix socket server forking a new process for each request."""
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Runs a worker server keeping the package loaded, and running "
+                "the scripts sent by the client until interrupted.")
+  parser.add_argument('socket', type=Path, nargs=1,
+                      help="Path where to create the Unix socket of the "
+                           "server.")
+  parser.add_argument('--workers', type=checker_positive_int,
+                      default=os.cpu_count(),
+                      help="Maximum number of scripts running at once, the "
+                           "other ones waiting for one to finish.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  path = args.socket[0]
+  workers = args.workers
+
+  # Removing the socket of a previous server that did not exit properly
+  path.parent.mkdir(parents=True, exist_ok=True)
+  try:
+    clear_socket(path)
+  except FileExistsError as error:
+    parser.error(str(error))
+
+  preload()
+  signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+  server = _Server(str(path), _ScriptHandler)
+  server.max_children = workers
+  print(f"Serving on {path.absolute()}")
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+    path.unlink(missing_ok=True)
@@ -0,0 +1,146 @@
+# coding: utf-8
+
+"""This script measures the time it takes to import each of the executable
+Python scripts, and checks it against a budget. As the Makefile launches these
+scripts once or more for each test, their startup time dominates the
+processing time of large campaigns. The imported modules are measured with the
+-X importtime option of the interpreter, so the heavy dependencies that a
+script should only import when needed are detected as well."""
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+import subprocess
+import sys
+
+from .tools.argparse_checkers import checker_positive_int
+
+
+@dataclass(frozen=True)
+class Budget:
+  """The maximum startup time of a script, and the modules it should not
+  import at startup."""
+
+  milliseconds: float
+  forbidden: tuple[str, ...]
+
+
+# Budgets for the processing scripts, that only need pandas and numpy at
+# startup, for the plotting scripts, that also need matplotlib, for the
+# pipeline, the scheduler and the campaign runner, that import all the
+# processing scripts, and for the client of the worker server, that must only
+# import the standard library. The budgets leave a margin of about 50% over the
+# startup times measured on a recent machine
+_processing = Budget(200, ('scipy', 'matplotlib'))
+_plotting = Budget(400, ('scipy',))
+budgets = {
+  **{f'processing.{name}': _processing
+     for name in ('smooth', 'convert', 'stress_strain', 'end', 'trim_end',
+                  'peak_index', 'begin', 'trim_begin', 'ultimate_strength',
+                  'extensibility', 'features', 'end_fit', 'trim_end_fit',
+                  'trim_index', 'yeoh', 'tangent_moduli', 'bootstrap',
+                  'results', 'global_results')},
+  **{f'plotting.{name}': _plotting
+     for name in ('save_curve', 'begin_end_curve', 'all_stress_strain_curves',
+                  'interpolated_curve', 'moduli_curve', 'batch')},
+  'pipeline': Budget(220, ('matplotlib',)),
+  'scheduler': Budget(220, ('matplotlib',)),
+  'campaign': Budget(220, ('matplotlib',)),
+  'report': _processing,
+  'sweep': _processing,
+  'client': Budget(20, ('pandas', 'numpy', 'scipy', 'matplotlib'))}
+
+
+def _import_times(statement: str) -> dict[str, tuple[int, int]]:
+  """Runs the given statement in a new interpreter with the -X importtime
+  option, and returns for each imported module its depth in the import tree
+  and its cumulative import time in microseconds."""
+
+  stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                           statement], capture_output=True, text=True,
+                          check=True).stderr
+  times = dict()
+  for line in stderr.splitlines():
+    if not line.startswith('import time:') or 'imported package' in line:
+      continue
+    _, cumulative, name = line.split('|')
+    depth = (len(name) - len(name.lstrip())) // 2
+    times[name.strip()] = (depth, int(cumulative))
+  return times
+
+
+def measure_startup(module: str, repeat: int = 5) -> tuple[float, set[str]]:
+  """Measures the time it takes to import a module in a new interpreter.
+
+  Only the modules that are not already imported by an empty interpreter are
+  accounted for, and the minimum time over several runs is kept to reduce the
+  noise.
+
+  Args:
+    module: The full name of the module to import.
+    repeat: The number of times the import is measured.
+
+  Returns:
+    The import time in milliseconds, and the names of the imported modules.
+  """
+
+  baseline = set(_import_times('pass'))
+  best = float('inf')
+  imported = set()
+  for _ in range(repeat):
+    times = {name: value for name, value in
+             _import_times(f'import {module}').items()
+             if name not in baseline}
+    # The top-level imports contain the time of all the nested ones
+    top = min(depth for depth, _ in times.values())
+    best = min(best, sum(cumulative for depth, cumulative in times.values()
+                         if depth == top) / 1000)
+    imported = set(times)
+  return best, imported
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="Measures the startup time of the executable scripts, and "
+                "checks that it is within budget and that no heavy dependency"
+                " is imported at startup.")
+  parser.add_argument('--repeat', type=checker_positive_int, default=5,
+                      help="Number of times the startup of each script is "
+                           "measured, the fastest one being kept.")
+  parser.add_argument('--scale', type=float, default=1.,
+                      help="Factor by which to multiply all the time budgets, "
+                           "for checking on a slower or faster machine.")
+  parser.add_argument('scripts', type=str, nargs='*', metavar='script',
+                      help="Names of the scripts to check, relative to the "
+                           "package, e.g. processing.trim_end. All the scripts"
+                           " are checked if none is given.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  repeat = args.repeat
+  scale = args.scale
+  scripts = args.scripts or list(budgets)
+  # The choices cannot be given to argparse, as it then rejects an empty list
+  unknown = [script for script in scripts if script not in budgets]
+  if unknown:
+    parser.error(f"argument script: invalid choice: {', '.join(unknown)} "
+                 f"(choose from {', '.join(budgets)})")
+  package = Path(__file__).parent.name
+
+  failed = False
+  for script in scripts:
+    budget = budgets[script]
+    duration, imported = measure_startup(f'{package}.{script}', repeat)
+
+    # Checking the time and the imported modules against the budget
+    heavy = sorted(name for name in budget.forbidden if name in imported)
+    over = duration > budget.milliseconds * scale
+    status = 'FAIL' if over or heavy else 'ok'
+    print(f"{status:>4} {script:<36} {duration:8.1f} ms "
+          f"(budget {budget.milliseconds * scale:.0f} ms)"
+          + (f", imports {', '.join(heavy)}" if heavy else ''))
+    failed |= over or bool(heavy)
+
+  sys.exit(1 if failed else 0)
@@ -0,0 +1,354 @@
+# coding: utf-8
+
+"""This script reads end-trimmed stress-strain data from source files, and runs
+the detection of the begin and of the end of the fit, the Yeoh fit and the
+computation of the tangent moduli for every combination of the given values of
+the detection parameters. The metrics obtained for each test and each set of
+parameters are saved in one table, so that the parameters can be tuned in a
+single run instead of editing the .mk files and running make again."""
+
+import argparse
+from collections.abc import Sequence
+from functools import cache
+from itertools import product, repeat
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+from .processing.begin import detect_begin, restrict_second_dev, \
+  compute_second_derivatives, begins_from_second_derivatives
+from .processing.trim_begin import trim_begin
+from .processing.features import compute_features
+from .processing.end_fit import detect_end_fit
+from .processing.peak_index import index_peaks
+from .processing.trim_end_fit import trim_end_fit
+from .processing.yeoh import fit_yeoh
+from .processing.tangent_moduli import compute_tangent_moduli
+from .tools.argparse_checkers import checker_is_csv, checker_valid_csv, \
+  checker_valid_data, checker_positive_int
+from .tools.fields import identifier_field, begin_field, end_fit_field, \
+  ultimate_strength_field, yeoh_0_field, yeoh_fields, young_modulus_field, \
+  hyperelastic_offset_field, hyperelastic_modulus_field, extension_field, \
+  stress_field, stress_threshold_field, sec_dev_threshold_field, \
+  peak_threshold_field, peak_range_field, nb_points_smooth_end_field, \
+  fit_points_field, yeoh_r2_field, failed_tests_field
+from .tools.get_nr import get_nr
+from .tools.parallel import map_files
+from .tools.peaks import PeakIndex, load_peak_indices
+from .tools.table import ResultTable
+from .tools.yeoh_model import yeoh, positive_bounds
+
+# The fields of the swept parameters
+parameter_fields = (stress_threshold_field, sec_dev_threshold_field,
+                    peak_threshold_field, peak_range_field,
+                    nb_points_smooth_end_field)
+
+
+def metric_fields(order: int = 2) -> tuple[str, ...]:
+  """Returns the fields of the metrics computed for each set of parameters,
+  for the Yeoh model with the given number of terms."""
+
+  return (begin_field, ultimate_strength_field, end_fit_field,
+          fit_points_field, *yeoh_fields[:order], yeoh_r2_field,
+          young_modulus_field, hyperelastic_offset_field,
+          hyperelastic_modulus_field)
+
+# The errors raised by the processing functions on data they cannot handle,
+# for which the metrics are left empty
+_processing_errors = (ValueError, IndexError, np.linalg.LinAlgError)
+
+
+def sweep_test(data: pd.DataFrame,
+               use_second_dev_begin: bool,
+               use_second_dev_end: bool,
+               stress_thresholds: Sequence[float],
+               sec_dev_thresholds: Sequence[float],
+               peak_prominences: Sequence[float],
+               nb_points_peaks: Sequence[int],
+               nb_points_smooth_ends: Sequence[int],
+               young_threshold: float,
+               hyper_threshold: float,
+               peaks: Optional[PeakIndex] = None,
+               order: int = 2,
+               bounds: Optional[tuple[Sequence[float],
+                                      Sequence[float]]] = None
+               ) -> pd.DataFrame:
+  """Processes the end-trimmed stress-strain data of one test for every
+  combination of the given values of the detection parameters.
+
+  Each intermediate result is only computed once for all the combinations
+  sharing the parameters it depends on. The second derivative of the stress is
+  for example only computed once per peak threshold and range, whatever the
+  second derivative threshold, and the Yeoh fit only once per begin and end
+  extension. The stress peaks are indexed once, and the index is filtered for
+  each peak threshold and range. The parameters not used by the chosen
+  detection methods are not swept, and are left empty in the table.
+
+  Args:
+    data: The DataFrame containing the end-trimmed stress-strain data.
+    use_second_dev_begin: If True, the begin extension is detected with the
+      second derivative method, otherwise with the stress threshold method.
+    use_second_dev_end: If True, the end extension of the fit is detected with
+      the second derivative method, otherwise with the first derivative one.
+    stress_thresholds: The fractions of the total stress to try for the stress
+      threshold method.
+    sec_dev_thresholds: The fractions of the maximum second derivative to try
+      for the second derivative method.
+    peak_prominences: The minimum fractions of the stress range above which a
+      stress peak is considered as the end of the valid data, to try.
+    nb_points_peaks: The maximum widths of the stress peaks to try.
+    nb_points_smooth_ends: The numbers of points of the filter computing the
+      first derivative of the stress to try.
+    young_threshold: The fraction of the total extension range over which the
+      Young's modulus is computed.
+    hyper_threshold: The fraction of the total extension range over which the
+      hyperelastic modulus is computed.
+    peaks: The index of the stress peaks of the data, if already computed.
+    order: The number of terms of the Yeoh model to fit.
+    bounds: The lower and upper bounds of the Yeoh coefficients, as a tuple
+      containing the lower bounds and a tuple containing the upper bounds. If
+      not given, the coefficients are not constrained.
+
+  Returns:
+    The DataFrame containing one row per combination of parameters, with the
+    parameters in the units of the .mk files followed by the metrics.
+  """
+
+  if use_second_dev_begin:
+    stress_thresholds = (np.nan,)
+  else:
+    sec_dev_thresholds = (np.nan,)
+  if use_second_dev_end:
+    nb_points_smooth_ends = (np.nan,)
+  if peaks is None:
+    peaks = index_peaks(data)
+
+  @cache
+  def second_derivatives(peak_prominence, nb_points_peak):
+    """The second derivative of the stress, independent of its threshold."""
+
+    return compute_second_derivatives(
+      [restrict_second_dev(data, peak_prominence, nb_points_peak, peaks)])
+
+  def begin(stress_threshold, sec_dev_thresh, peak_prominence, nb_points_peak):
+    """The begin extension, from the second derivative or the stress."""
+
+    if use_second_dev_begin:
+      return float(begins_from_second_derivatives(
+        second_derivatives(peak_prominence, nb_points_peak),
+        sec_dev_thresh)[0])
+    return begin_threshold(stress_threshold)
+
+  @cache
+  def begin_threshold(stress_threshold):
+    """The begin extension with the stress threshold method."""
+
+    return float(detect_begin(data, False, stress_threshold, np.nan, np.nan,
+                              0))
+
+  @cache
+  def trimmed(begin_extension):
+    """The data trimmed at the begin extension, and its ultimate strength."""
+
+    valid = trim_begin(data, begin_extension)
+    return valid, compute_features(valid).ultimate_strength
+
+  @cache
+  def end_fit(begin_extension, peak_prominence, nb_points_peak,
+              nb_points_smooth):
+    """The end extension of the fit, for a given begin extension."""
+
+    valid, strength = trimmed(begin_extension)
+    return float(detect_end_fit(valid, strength, use_second_dev_end,
+                                nb_points_smooth, peak_prominence,
+                                nb_points_peak, peaks))
+
+  @cache
+  def fit(begin_extension, end_extension):
+    """The metrics of the fit over the data between the two extensions."""
+
+    valid = trim_end_fit(trimmed(begin_extension)[0], end_extension)
+    extension = valid[extension_field].values
+    stress = valid[stress_field].values
+    coefficients = fit_yeoh(valid, bounds, order)
+    residuals = stress - yeoh(extension, *coefficients)
+    r2 = 1 - np.sum(residuals ** 2) / np.sum((stress - stress.mean()) ** 2)
+    young, offset, hyper = compute_tangent_moduli(valid, young_threshold,
+                                                  hyper_threshold)
+    return {fit_points_field: len(valid),
+            **dict(zip(yeoh_fields, coefficients)),
+            yeoh_r2_field: r2, young_modulus_field: young,
+            hyperelastic_offset_field: offset,
+            hyperelastic_modulus_field: hyper}
+
+  grid = list(product(stress_thresholds, sec_dev_thresholds, peak_prominences,
+                      nb_points_peaks, nb_points_smooth_ends))
+  table = ResultTable(len(grid), (*parameter_fields, *metric_fields(order)))
+  for (stress_threshold, sec_dev_thresh, peak_prominence, nb_points_peak,
+       nb_points_smooth) in grid:
+    row = {stress_threshold_field: 100 * stress_threshold,
+           sec_dev_threshold_field: 100 * sec_dev_thresh,
+           peak_threshold_field: 100 * peak_prominence,
+           peak_range_field: nb_points_peak,
+           nb_points_smooth_end_field: nb_points_smooth}
+
+    # Leaving the metrics that could not be computed empty
+    try:
+      row[begin_field] = begin(stress_threshold, sec_dev_thresh,
+                               peak_prominence, nb_points_peak)
+      row[ultimate_strength_field] = trimmed(row[begin_field])[1]
+      row[end_fit_field] = end_fit(row[begin_field], peak_prominence,
+                                   nb_points_peak, nb_points_smooth)
+      row.update(fit(row[begin_field], row[end_fit_field]))
+    except _processing_errors:
+      pass
+    table.append(row)
+
+  return table.to_frame()
+
+
+def summarize_sweep(sweep: pd.DataFrame) -> pd.DataFrame:
+  """Aggregates the metrics of all the tests for each set of parameters.
+
+  Args:
+    sweep: The DataFrame containing the metrics of each test for each set of
+      parameters, as returned by sweep_test along with the test numbers.
+
+  Returns:
+    The DataFrame containing for each set of parameters the mean and the
+    standard deviation of each metric over the tests, and the number of tests
+    for which the metrics could not be computed.
+  """
+
+  metrics = [field for field in sweep.columns
+             if field not in (identifier_field, *parameter_fields)]
+  groups = sweep.groupby(list(parameter_fields), dropna=False, sort=False)
+  summary = groups[metrics].agg(['mean', 'std'])
+  summary.columns = [f'{field} {statistic}'
+                     for field, statistic in summary.columns]
+  summary[failed_tests_field] = groups[yeoh_0_field].apply(
+    lambda values: values.isna().sum())
+  return summary.reset_index()
+
+
+if __name__ == '__main__':
+
+  # Parser for parsing the command line arguments of the script
+  parser = argparse.ArgumentParser(
+    description="For each source file, runs the detection of the begin and "
+                "of the end of the fit, the Yeoh fit and the computation of "
+                "the tangent moduli for every combination of the given "
+                "detection parameters. The metrics of each test and each set "
+                "of parameters are then saved to the destination file.")
+  parser.add_argument('destination_file', type=checker_is_csv, nargs=1,
+                      help="Path to the .csv file where to store the metrics "
+                           "of each test for each set of parameters.")
+  parser.add_argument('use_second_derivative_begin', type=str, nargs=1,
+                      help="Boolean indicating whether to use the second "
+                           "derivative method for detecting the minimum "
+                           "extension. Otherwise, the stress threshold method "
+                           "is used.")
+  parser.add_argument('use_second_derivative_end', type=str, nargs=1,
+                      help="Boolean indicating whether to use the second "
+                           "derivative method for detecting the maximum "
+                           "extension of the fit. Otherwise, the maximum of "
+                           "the first derivative is used.")
+  parser.add_argument('young_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the Young's modulus should be computed.")
+  parser.add_argument('hyperelastic_threshold', type=float, nargs=1,
+                      help="The percentage of the total extension range over "
+                           "which the hyperelastic modulus should be "
+                           "computed.")
+  parser.add_argument('source_files', type=checker_valid_data, nargs='+',
+                      help="Paths to the data files containing the "
+                           "end-trimmed stress-strain data.")
+  parser.add_argument('--stress_threshold', type=float, nargs='+',
+                      required=True,
+                      help="The percentages of the total stress to try for "
+                           "the stress threshold method.")
+  parser.add_argument('--second_derivative_threshold', type=float, nargs='+',
+                      required=True,
+                      help="The percentages of the maximum second derivative "
+                           "to try for the second derivative method.")
+  parser.add_argument('--peak_threshold', type=float, nargs='+',
+                      required=True,
+                      help="The minimum percentages of the total stress range "
+                           "above which a local stress peak is considered as "
+                           "the end of the valid data, to try.")
+  parser.add_argument('--peak_range', type=checker_positive_int, nargs='+',
+                      required=True,
+                      help="The maximum widths, in samples, of the stress "
+                           "peaks to consider, to try.")
+  parser.add_argument('--nb_points_smooth_end', type=checker_positive_int,
+                      nargs='+', required=True,
+                      help="The numbers of points of the Savitzky-Golay filter "
+                           "computing the first derivative of the stress, to "
+                           "try.")
+  parser.add_argument('--summary_file', type=checker_is_csv, default=None,
+                      help="Path to the .csv file where to store the metrics "
+                           "of each set of parameters aggregated over all the "
+                           "tests.")
+  parser.add_argument('--peak_index', type=Path, default=None,
+                      help="Path to the .npz file containing the index of the "
+                           "stress peaks of each source file, so that the "
+                           "peaks are not searched again.")
+  parser.add_argument('--index', type=checker_valid_csv, default=None,
+                      help="Path to the .csv file containing the trimming "
+                           "index to apply to the source files, in case they "
+                           "contain untrimmed stress-strain data.")
+  parser.add_argument('--order', type=int, default=2,
+                      choices=range(2, len(yeoh_fields) + 1),
+                      help="Number of terms of the Yeoh model to fit.")
+  parser.add_argument('--positive', action='store_true',
+                      help="If given, constrains all the Yeoh coefficients to "
+                           "be positive.")
+  parser.add_argument('--jobs', type=checker_positive_int, default=1,
+                      help="Number of processes to use for processing the "
+                           "source files in parallel.")
+  args = parser.parse_args()
+
+  # Getting the arguments from the parser
+  destination = args.destination_file[0]
+  use_second_dev_begin = args.use_second_derivative_begin[0] == 'true'
+  use_second_dev_end = args.use_second_derivative_end[0] == 'true'
+  young_threshold = args.young_threshold[0] / 100
+  hyper_threshold = args.hyperelastic_threshold[0] / 100
+  stress_thresholds = [value / 100 for value in args.stress_threshold]
+  sec_dev_thresholds = [value / 100
+                        for value in args.second_derivative_threshold]
+  peak_prominences = [value / 100 for value in args.peak_threshold]
+  order = args.order
+  bounds = positive_bounds(order) if args.positive else None
+  source_files = sorted(args.source_files, key=get_nr)
+  peak_indices = (load_peak_indices(args.peak_index)
+                  if args.peak_index is not None else dict())
+  index = (pd.read_csv(args.index, float_precision='round_trip')
+           if args.index is not None else None)
+
+  # Sweeping the parameters for each source file
+  sweeps = map_files(sweep_test, source_files, repeat(use_second_dev_begin),
+                     repeat(use_second_dev_end), repeat(stress_thresholds),
+                     repeat(sec_dev_thresholds), repeat(peak_prominences),
+                     repeat(args.peak_range),
+                     repeat(args.nb_points_smooth_end),
+                     repeat(young_threshold), repeat(hyper_threshold),
+                     [peak_indices.get(get_nr(path)) for path in source_files],
+                     repeat(order), repeat(bounds), jobs=args.jobs,
+                     index=index)
+
+  # Gathering the metrics of all the source files in one table
+  to_write = ResultTable(sum(map(len, sweeps)),
+                         (identifier_field, *parameter_fields,
+                          *metric_fields(order)))
+  for path, sweep in zip(source_files, sweeps):
+    to_write.extend({identifier_field: np.full(len(sweep), get_nr(path)),
+                     **{label: sweep[label].to_numpy() for label in sweep}},
+                    nb_rows=len(sweep))
+  table = to_write.to_frame()
+
+  # Saving the metrics to the destination files
+  table.to_csv(destination, index=False)
+  if args.summary_file is not None:
+    summarize_sweep(table).to_csv(args.summary_file, index=False)
@@ -1,15 +1,66 @@
 # coding: utf-8
 
-"""This file imports the tools to make them accessible to the executable Python
-scripts."""
-
-from .argparse_checkers import checker_is_tiff, checker_valid_csv, \
-  checker_is_csv
-from .yeoh_model import yeoh_2
-from .fields import identifier_field, condition_field, type_field, \
-  height_offset_field, height_field, width_offset_field, width_field, \
-  initial_length_field, begin_field, end_field, extensibility_field, \
-  ultimate_strength_field, yeoh_0_field, yeoh_1_field, young_modulus_field, \
-  hyperelastic_offset_field, hyperelastic_modulus_field, extension_field, \
-  stress_field
+"""This file makes the tools accessible to the executable Python scripts.
+
+The tools are only imported from their modules when first accessed, so that
+importing one of them does not import the heavy dependencies of all the
+others."""
+
+from importlib import import_module
+from typing import Any
+
+# Imported eagerly, as otherwise the get_nr module could shadow the function
 from .get_nr import get_nr
+
+# The module defining each of the tools accessible from this package
+_modules = {
+  **dict.fromkeys(('checker_is_tiff', 'checker_valid_csv', 'checker_is_csv',
+                   'checker_positive_int', 'checker_valid_data',
+                   'checker_is_data'), 'argparse_checkers'),
+  **dict.fromkeys(('yeoh', 'yeoh_basis', 'yeoh_2', 'yeoh_2_basis',
+                   'positive_bounds', 'group_guesses', 'fit_yeoh_n',
+                   'yeoh_normal_equations', 'solve_yeoh_normal',
+                   'fit_yeoh_2'), 'yeoh_model'),
+  **dict.fromkeys(('identifier_field', 'condition_field', 'type_field',
+                   'height_offset_field', 'height_field',
+                   'width_offset_field', 'width_field',
+                   'initial_length_field', 'begin_field', 'end_field',
+                   'extensibility_field', 'ultimate_strength_field',
+                   'yeoh_0_field', 'yeoh_1_field', 'yeoh_2_field',
+                   'yeoh_3_field', 'yeoh_fields', 'young_modulus_field',
+                   'hyperelastic_offset_field', 'hyperelastic_modulus_field',
+                   'extension_field', 'stress_field'), 'fields'),
+  **dict.fromkeys(('ResultCache', 'CachedFunction', 'hash_arguments'),
+                  'cache'),
+  **dict.fromkeys(('parallel_map', 'map_files'), 'parallel'),
+  **dict.fromkeys(('fingerprint_file', 'read_record', 'write_record'),
+                  'record'),
+  **dict.fromkeys(('read_data', 'write_data'), 'storage'),
+  'data_formats': 'formats',
+  'ResultTable': 'table',
+  'profile_stage': 'profiling',
+  **dict.fromkeys(('savgol_filter', 'batch_savgol_filter', 'savgol_methods'),
+                  'savgol'),
+  **dict.fromkeys(('pack_rows', 'row_batches'), 'packing'),
+  **dict.fromkeys(('PeakIndex', 'compute_peak_index', 'first_peak',
+                   'save_peak_indices', 'load_peak_indices'), 'peaks'),
+  **dict.fromkeys(('Task', 'critical_path', 'run_graph'), 'task_graph'),
+  **dict.fromkeys(('select_rows', 'trim_view', 'read_trimmed'), 'views')}
+
+__all__ = ['get_nr', *_modules]
+
+
+def __getattr__(name: str) -> Any:
+  """Imports the requested tool from its module on first access."""
+
+  if name not in _modules:
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  value = getattr(import_module(f'.{_modules[name]}', __name__), name)
+  globals()[name] = value
+  return value
+
+
+def __dir__() -> list[str]:
+  """Lists the tools accessible from this package."""
+
+  return sorted(set(globals()) | set(_modules))
@@ -6,6 +6,8 @@ the executable Python scripts."""
 import argparse
 from pathlib import Path
 
+from .formats import data_formats
+
 
 def checker_valid_csv(raw_path: str) -> Path:
   """Function checking that the provided path to the .csv file is valid.
@@ -74,3 +76,102 @@ def checker_is_csv(raw_path: str) -> Path:
                                      f'should be .csv, got {path.suffix} for '
                                      f'file {str(path)}')
   return path
+
+
+def checker_valid_data(raw_path: str) -> Path:
+  """Function checking that the provided path to the data file is valid.
+
+  Args:
+    raw_path: The provided path, as a string.
+
+  Returns:
+    The pathlib Path associated with the provided string path.
+
+  Raises:
+    argparse.ArgumentTypeError: Raised in case the provided path does not
+      exist, or if it is not a file, or if the file extension does not
+      correspond to a supported data format.
+  """
+
+  path = checker_is_data(raw_path)
+  if not path.exists():
+    raise argparse.ArgumentTypeError(f"The file {str(path)} does not exist !")
+  elif not path.is_file():
+    raise argparse.ArgumentTypeError(f"The path {str(path)} does not point to "
+                                     f"a file !")
+  return path
+
+
+def checker_is_data(raw_path: str) -> Path:
+  """Function checking that the provided path to the data file has a valid
+  extension.
+
+  Args:
+    raw_path: The provided path, as a string.
+
+  Returns:
+    The pathlib Path associated with the provided string path.
+
+  Raises:
+    argparse.ArgumentTypeError: Raised in case the file extension does not
+      correspond to a supported data format.
+  """
+
+  path = Path(raw_path)
+  if path.suffix.lstrip('.') not in data_formats:
+    raise argparse.ArgumentTypeError(f'The extension of the provided file '
+                                     f'should be one of '
+                                     f'{", ".join(data_formats)}, got '
+                                     f'{path.suffix} for file {str(path)}')
+  return path
+
+
+def checker_positive_int(raw_value: str) -> int:
+  """Function checking that the provided value is a strictly positive integer.
+
+  Args:
+    raw_value: The provided value, as a string.
+
+  Returns:
+    The provided value, as an integer.
+
+  Raises:
+    argparse.ArgumentTypeError: Raised in case the provided value is not an
+      integer, or if it is not strictly positive.
+  """
+
+  try:
+    value = int(raw_value)
+  except ValueError:
+    raise argparse.ArgumentTypeError(f'The provided value should be an '
+                                     f'integer, got {raw_value}')
+  if value < 1:
+    raise argparse.ArgumentTypeError(f'The provided value should be strictly '
+                                     f'positive, got {value}')
+  return value
+
+
+def checker_percentage(raw_value: str) -> float:
+  """Function checking that the provided value is a percentage strictly
+  between 0 and 100.
+
+  Args:
+    raw_value: The provided value, as a string.
+
+  Returns:
+    The provided value, as a float.
+
+  Raises:
+    argparse.ArgumentTypeError: Raised in case the provided value is not a
+      number, or if it is not strictly between 0 and 100.
+  """
+
+  try:
+    value = float(raw_value)
+  except ValueError:
+    raise argparse.ArgumentTypeError(f'The provided value should be a '
+                                     f'number, got {raw_value}')
+  if not 0 < value < 100:
+    raise argparse.ArgumentTypeError(f'The provided value should be strictly '
+                                     f'between 0 and 100, got {value}')
+  return value
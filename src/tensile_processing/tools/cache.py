@@ -0,0 +1,237 @@
+# coding: utf-8
+
+"""This file contains a cache storing the results of the processing functions
+on disk, indexed by the content of their arguments and by the version of their
+code, so that unchanged computations are never performed twice."""
+
+from collections.abc import Callable
+from functools import lru_cache
+from hashlib import blake2b
+from pathlib import Path, PurePath
+from tempfile import NamedTemporaryFile
+from typing import Any
+import os
+import pickle
+import numpy as np
+import pandas as pd
+
+# The fraction of its maximum size to which the cache is reduced when it
+# exceeds it, so that the folder is not scanned again on the next store
+_evicted_size = .9
+
+# The types of the values hashed by their representation, which describes
+# their whole content
+_scalar_types = (type(None), bool, int, float, complex, str, bytes, np.generic,
+                 PurePath)
+
+
+def _update_hash(digest: Any, value: Any) -> None:
+  """Feeds a value to a hash object, recursively for the containers and using
+  the raw content of the arrays and DataFrames.
+
+  Raises:
+    TypeError: Raised in case the value or one of its items is of a type whose
+      content cannot be reliably hashed.
+  """
+
+  if isinstance(value, pd.DataFrame):
+    digest.update(f'DataFrame{len(value.columns)}'.encode())
+    for label in value:
+      digest.update(repr(label).encode())
+      _update_hash(digest, value[label].to_numpy())
+  elif isinstance(value, pd.Series):
+    _update_hash(digest, value.to_numpy())
+  elif isinstance(value, np.ndarray):
+    digest.update(f'ndarray{value.dtype.str}{value.shape}'.encode())
+    if value.dtype.hasobject:
+      for item in value.ravel():
+        _update_hash(digest, item)
+    else:
+      digest.update(np.ascontiguousarray(value).data)
+  elif isinstance(value, (list, tuple)):
+    digest.update(f'{type(value).__name__}{len(value)}'.encode())
+    for item in value:
+      _update_hash(digest, item)
+  elif isinstance(value, dict):
+    digest.update(f'dict{len(value)}'.encode())
+    for key, item in value.items():
+      _update_hash(digest, key)
+      _update_hash(digest, item)
+  elif isinstance(value, _scalar_types):
+    digest.update(f'{type(value).__name__}{value!r}'.encode())
+  else:
+    raise TypeError(f"Cannot reliably hash a value of type "
+                    f"{type(value).__name__} !")
+
+
+def hash_arguments(*args: Any) -> str:
+  """Computes a hash of the given values, that only depends on their content.
+
+  Args:
+    *args: The values to hash. They may be DataFrames, Series, arrays, lists,
+      tuples, dicts, numbers, strings, paths or None.
+
+  Returns:
+    The hexadecimal digest of the values.
+
+  Raises:
+    TypeError: Raised in case one of the values is of a type whose content
+      cannot be reliably hashed.
+  """
+
+  digest = blake2b(digest_size=20)
+  _update_hash(digest, args)
+  return digest.hexdigest()
+
+
+class ResultCache:
+  """Stores results on disk, in a folder whose total size is bounded.
+
+  Each result is stored in its own file, named after its key. When the size of
+  the folder exceeds its limit, the least recently used results are discarded.
+  The files are written atomically, so that a same cache can be shared by
+  several processes.
+
+  The size of the folder is only measured when the first result is stored,
+  and when the results stored since then make it exceed its limit, so that
+  storing a result does not require listing the folder. The results stored by
+  other processes are therefore only accounted for at the next measurement.
+  """
+
+  def __init__(self, folder: Path, max_size: int) -> None:
+    """Sets the arguments and creates the folder if needed.
+
+    Args:
+      folder: The folder where to store the results.
+      max_size: The maximum total size of the stored results, in bytes.
+    """
+
+    self.folder = folder
+    self.max_size = max_size
+    self.folder.mkdir(parents=True, exist_ok=True)
+    self._size = None
+
+  def load(self, key: str) -> Any:
+    """Returns the result stored for the given key.
+
+    Raises:
+      KeyError: Raised in case no result is stored for this key, or in case
+        the stored result cannot be read anymore, for example because it
+        refers to a class that was renamed or moved since.
+    """
+
+    path = self.folder / f'{key}.pkl'
+    try:
+      with open(path, 'rb') as file:
+        result = pickle.load(file)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError,
+            AttributeError, ImportError):
+      raise KeyError(key) from None
+
+    # The modification time of the files records their last use
+    try:
+      os.utime(path)
+    except FileNotFoundError:
+      pass
+    return result
+
+  def store(self, key: str, result: Any) -> None:
+    """Stores a result for the given key, and discards the least recently used
+    results if the cache has grown too large."""
+
+    if self._size is None:
+      self._evict()
+
+    with NamedTemporaryFile(dir=self.folder, suffix='.tmp',
+                            delete=False) as file:
+      pickle.dump(result, file)
+      size = file.tell()
+    os.replace(file.name, self.folder / f'{key}.pkl')
+
+    self._size += size
+    if self._size > self.max_size:
+      self._evict()
+
+  def _evict(self) -> None:
+    """Measures the total size of the cache and, if it exceeds its limit,
+    deletes the least recently used results until it is reduced to a fraction
+    of its limit."""
+
+    entries = list()
+    for path in self.folder.glob('*.pkl'):
+      try:
+        stat = path.stat()
+      except FileNotFoundError:
+        continue
+      entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if total > self.max_size:
+      for _, size, path in sorted(entries):
+        if total <= _evicted_size * self.max_size:
+          break
+        path.unlink(missing_ok=True)
+        total -= size
+    self._size = total
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+  """Returns a string identifying the version of the code, made of the version
+  of the package and of a hash of all its source files.
+
+  The processing functions depend on each other across modules, so any change
+  in the sources of the package invalidates all the cached results.
+  """
+
+  # Only importing importlib.metadata when needed, as it takes long to import
+  from importlib.metadata import version, PackageNotFoundError
+
+  try:
+    package = version('tensile_processing')
+  except PackageNotFoundError:
+    package = ''
+  digest = blake2b(digest_size=20)
+  root = Path(__file__).parent.parent
+  for path in sorted(root.rglob('*.py')):
+    digest.update(str(path.relative_to(root)).encode())
+    digest.update(path.read_bytes())
+  return f'{package}:{digest.hexdigest()}'
+
+
+class CachedFunction:
+  """Wraps a function so that its results are stored in a cache, and only
+  computed if they are not already present in it.
+
+  The results are indexed by the name and the code version of the function,
+  and by the content of all its arguments. The wrapped function can be sent to
+  a pool of processes as long as the original one can.
+  """
+
+  def __init__(self,
+               function: Callable[..., Any],
+               cache: ResultCache) -> None:
+    """Sets the arguments.
+
+    Args:
+      function: The function whose results to cache. Its results must only
+        depend on its arguments.
+      cache: The cache where to store the results.
+    """
+
+    self.function = function
+    self.cache = cache
+    self._version = (f'{function.__module__}.{function.__qualname__}:'
+                     f'{code_version()}')
+
+  def __call__(self, *args: Any) -> Any:
+    """Returns the cached result for these arguments if any, otherwise
+    computes and stores it."""
+
+    key = hash_arguments(self._version, *args)
+    try:
+      return self.cache.load(key)
+    except KeyError:
+      result = self.function(*args)
+      self.cache.store(key, result)
+      return result
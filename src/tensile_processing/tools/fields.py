@@ -18,9 +18,55 @@ extensibility_field = 'Extensibility (mm/mm)'
 ultimate_strength_field = 'Ultimate strength (kPa)'
 yeoh_0_field = 'Yeoh C0 (kPa)'
 yeoh_1_field = 'Yeoh C1 (kPa)'
+yeoh_2_field = 'Yeoh C2 (kPa)'
+yeoh_3_field = 'Yeoh C3 (kPa)'
 young_modulus_field = 'Young modulus (kPa)'
 hyperelastic_offset_field = 'Hyperelastic offset (kPa)'
 hyperelastic_modulus_field = 'Hyperelastic modulus (kPa)'
+yeoh_0_low_field = 'Yeoh C0 CI low (kPa)'
+yeoh_0_high_field = 'Yeoh C0 CI high (kPa)'
+yeoh_1_low_field = 'Yeoh C1 CI low (kPa)'
+yeoh_1_high_field = 'Yeoh C1 CI high (kPa)'
+yeoh_2_low_field = 'Yeoh C2 CI low (kPa)'
+yeoh_2_high_field = 'Yeoh C2 CI high (kPa)'
+yeoh_3_low_field = 'Yeoh C3 CI low (kPa)'
+yeoh_3_high_field = 'Yeoh C3 CI high (kPa)'
+young_modulus_low_field = 'Young modulus CI low (kPa)'
+young_modulus_high_field = 'Young modulus CI high (kPa)'
+hyperelastic_modulus_low_field = 'Hyperelastic modulus CI low (kPa)'
+hyperelastic_modulus_high_field = 'Hyperelastic modulus CI high (kPa)'
+
+# Fields of the coefficients of the Yeoh models with up to four terms
+yeoh_fields = (yeoh_0_field, yeoh_1_field, yeoh_2_field, yeoh_3_field)
+
+# Fields of the bounds of the confidence intervals of the Yeoh coefficients,
+# two per coefficient
+yeoh_interval_fields = (yeoh_0_low_field, yeoh_0_high_field,
+                        yeoh_1_low_field, yeoh_1_high_field,
+                        yeoh_2_low_field, yeoh_2_high_field,
+                        yeoh_3_low_field, yeoh_3_high_field)
+
+# Fields in the parameter sweep file
+stress_threshold_field = 'Begin stress threshold (%)'
+sec_dev_threshold_field = 'Second derivative threshold (%)'
+peak_threshold_field = 'Peak threshold (%)'
+peak_range_field = 'Peak range (pts)'
+nb_points_smooth_end_field = 'Points smooth end (pts)'
+fit_points_field = 'Fit points'
+yeoh_r2_field = 'Yeoh R2'
+failed_tests_field = 'Failed tests'
+
+# Fields in the global results file
+donor_field = 'Donor'
+timepoint_field = 'Timepoint'
+
+# Fields in the campaign status file
+directory_field = 'Directory'
+status_field = 'Status'
+nb_tests_field = 'Tests'
+start_time_field = 'Start (s)'
+duration_field = 'Duration (s)'
+error_field = 'Error'
 
 # Fields of the data files
 time_field = 't(s)'
@@ -30,3 +76,26 @@ effort_field = 'F(N)'
 # Fields in the stress-strain file
 extension_field = 'Extension (mm/mm)'
 stress_field = 'Stress (kPa)'
+
+# Fields in the trimming index files
+start_index_field = 'Start index'
+stop_index_field = 'Stop index'
+extension_scale_field = 'Extension scale (mm/mm)'
+stress_offset_field = 'Stress offset (kPa)'
+
+# Types of the values in the columns of the results files, the columns not
+# listed here holding floating-point values
+field_dtypes = {identifier_field: 'int64',
+                condition_field: 'object',
+                type_field: 'object',
+                start_index_field: 'int64',
+                stop_index_field: 'int64',
+                peak_range_field: 'int64',
+                nb_points_smooth_end_field: 'int64',
+                fit_points_field: 'int64',
+                donor_field: 'object',
+                timepoint_field: 'object',
+                directory_field: 'object',
+                status_field: 'object',
+                nb_tests_field: 'int64',
+                error_field: 'object'}
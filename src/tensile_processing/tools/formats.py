@@ -0,0 +1,9 @@
+# coding: utf-8
+
+"""This file contains the formats supported for the intermediate data files. It
+is kept separate from the storage functions, so that it can be imported without
+importing numpy and pandas."""
+
+# The supported formats for the data files, given as their file extension
+# The feather and parquet formats require the pyarrow package to be installed
+data_formats = ('csv', 'npz', 'feather', 'parquet')
@@ -0,0 +1,55 @@
+# coding: utf-8
+
+"""This file contains functions for packing the data of tests of different
+lengths into padded 2D arrays, so that the tests can be processed by batches
+with vectorized operations instead of one after the other."""
+
+from collections.abc import Iterator, Sequence
+import numpy as np
+
+
+def pack_rows(arrays: Sequence[np.ndarray],
+              fill: float = np.nan) -> tuple[np.ndarray, np.ndarray]:
+  """Packs 1D arrays of different lengths into the rows of a 2D array.
+
+  Args:
+    arrays: The arrays to pack.
+    fill: The value given to the padding after the end of the shorter arrays.
+
+  Returns:
+    The 2D array with one row per array, as long as the longest array, and the
+    lengths of the arrays.
+  """
+
+  lengths = np.array([array.size for array in arrays], dtype=np.int64)
+  packed = np.full((len(arrays), lengths.max(initial=0)), fill)
+  for row, array in zip(packed, arrays):
+    row[:array.size] = array
+  return packed, lengths
+
+
+def row_batches(lengths: np.ndarray, max_cells: int) -> Iterator[np.ndarray]:
+  """Groups arrays of the given lengths into batches to pack together.
+
+  The arrays are sorted by length, so that the arrays of a batch have similar
+  lengths and little padding is needed. Each batch is then as large as
+  possible without the packed array exceeding the maximum number of cells,
+  but always contains at least one array.
+
+  Args:
+    lengths: The lengths of the arrays to group.
+    max_cells: The maximum number of cells of the packed array of a batch.
+
+  Yields:
+    The indices of the arrays in each batch.
+  """
+
+  order = np.argsort(lengths, kind='stable')
+  first = 0
+  while first < order.size:
+    last = first + 1
+    while (last < order.size and
+           (last + 1 - first) * lengths[order[last]] <= max_cells):
+      last += 1
+    yield order[first:last]
+    first = last
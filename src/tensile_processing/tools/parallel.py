@@ -0,0 +1,124 @@
+# coding: utf-8
+
+"""This file contains functions for distributing the processing of independent
+tests over a pool of processes."""
+
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor
+from functools import partial
+from pathlib import Path
+from typing import Any, Optional
+import pandas as pd
+
+from .cache import ResultCache, CachedFunction
+from .profiling import profile_stage
+from .record import fingerprint_file, read_record, write_record
+from .views import read_trimmed
+
+
+def parallel_map(function: Callable[..., Any],
+                 *iterables: Iterable,
+                 jobs: int = 1,
+                 executor: Optional[Executor] = None) -> list:
+  """Equivalent of the builtin map function, that distributes the calls over a
+  pool of processes.
+
+  The results are always returned in the same order as the input values, no
+  matter the order in which the calls complete.
+
+  Args:
+    function: The function to call on the values of the iterables. It must be
+      defined at the module level, so that it can be sent to the processes.
+    *iterables: The iterables containing the arguments of each call, as for
+      the builtin map function.
+    jobs: The number of processes to use. If 1, the calls are all performed in
+      the current process.
+    executor: An already running executor to use instead of starting a new
+      pool of processes, so that it can be reused across several calls.
+
+  Returns:
+    The list containing the return values of all the calls.
+  """
+
+  if executor is not None:
+    return list(executor.map(function, *iterables))
+  if jobs <= 1:
+    return list(map(function, *iterables))
+
+  # Only importing multiprocessing when needed, as it takes long to import
+  from concurrent.futures import ProcessPoolExecutor
+  with ProcessPoolExecutor(max_workers=jobs) as pool:
+    return list(pool.map(function, *iterables))
+
+
+def _read_and_apply(function: Callable[..., Any],
+                    index: Optional[pd.DataFrame],
+                    path: Path,
+                    *args: Any) -> Any:
+  """Reads the data from the given file, trims it according to the index if
+  any, and returns the result of the function called on it with the other
+  provided arguments."""
+
+  with profile_stage(path) as profile:
+    data = read_trimmed(path, index)
+    profile['samples'] = len(data)
+    return function(data, *args)
+
+
+def map_files(function: Callable[..., Any],
+              paths: Iterable[Path],
+              *iterables: Iterable,
+              jobs: int = 1,
+              index: Optional[pd.DataFrame] = None,
+              cache: Optional[ResultCache] = None,
+              record: Optional[Path] = None) -> list:
+  """Reads the data of each of the given files, and calls the function on it,
+  possibly over a pool of processes.
+
+  The reading of the files also takes place in the processes of the pool, so
+  that it is parallelized as well.
+
+  Args:
+    function: The function to call on the read data, as first argument. The
+      other arguments are taken from the iterables.
+    paths: The paths to the data files to read.
+    *iterables: The iterables containing the other arguments of each call. Use
+      itertools.repeat for passing the same value to all the calls.
+    jobs: The number of processes to use.
+    index: The trimming index to apply lazily to the read data, if the files
+      contain untrimmed stress-strain data.
+    cache: If given, the results are looked up in this cache based on the
+      content of the read data and on the other arguments, and only computed
+      if not already present.
+    record: If given, the file where the results of the previous run were
+      recorded along with the fingerprints of their inputs. Only the files
+      whose content or arguments changed since then are read and processed,
+      and the record is then updated with the current results.
+
+  Returns:
+    The list containing the return values of all the calls, in the same order
+    as the paths.
+  """
+
+  name = f'{function.__module__}.{function.__qualname__}'
+  if cache is not None:
+    function = CachedFunction(function, cache)
+  if record is None:
+    return parallel_map(partial(_read_and_apply, function, index), paths,
+                        *iterables, jobs=jobs)
+
+  # Only processing the calls that were not recorded during the previous run
+  calls = list(zip(paths, *iterables))
+  keys = [fingerprint_file(path, index, name, *args) for path, *args in calls]
+  previous = read_record(record)
+  missing = [(key, call) for key, call in zip(keys, calls)
+             if key not in previous]
+  if missing:
+    results = parallel_map(partial(_read_and_apply, function, index),
+                           *zip(*(call for _, call in missing)), jobs=jobs)
+    previous.update(zip((key for key, _ in missing), results))
+
+  # Only the results of the current calls are kept in the record
+  current = {key: previous[key] for key in keys}
+  write_record(record, current)
+  return [current[key] for key in keys]
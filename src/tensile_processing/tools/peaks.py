@@ -0,0 +1,162 @@
+# coding: utf-8
+
+"""This file contains an index of all the local maxima of the stress of a test,
+along with their prominences and widths. The detection stages only look for
+the first stress peak above a prominence threshold and below a width
+threshold, which can be answered for any thresholds by filtering the index
+instead of running scipy.signal.find_peaks again on the same signal."""
+
+from collections.abc import Mapping
+from pathlib import Path
+from typing import NamedTuple, Optional
+import numpy as np
+
+
+class PeakIndex(NamedTuple):
+  """All the local maxima of a signal, with the properties on which
+  scipy.signal.find_peaks filters them when called with rel_height=1."""
+
+  length: int
+  peaks: np.ndarray
+  heights: np.ndarray
+  left_edges: np.ndarray
+  right_edges: np.ndarray
+  left_bases: np.ndarray
+  right_bases: np.ndarray
+  prominences: np.ndarray
+  widths: np.ndarray
+
+
+def compute_peak_index(x: np.ndarray) -> PeakIndex:
+  """Computes the local maxima of a signal, and their prominences and widths.
+
+  Args:
+    x: The signal whose peaks to index.
+
+  Returns:
+    The index of the peaks of the signal.
+  """
+
+  # Only importing scipy when needed, as it takes long to import
+  from scipy import signal
+
+  peaks, properties = signal.find_peaks(x, plateau_size=(None, None))
+  prominences, left_bases, right_bases = signal.peak_prominences(x, peaks)
+  widths, *_ = signal.peak_widths(
+    x, peaks, rel_height=1,
+    prominence_data=(prominences, left_bases, right_bases))
+  return PeakIndex(x.size, peaks, x[peaks], properties['left_edges'],
+                   properties['right_edges'], left_bases, right_bases,
+                   prominences, widths)
+
+
+def _matches(index: PeakIndex, x: np.ndarray, start: int) -> bool:
+  """Checks that the signal is the part of the indexed signal starting at the
+  given sample, possibly offset by a constant."""
+
+  if start < 0 or start + x.size > index.length:
+    return False
+  inside = (index.peaks >= start) & (index.peaks < start + x.size)
+  offsets = x[index.peaks[inside] - start] - index.heights[inside]
+  if not offsets.size:
+    return True
+  scale = np.max(np.abs(index.heights), initial=1.)
+  return bool(np.ptp(offsets) <= 1e-9 * scale)
+
+
+def first_peak(x: np.ndarray,
+               min_prominence: float,
+               max_width: float,
+               index: Optional[PeakIndex] = None,
+               start: int = 0) -> Optional[int]:
+  """Returns the first peak of a signal that scipy.signal.find_peaks finds
+  with the given prominence and width conditions and rel_height=1.
+
+  If an index of the peaks is given, it is filtered instead of searching the
+  signal. The signal may only be a part of the indexed one, in which case the
+  peaks whose prominence depends on the samples outside of this part are
+  evaluated again on the signal. As the prominence can only decrease when the
+  signal is shortened, this is only needed for the few peaks that are
+  prominent enough in the indexed signal. If the signal does not match the
+  index, it is searched as if no index was given.
+
+  Args:
+    x: The signal in which to search for peaks.
+    min_prominence: The minimum prominence of the peaks.
+    max_width: The maximum width of the peaks, in samples.
+    index: The index of the peaks of a signal containing this one.
+    start: The position of the first sample of the signal in the indexed one.
+
+  Returns:
+    The position of the first peak in the signal, or None if there is none.
+  """
+
+  # Only importing scipy when needed, as it takes long to import
+  from scipy import signal
+
+  if index is None or not _matches(index, x, start):
+    peaks, _ = signal.find_peaks(x, prominence=(min_prominence, None),
+                                 width=(None, max_width), rel_height=1)
+    return int(np.min(peaks)) if peaks.size else None
+
+  # Only the local maxima of the indexed signal whose plateau lies inside the
+  # signal are local maxima of the signal
+  stop = start + x.size
+  candidates = ((index.left_edges > start) & (index.right_edges < stop - 1) &
+                (index.prominences >= min_prominence))
+  peaks = index.peaks[candidates] - start
+  prominences = index.prominences[candidates]
+  widths = index.widths[candidates]
+
+  # Evaluating again the peaks whose bases lie outside of the signal
+  outside = ((index.left_bases[candidates] < start) |
+             (index.right_bases[candidates] >= stop))
+  if outside.any():
+    prominence_data = signal.peak_prominences(x, peaks[outside])
+    prominences[outside] = prominence_data[0]
+    widths[outside], *_ = signal.peak_widths(
+      x, peaks[outside], rel_height=1, prominence_data=prominence_data)
+
+  valid = (prominences >= min_prominence) & (widths <= max_width)
+  return int(peaks[valid].min()) if valid.any() else None
+
+
+def save_peak_indices(indices: Mapping[int, PeakIndex], path: Path) -> None:
+  """Saves the peak indices of several tests to a single .npz file.
+
+  Args:
+    indices: The peak index of each test, indexed by test number.
+    path: The .npz file where to save the indices.
+  """
+
+  numbers = np.fromiter(indices, dtype=np.int64, count=len(indices))
+  arrays = {field: np.concatenate([getattr(index, field)
+                                   for index in indices.values()]
+                                  or [np.empty(0)])
+            for field in PeakIndex._fields[1:]}
+  np.savez(path, numbers=numbers,
+           lengths=np.array([index.length for index in indices.values()],
+                            dtype=np.int64),
+           counts=np.array([index.peaks.size for index in indices.values()],
+                           dtype=np.int64),
+           **arrays)
+
+
+def load_peak_indices(path: Path) -> dict[int, PeakIndex]:
+  """Loads the peak indices of several tests saved by save_peak_indices.
+
+  Args:
+    path: The .npz file containing the indices.
+
+  Returns:
+    The peak index of each test, indexed by test number.
+  """
+
+  with np.load(path) as file:
+    bounds = np.concatenate(([0], np.cumsum(file['counts'])))
+    arrays = {field: file[field] for field in PeakIndex._fields[1:]}
+    return {int(number): PeakIndex(int(length),
+                                   *(arrays[field][first:last]
+                                     for field in PeakIndex._fields[1:]))
+            for number, length, first, last in zip(
+              file['numbers'], file['lengths'], bounds[:-1], bounds[1:])}
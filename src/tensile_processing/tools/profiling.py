@@ -0,0 +1,140 @@
+# coding: utf-8
+
+"""This file contains the instrumentation measuring the resources used by the
+processing and plotting stages for each test. The measurements are only taken
+if the TENSILE_PROFILE environment variable gives the path to a log file, to
+which one line of JSON is then appended per stage and test."""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+import json
+import os
+from pathlib import Path
+import sys
+import time
+from typing import Any, Optional, Union
+
+# The environment variable holding the path to the log file, if any
+profile_variable = 'TENSILE_PROFILE'
+
+# The bytes read and written so far by the current process in the blocks
+# counted by data_io
+_data_io = [0, 0]
+
+
+def _io_counters() -> tuple[Optional[int], Optional[int]]:
+  """Returns the number of bytes read and written so far by the current
+  process, or None where the platform does not provide them."""
+
+  try:
+    with open('/proc/self/io') as file:
+      counters = dict(line.split(': ') for line in file.read().splitlines())
+    return int(counters['rchar']), int(counters['wchar'])
+  except (OSError, KeyError, ValueError):
+    return None, None
+
+
+@contextmanager
+def data_io() -> Iterator[None]:
+  """Counts the bytes read and written by the block as the ones of the data
+  files of the stage being profiled.
+
+  The counters of the process also include the bytes read when importing
+  modules and loading shared libraries, which may exceed by far the size of
+  the data of a test. Only the blocks reading and writing data files are
+  therefore counted. Nothing is counted if profiling is disabled.
+  """
+
+  if not os.environ.get(profile_variable):
+    yield
+    return
+
+  read, written = _io_counters()
+  try:
+    yield
+  finally:
+    read_end, written_end = _io_counters()
+    if read is not None:
+      _data_io[0] += read_end - read
+      _data_io[1] += written_end - written
+
+
+def _peak_rss() -> Optional[float]:
+  """Returns the peak resident memory of the current process so far in MB, or
+  None where the platform does not provide it."""
+
+  try:
+    import resource
+  except ImportError:
+    return None
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # The peak is given in bytes on macOS and in kB everywhere else
+  return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def _test_name(source: Path) -> str:
+  """Returns the name of the test a data file belongs to, which is the stem of
+  the file, or the name of its folder for the raw and smoothened data that are
+  stored in one folder per test."""
+
+  if any(character.isdigit() for character in source.stem):
+    return source.stem
+  return source.parent.name
+
+
+@contextmanager
+def profile_stage(source: Union[str, Path],
+                  stage: Optional[str] = None) -> Iterator[dict[str, Any]]:
+  """Measures the resources used by one processing or plotting stage for one
+  test, and appends them to the log file if profiling is enabled.
+
+  The wall time and the CPU time are measured over the block of code. The
+  bytes read and written are the ones of the calls counted by data_io within
+  the block, so that the modules imported by the stage are not counted. The
+  data of the memory-mapped .npz files is not read by system calls, and is
+  therefore not counted either. The peak resident memory is the one of the
+  process since it started, which is the one of the stage when the stage runs
+  in its own process. The number of samples processed is recorded if set in the
+  yielded dictionary, under the samples key. Nothing is recorded if the block
+  raises an exception.
+
+  Args:
+    source: The path to the data file of the test processed by the stage.
+    stage: The name of the stage. By default, the name of the running script.
+
+  Yields:
+    A dictionary in which the number of samples can be set.
+  """
+
+  log = os.environ.get(profile_variable)
+  record = {'samples': None}
+  if not log:
+    yield record
+    return
+
+  counted = _io_counters()[0] is not None
+  read, written = _data_io
+  cpu = time.process_time()
+  start = time.perf_counter()
+  yield record
+  wall = time.perf_counter() - start
+  cpu = time.process_time() - cpu
+
+  record = {
+    'stage': stage if stage is not None else Path(sys.argv[0]).stem,
+    'test': _test_name(Path(source)),
+    'source': str(source),
+    'wall_time': wall,
+    'cpu_time': cpu,
+    'peak_rss': _peak_rss(),
+    'bytes_read': _data_io[0] - read if counted else None,
+    'bytes_written': _data_io[1] - written if counted else None,
+    'samples': record['samples'],
+    'pid': os.getpid(),
+    'timestamp': time.time()}
+
+  # A single write in append mode, so that concurrent processes can share the
+  # same log file
+  Path(log).parent.mkdir(parents=True, exist_ok=True)
+  with open(log, 'a') as file:
+    file.write(json.dumps(record) + '\n')
@@ -0,0 +1,68 @@
+# coding: utf-8
+
+"""This file contains the functions for recording the per-test results of the
+stages handling all the tests at once, along with fingerprints of their
+inputs, so that only the new or modified tests are processed on rerun."""
+
+from hashlib import blake2b, file_digest
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, Optional
+import os
+import pickle
+import pandas as pd
+
+from .cache import hash_arguments, code_version
+from .fields import identifier_field
+from .get_nr import get_nr
+
+
+def fingerprint_file(path: Path,
+                     index: Optional[pd.DataFrame],
+                     *args: Any) -> str:
+  """Computes a fingerprint of the inputs of the processing of one file.
+
+  The fingerprint depends on the raw content of the file, on its row in the
+  trimming index if any, on the other arguments of the processing, and on the
+  version of the code. The file is hashed without being parsed.
+
+  Args:
+    path: The path to the data file to process.
+    index: The trimming index applied to the data of the file, if any.
+    *args: The other arguments of the processing, including the name of the
+      processing function.
+
+  Returns:
+    The hexadecimal fingerprint of the inputs.
+  """
+
+  with open(path, 'rb') as file:
+    content = file_digest(file, lambda: blake2b(digest_size=20)).hexdigest()
+  row = (index[index[identifier_field] == get_nr(path)].to_numpy()
+         if index is not None else None)
+  return hash_arguments(code_version(), content, row, *args)
+
+
+def read_record(path: Path) -> dict[str, Any]:
+  """Returns the results stored in a record file indexed by the fingerprints of
+  their inputs, or an empty record if the file does not exist or cannot be
+  read, for example because it refers to a class that was renamed or moved
+  since."""
+
+  try:
+    with open(path, 'rb') as file:
+      return pickle.load(file)
+  except (FileNotFoundError, EOFError, pickle.UnpicklingError,
+          AttributeError, ImportError):
+    return dict()
+
+
+def write_record(path: Path, record: dict[str, Any]) -> None:
+  """Atomically writes the results indexed by the fingerprints of their inputs
+  to a record file."""
+
+  path.parent.mkdir(parents=True, exist_ok=True)
+  with NamedTemporaryFile(dir=path.parent, suffix='.tmp',
+                          delete=False) as file:
+    pickle.dump(record, file)
+  os.replace(file.name, path)
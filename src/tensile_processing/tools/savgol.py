@@ -0,0 +1,218 @@
+# coding: utf-8
+
+"""This file contains a Savitzky-Golay filter giving the same output as the one
+of scipy, but that remains fast for windows spanning a large part of the
+signal. The detection stages smoothen the stress over half of the data, for
+which the direct convolution of scipy takes a time quadratic in the number of
+samples."""
+
+import numpy as np
+
+# Window length above which the convolution is computed by FFT, the direct
+# convolution being faster for shorter windows whatever the signal length
+_fft_threshold = 64
+
+# The methods for computing the convolution
+savgol_methods = ('auto', 'direct', 'fft')
+
+
+def _fit_edge(x: np.ndarray,
+              start: int,
+              interp_start: int,
+              interp_stop: int,
+              window_length: int,
+              polyorder: int,
+              deriv: int,
+              delta: float,
+              y: np.ndarray) -> None:
+  """Fits a polynomial to the window of the signal starting at the given index,
+  and writes its derivative to the output where the window is not centered on
+  the sample, as scipy does."""
+
+  poly = np.polyfit(np.arange(window_length),
+                    x[start:start + window_length], polyorder)
+  if deriv > 0:
+    poly = np.polyder(poly, deriv)
+  y[interp_start:interp_stop] = np.polyval(
+    poly, np.arange(interp_start - start, interp_stop - start)) / delta ** deriv
+
+
+def savgol_filter(x: np.ndarray,
+                  window_length: int,
+                  polyorder: int,
+                  deriv: int = 0,
+                  delta: float = 1.,
+                  method: str = 'auto') -> np.ndarray:
+  """Applies a Savitzky-Golay filter to a 1D signal, as
+  scipy.signal.savgol_filter does with its default interp mode.
+
+  Away from the edges, the filter is a convolution with fixed coefficients.
+  The direct convolution of scipy takes a time proportional to the window
+  length for each sample, whereas the FFT convolution only takes a time
+  proportional to the logarithm of the window length, at the cost of a larger
+  overhead. On the edges, a polynomial is fitted to the first and last windows
+  of the signal. Both methods give the same result to within the floating
+  point rounding errors.
+
+  Args:
+    x: The signal to filter.
+    window_length: The number of samples of the filter window.
+    polyorder: The order of the polynomial fitted over each window.
+    deriv: The order of the derivative to compute.
+    delta: The spacing of the samples, for scaling the derivatives.
+    method: The method for computing the convolution, either 'direct' for the
+      one of scipy, 'fft', or 'auto' for choosing the fastest one based on the
+      window length.
+
+  Returns:
+    The filtered signal, or its derivative, with the same length as the
+    signal.
+  """
+
+  # Only importing scipy when needed, as it takes long to import
+  from scipy import signal
+
+  if method not in savgol_methods:
+    raise ValueError(f"Invalid method {method}, must be one of "
+                     f"{', '.join(savgol_methods)} !")
+  if method == 'auto':
+    method = 'fft' if window_length > _fft_threshold else 'direct'
+  if method == 'direct':
+    return signal.savgol_filter(x, window_length, polyorder, deriv=deriv,
+                                delta=delta)
+
+  x = np.asarray(x, dtype=np.float64)
+  nb_samples = x.size
+  if window_length > nb_samples:
+    raise ValueError(f"The window length {window_length} cannot exceed the "
+                     f"number of samples {nb_samples} !")
+
+  # Filtering the samples on which the window can be centered
+  # For even windows, scipy shifts the filter by one sample towards the start
+  coeffs = signal.savgol_coeffs(window_length, polyorder, deriv=deriv,
+                                delta=delta)
+  half = window_length // 2
+  offset = half if window_length % 2 else half - 1
+  y = np.empty(nb_samples)
+  valid = signal.oaconvolve(x, coeffs, mode='valid')
+  y[offset:offset + valid.size] = valid
+
+  # Filtering the edges
+  _fit_edge(x, 0, 0, half, window_length, polyorder, deriv, delta, y)
+  _fit_edge(x, nb_samples - window_length, nb_samples - half, nb_samples,
+            window_length, polyorder, deriv, delta, y)
+  return y
+
+
+def _fit_edges(x: np.ndarray,
+               starts: np.ndarray,
+               interp_starts: np.ndarray,
+               interp_stops: np.ndarray,
+               window_lengths: np.ndarray,
+               polyorder: int,
+               deriv: int,
+               delta: float,
+               y: np.ndarray) -> None:
+  """Fits a polynomial to one window of each row of the signals, and writes its
+  derivative to the output where the window is not centered on the sample.
+
+  The fits of all the rows are solved at once from their normal equations,
+  the positions in each window being scaled between 0 and 1 for keeping them
+  well conditioned.
+  """
+
+  columns = np.arange(x.shape[1])
+  scales = np.maximum(window_lengths - 1, 1).astype(np.float64)
+  position = (columns - starts[:, None]) / scales[:, None]
+  inside = ((columns >= starts[:, None]) &
+            (columns < (starts + window_lengths)[:, None]))
+
+  # The sums of the powers of the positions, and of the products with the
+  # signal, over the window of each row
+  power = inside.astype(np.float64)
+  moments = np.empty((x.shape[0], 2 * polyorder + 1))
+  products = np.empty((x.shape[0], polyorder + 1))
+  for order in range(2 * polyorder + 1):
+    moments[:, order] = power.sum(axis=1)
+    if order <= polyorder:
+      products[:, order] = (power * x).sum(axis=1)
+    power *= position
+  orders = np.arange(polyorder + 1)
+  poly = np.linalg.solve(moments[:, orders[:, None] + orders[None, :]],
+                         products[..., None])[..., 0]
+
+  # Differentiating the polynomials, with respect to the unscaled positions
+  factors = np.array([np.prod(np.arange(order + 1, order + deriv + 1))
+                      for order in range(polyorder + 1 - deriv)])
+  poly = poly[:, deriv:] * factors / (scales[:, None] * delta) ** deriv
+
+  # Evaluating the polynomials by Horner's method
+  values = np.zeros_like(x)
+  for order in range(poly.shape[1] - 1, -1, -1):
+    values = values * position + poly[:, order, None]
+  target = ((columns >= interp_starts[:, None]) &
+            (columns < interp_stops[:, None]))
+  y[target] = values[target]
+
+
+def batch_savgol_filter(x: np.ndarray,
+                        lengths: np.ndarray,
+                        window_lengths: np.ndarray,
+                        polyorder: int,
+                        deriv: int = 0,
+                        delta: float = 1.) -> np.ndarray:
+  """Applies a Savitzky-Golay filter with its own window length to each row of
+  a batch of signals, as savgol_filter would do on each signal separately.
+
+  The signals are convolved all at once by FFT, and the polynomials on their
+  edges are fitted all at once as well.
+
+  Args:
+    x: The 2D array containing one signal per row, padded after its end.
+    lengths: The number of samples of each signal.
+    window_lengths: The number of samples of the filter window of each signal.
+    polyorder: The order of the polynomial fitted over each window.
+    deriv: The order of the derivative to compute.
+    delta: The spacing of the samples, for scaling the derivatives.
+
+  Returns:
+    The 2D array containing the filtered signals, or their derivatives, padded
+    with nan after their end.
+  """
+
+  # Only importing scipy when needed, as it takes long to import
+  from scipy import fft, signal
+
+  lengths = np.asarray(lengths, dtype=np.int64)
+  window_lengths = np.asarray(window_lengths, dtype=np.int64)
+  if np.any(window_lengths > lengths):
+    raise ValueError("The window lengths cannot exceed the number of samples "
+                     "of the signals !")
+  nb_rows, width = x.shape
+  columns = np.arange(width)
+  x = np.where(columns < lengths[:, None], x, 0.)
+
+  # Convolving all the signals with their filter at once
+  coeffs = np.zeros((nb_rows, window_lengths.max(initial=1)))
+  for row, window_length in enumerate(window_lengths):
+    coeffs[row, :window_length] = signal.savgol_coeffs(
+      window_length, polyorder, deriv=deriv, delta=delta)
+  size = fft.next_fast_len(width + coeffs.shape[1] - 1, real=True)
+  full = fft.irfft(fft.rfft(x, size, axis=1) * fft.rfft(coeffs, size, axis=1),
+                   size, axis=1)
+
+  # Picking the samples on which the window can be centered, shifted by one
+  # sample towards the start for even windows as in savgol_filter
+  half = window_lengths // 2
+  offsets = np.where(window_lengths % 2, half, half - 1)
+  shifts = window_lengths - 1 - offsets
+  y = np.take_along_axis(
+    full, np.minimum(columns + shifts[:, None], size - 1), axis=1)
+
+  # Filtering the edges
+  _fit_edges(x, np.zeros_like(lengths), np.zeros_like(lengths), half,
+             window_lengths, polyorder, deriv, delta, y)
+  _fit_edges(x, lengths - window_lengths, lengths - half, lengths,
+             window_lengths, polyorder, deriv, delta, y)
+  y[columns >= lengths[:, None]] = np.nan
+  return y
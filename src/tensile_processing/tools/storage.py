@@ -0,0 +1,126 @@
+# coding: utf-8
+
+"""This file contains the functions for reading and writing the intermediate
+data files of each test, in any of the supported file formats."""
+
+from pathlib import Path
+from typing import Optional
+import zipfile
+import numpy as np
+import pandas as pd
+
+from .formats import data_formats
+from .profiling import data_io
+
+
+def _map_npz(path: Path) -> Optional[dict[str, np.ndarray]]:
+  """Memory-maps the arrays contained in a .npz file, without reading them.
+
+  This is possible because the .npz files written by numpy.savez are not
+  compressed, so that the data of each array is stored contiguously in the
+  file.
+
+  Args:
+    path: The path to the .npz file to map.
+
+  Returns:
+    A dictionary containing the read-only arrays mapped to the file, or None
+    if the arrays cannot be mapped, for example if the file is compressed.
+  """
+
+  arrays = dict()
+  with zipfile.ZipFile(path) as archive, open(path, 'rb') as file:
+    for info in archive.infolist():
+      if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+      # The local header of each member gives the beginning of its data
+      file.seek(info.header_offset + 26)
+      name_length = int.from_bytes(file.read(2), 'little')
+      extra_length = int.from_bytes(file.read(2), 'little')
+      file.seek(info.header_offset + 30 + name_length + extra_length)
+
+      # The .npy header gives the shape and type of the array
+      version = np.lib.format.read_magic(file)
+      if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(file)
+      else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(file)
+      if dtype.hasobject or len(shape) != 1:
+        return None
+
+      label = info.filename.removesuffix('.npy')
+      if not shape[0]:
+        arrays[label] = np.empty(shape, dtype=dtype)
+      else:
+        arrays[label] = np.memmap(file, dtype=dtype, mode='r',
+                                  offset=file.tell(),
+                                  shape=shape).view(np.ndarray)
+  return arrays
+
+
+def read_data(path: Path) -> pd.DataFrame:
+  """Reads the data contained in a file, in a format depending on the
+  extension of the file.
+
+  The data of .npz files is memory-mapped, so that only the accessed parts of
+  it are actually loaded in memory.
+
+  Args:
+    path: The path to the file to read.
+
+  Returns:
+    A DataFrame containing the data of the file, with the same columns as when
+    it was written.
+
+  Raises:
+    ValueError: Raised in case the extension of the file does not correspond to
+      any of the supported formats.
+  """
+
+  with data_io():
+    suffix = path.suffix.lstrip('.')
+    if suffix == 'csv':
+      return pd.read_csv(path, float_precision='round_trip')
+    elif suffix == 'npz':
+      # The columns are stored as separate arrays, in their original order
+      # They are memory-mapped if possible, and never copied
+      arrays = _map_npz(path)
+      if arrays is None:
+        with np.load(path) as npz:
+          arrays = {label: npz[label] for label in npz.files}
+      return pd.DataFrame(arrays, copy=False)
+    elif suffix == 'feather':
+      return pd.read_feather(path)
+    elif suffix == 'parquet':
+      return pd.read_parquet(path)
+    raise ValueError(f"Unsupported format {suffix} for file {str(path)}, "
+                     f"should be one of {', '.join(data_formats)}")
+
+
+def write_data(data: pd.DataFrame, path: Path) -> None:
+  """Writes data to a file, in a format depending on the extension of the file.
+
+  Args:
+    data: The DataFrame containing the data to write. Its index is not saved.
+    path: The path to the file to write.
+
+  Raises:
+    ValueError: Raised in case the extension of the file does not correspond to
+      any of the supported formats.
+  """
+
+  with data_io():
+    suffix = path.suffix.lstrip('.')
+    if suffix == 'csv':
+      data.to_csv(path, index=False)
+    elif suffix == 'npz':
+      np.savez(path, **{label: np.ascontiguousarray(data[label].to_numpy())
+                        for label in data})
+    elif suffix == 'feather':
+      data.reset_index(drop=True).to_feather(path)
+    elif suffix == 'parquet':
+      data.to_parquet(path, index=False)
+    else:
+      raise ValueError(f"Unsupported format {suffix} for file {str(path)}, "
+                       f"should be one of {', '.join(data_formats)}")
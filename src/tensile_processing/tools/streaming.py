@@ -0,0 +1,178 @@
+# coding: utf-8
+
+"""This file contains the functions for reading and writing the data files of
+each test by chunks of samples, so that long recordings can be processed
+without holding them entirely in memory."""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from tempfile import TemporaryFile
+from types import TracebackType
+from typing import Any, Optional
+import shutil
+import zipfile
+import numpy as np
+import pandas as pd
+
+from .profiling import data_io
+from .storage import read_data, data_formats
+
+
+def _counted(chunks: Iterable[Any]) -> Iterator[Any]:
+  """Yields the chunks read by an iterator, counting the reading of each of
+  them as data I/O."""
+
+  chunks = iter(chunks)
+  while True:
+    with data_io():
+      chunk = next(chunks, None)
+    if chunk is None:
+      return
+    yield chunk
+
+
+def iter_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+  """Reads the data contained in a file by chunks of consecutive samples, in a
+  format depending on the extension of the file.
+
+  The .csv and .parquet files are parsed progressively, and the .npz files are
+  memory-mapped. The .feather files are read entirely before being split into
+  chunks.
+
+  Args:
+    path: The path to the file to read.
+    chunk_size: The maximum number of samples in each chunk.
+
+  Returns:
+    An iterator over the DataFrames containing the successive chunks of data,
+    with the same columns as when the file was written.
+
+  Raises:
+    ValueError: Raised in case the extension of the file does not correspond to
+      any of the supported formats.
+  """
+
+  suffix = path.suffix.lstrip('.')
+  if suffix == 'csv':
+    with pd.read_csv(path, chunksize=chunk_size,
+                     float_precision='round_trip') as reader:
+      for chunk in _counted(reader):
+        yield chunk.reset_index(drop=True)
+  elif suffix == 'parquet':
+    from pyarrow.parquet import ParquetFile
+    for batch in _counted(ParquetFile(path).iter_batches(
+        batch_size=chunk_size)):
+      yield batch.to_pandas()
+  elif suffix in data_formats:
+    data = read_data(path)
+    for start in range(0, len(data), chunk_size):
+      yield data.iloc[start:start + chunk_size].reset_index(drop=True)
+  else:
+    raise ValueError(f"Unsupported format {suffix} for file {str(path)}, "
+                     f"should be one of {', '.join(data_formats)}")
+
+
+class ChunkWriter:
+  """Writes data to a file by chunks of consecutive samples, in a format
+  depending on the extension of the file.
+
+  It is meant to be used as a context manager, the file being complete only
+  once the context is exited. The chunks are appended to the .csv, .feather
+  and .parquet files as they come. For the .npz files, the columns are first
+  buffered in temporary files, as the size of the arrays has to be known before
+  writing them. The written files can be read by read_data, and contain the
+  same data as if it had been written at once by write_data.
+  """
+
+  def __init__(self, path: Path) -> None:
+    """Sets the arguments.
+
+    Args:
+      path: The path to the file to write.
+
+    Raises:
+      ValueError: Raised in case the extension of the file does not correspond
+        to any of the supported formats.
+    """
+
+    self._path = path
+    self._suffix = path.suffix.lstrip('.')
+    if self._suffix not in data_formats:
+      raise ValueError(f"Unsupported format {self._suffix} for file "
+                       f"{str(path)}, should be one of "
+                       f"{', '.join(data_formats)}")
+
+    self._columns: dict[str, tuple[Any, np.dtype]] = dict()
+    self._size = 0
+    self._writer = None
+
+  def __enter__(self) -> 'ChunkWriter':
+    return self
+
+  def write(self, chunk: pd.DataFrame) -> None:
+    """Appends a chunk of data to the file.
+
+    Args:
+      chunk: The DataFrame containing the data to write. Its index is not
+        saved, and its columns must be the same for all the chunks.
+    """
+
+    if self._suffix == 'csv':
+      with data_io():
+        chunk.to_csv(self._path, index=False, header=not self._size,
+                     mode='a' if self._size else 'w')
+
+    elif self._suffix == 'npz':
+      for label in chunk:
+        values = np.ascontiguousarray(chunk[label].to_numpy())
+        if label not in self._columns:
+          self._columns[label] = (TemporaryFile(), values.dtype)
+        with data_io():
+          values.tofile(self._columns[label][0])
+
+    else:
+      import pyarrow as pa
+      table = pa.Table.from_pandas(chunk, preserve_index=False)
+      if self._writer is None:
+        if self._suffix == 'parquet':
+          from pyarrow.parquet import ParquetWriter
+          self._writer = ParquetWriter(self._path, table.schema)
+        else:
+          self._writer = pa.ipc.new_file(str(self._path), table.schema)
+      with data_io():
+        self._writer.write_table(table)
+
+    self._size += len(chunk)
+
+  def __exit__(self,
+               exc_type: Optional[type[BaseException]],
+               exc_val: Optional[BaseException],
+               exc_tb: Optional[TracebackType]) -> None:
+    """Completes the file, and releases the temporary resources."""
+
+    with data_io():
+      try:
+        if exc_type is None and self._suffix == 'npz':
+          self._write_npz()
+      finally:
+        for file, _ in self._columns.values():
+          file.close()
+        if self._writer is not None:
+          self._writer.close()
+
+  def _write_npz(self) -> None:
+    """Writes the buffered columns to the .npz file, in the same layout as
+    numpy.savez."""
+
+    with zipfile.ZipFile(self._path, mode='w',
+                         compression=zipfile.ZIP_STORED,
+                         allowZip64=True) as archive:
+      for label, (file, dtype) in self._columns.items():
+        header = {'descr': np.lib.format.dtype_to_descr(dtype),
+                  'fortran_order': False,
+                  'shape': (self._size,)}
+        with archive.open(f'{label}.npy', mode='w',
+                          force_zip64=True) as member:
+          np.lib.format.write_array_header_1_0(member, header)
+          file.seek(0)
+          shutil.copyfileobj(file, member)
@@ -0,0 +1,153 @@
+# coding: utf-8
+
+"""This file contains a collector for building the results tables row by row,
+or block by block, without copying the already collected rows every time."""
+
+from collections.abc import Iterable, Mapping
+from typing import Any, Optional, Union
+import numpy as np
+import pandas as pd
+
+from .fields import field_dtypes
+
+
+def _dtype_of(values: np.ndarray) -> np.dtype:
+  """Returns the type of column able to store the given values, strings being
+  stored as objects like pandas does."""
+
+  return np.dtype(object) if values.dtype.kind in 'US' else values.dtype
+
+
+def _missing_value(dtype: np.dtype) -> Any:
+  """Returns the value marking a missing entry in a column of the given type."""
+
+  if dtype.kind in 'fc':
+    return np.nan
+  if dtype.kind in 'mM':
+    return np.datetime64('NaT') if dtype.kind == 'M' else np.timedelta64('NaT')
+  return None
+
+
+class ResultTable:
+  """Collects the values of a results table in preallocated typed columns.
+
+  The type of the columns is taken from field_dtypes for the known fields, and
+  from the first values written otherwise. As with pandas.concat, the columns
+  are upcast if they receive values of a wider type, and the entries left
+  empty are filled with missing values. The capacity of the columns is doubled
+  if more rows than expected are added, so adding rows always takes amortized
+  constant time.
+  """
+
+  def __init__(self, nb_rows: int, fields: Iterable[str] = ()) -> None:
+    """Sets the arguments and allocates the columns of the known fields.
+
+    Args:
+      nb_rows: The expected number of rows of the table.
+      fields: The labels of the columns to allocate in advance, in the order
+        in which they should appear in the table.
+    """
+
+    self._capacity = max(nb_rows, 1)
+    self._size = 0
+    self._columns: dict[str, np.ndarray] = dict()
+    for field in fields:
+      self._columns[field] = np.empty(
+        self._capacity, dtype=field_dtypes.get(field, 'float64'))
+
+  def __len__(self) -> int:
+    """Returns the number of rows collected so far."""
+
+    return self._size
+
+  def append(self, row: Mapping[str, Any]) -> None:
+    """Adds one row to the table.
+
+    Args:
+      row: The values of the row, indexed by the labels of their columns.
+    """
+
+    self.extend({label: np.asarray([value]) for label, value in row.items()},
+                nb_rows=1)
+
+  def extend(self,
+             block: Union[pd.DataFrame, Mapping[str, np.ndarray]],
+             nb_rows: Optional[int] = None) -> None:
+    """Adds several rows at once to the table.
+
+    Args:
+      block: The values of the rows, either as a DataFrame or as arrays indexed
+        by the labels of their columns.
+      nb_rows: The number of rows in the block, only needed if it contains no
+        column.
+    """
+
+    if isinstance(block, pd.DataFrame):
+      nb_rows = len(block)
+      block = {label: block[label].to_numpy() for label in block}
+    elif nb_rows is None:
+      nb_rows = len(next(iter(block.values()), ()))
+
+    start, stop = self._size, self._size + nb_rows
+    self._reserve(stop)
+    for label, values in block.items():
+      self._write(label, start, stop, values)
+    for label in self._columns.keys() - block.keys():
+      self._fill_missing(label, start, stop)
+    self._size = stop
+
+  def to_frame(self) -> pd.DataFrame:
+    """Returns a DataFrame containing the collected rows."""
+
+    return pd.DataFrame({label: column[:self._size]
+                         for label, column in self._columns.items()})
+
+  def _reserve(self, nb_rows: int) -> None:
+    """Grows the columns if they cannot hold the given number of rows."""
+
+    if nb_rows <= self._capacity:
+      return
+    self._capacity = max(nb_rows, 2 * self._capacity)
+    for label, column in self._columns.items():
+      grown = np.empty(self._capacity, dtype=column.dtype)
+      grown[:self._size] = column[:self._size]
+      self._columns[label] = grown
+
+  def _write(self,
+             label: str,
+             start: int,
+             stop: int,
+             values: np.ndarray) -> None:
+    """Writes values in the given rows of a column, allocating or upcasting
+    the column if needed."""
+
+    dtype = _dtype_of(values)
+    if label not in self._columns:
+      self._columns[label] = np.empty(self._capacity,
+                                      dtype=field_dtypes.get(label, dtype))
+      self._fill_missing(label, 0, start)
+
+    if not np.can_cast(dtype, self._columns[label].dtype):
+      self._upcast(label, (self._columns[label].dtype, dtype))
+    self._columns[label][start:stop] = values
+
+  def _fill_missing(self, label: str, start: int, stop: int) -> None:
+    """Marks the given rows of a column as missing, upcasting the integer and
+    boolean columns to floating-point so that they can hold NaN."""
+
+    if start >= stop:
+      return
+    if self._columns[label].dtype.kind in 'iub':
+      self._upcast(label, (self._columns[label].dtype, np.dtype('float64')))
+    column = self._columns[label]
+    column[start:stop] = _missing_value(column.dtype)
+
+  def _upcast(self, label: str, dtypes: tuple[np.dtype, np.dtype]) -> None:
+    """Converts a column to a type able to hold the values of both given
+    types, falling back to objects if they have no common numeric type."""
+
+    try:
+      dtype = np.result_type(*dtypes)
+    except TypeError:
+      dtype = np.dtype(object)
+    self._columns[label] = self._columns[label].astype(dtype)
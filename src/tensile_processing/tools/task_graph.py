@@ -0,0 +1,163 @@
+# coding: utf-8
+
+"""This file contains a minimal scheduler for graphs of dependent tasks, that
+runs the tasks over a pool of processes as soon as their dependencies are
+met."""
+
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+import heapq
+from itertools import count
+from typing import Any
+
+
+@dataclass
+class Task:
+  """A task of a graph, whose function is called with the results of its
+  dependencies followed by its own arguments.
+
+  Attributes:
+    key: The unique identifier of the task in the graph.
+    function: The function to call, which must be defined at the module level
+      so that it can be sent to the processes.
+    dependencies: The keys of the tasks whose results are passed to the
+      function, in the same order.
+    arguments: The other arguments to pass to the function.
+    cost: The estimated duration of the task, in any unit as long as it is the
+      same for all the tasks. It is used for running first the tasks on the
+      longest chains of dependencies.
+    local: If True, the task runs in the main process, without occupying one
+      of the processes of the pool. Suitable for quick tasks gathering the
+      results of many other ones.
+  """
+
+  key: Hashable
+  function: Callable[..., Any]
+  dependencies: tuple[Hashable, ...] = ()
+  arguments: tuple = ()
+  cost: float = 1.
+  local: bool = False
+
+
+def critical_path(tasks: dict[Hashable, Task],
+                  children: dict[Hashable, list[Hashable]]) -> dict:
+  """Computes for each task the total cost of the longest chain of tasks
+  starting from it, which is its scheduling priority.
+
+  Raises:
+    ValueError: If the graph contains a cycle.
+  """
+
+  # Visiting the tasks in topological order
+  remaining = {key: len(task.dependencies) for key, task in tasks.items()}
+  order = [key for key, nb in remaining.items() if not nb]
+  for key in order:
+    for child in children[key]:
+      remaining[child] -= 1
+      if not remaining[child]:
+        order.append(child)
+  if len(order) < len(tasks):
+    raise ValueError("The graph of tasks contains a cycle !")
+
+  # The priorities are computed starting from the last tasks
+  priority = dict()
+  for key in reversed(order):
+    priority[key] = tasks[key].cost + max(
+      (priority[child] for child in children[key]), default=0.)
+  return priority
+
+
+def run_graph(tasks: Iterable[Task], jobs: int = 1) -> dict:
+  """Runs all the tasks of a graph, each one as soon as all its dependencies
+  are done, with at most the given number of tasks running at once.
+
+  Among the tasks ready to run, the ones on the longest remaining chain of
+  dependencies run first, so that the slowest chains are not started last.
+  The result of a task is only kept until all the tasks depending on it are
+  started, so that the memory usage stays bounded on large graphs.
+
+  Args:
+    tasks: All the tasks of the graph.
+    jobs: The maximum number of tasks running at once in a pool of processes.
+      If 1, all the tasks run in the current process.
+
+  Returns:
+    The results of the tasks on which no other task depends, by key.
+
+  Raises:
+    ValueError: If a dependency is not in the graph, or if the graph contains
+      a cycle.
+  """
+
+  tasks = {task.key: task for task in tasks}
+  children = {key: list() for key in tasks}
+  for task in tasks.values():
+    for dependency in task.dependencies:
+      if dependency not in tasks:
+        raise ValueError(f"The task {task.key} depends on the unknown task "
+                         f"{dependency} !")
+      children[dependency].append(task.key)
+  priority = critical_path(tasks, children)
+
+  # The ready tasks are popped by decreasing priority, then in insertion order
+  waiting = {key: len(task.dependencies) for key, task in tasks.items()}
+  consumers = {key: len(children[key]) for key in tasks}
+  order = count()
+  ready = [(-priority[key], next(order), key)
+           for key in tasks if not waiting[key]]
+  heapq.heapify(ready)
+  results = dict()
+  outputs = dict()
+
+  def call(key: Hashable) -> tuple[Callable[..., Any], tuple]:
+    """Returns the function of a task, and all its arguments."""
+
+    task = tasks[key]
+    args = tuple(results[dependency] for dependency in task.dependencies)
+    for dependency in task.dependencies:
+      consumers[dependency] -= 1
+      if not consumers[dependency]:
+        del results[dependency]
+    return task.function, (*args, *task.arguments)
+
+  def complete(key: Hashable, result: Any) -> None:
+    """Stores the result of a task, and marks its children as ready if all
+    their dependencies are done."""
+
+    if children[key]:
+      results[key] = result
+    else:
+      outputs[key] = result
+    for child in children[key]:
+      waiting[child] -= 1
+      if not waiting[child]:
+        heapq.heappush(ready, (-priority[child], next(order), child))
+
+  if jobs <= 1:
+    while ready:
+      *_, key = heapq.heappop(ready)
+      function, args = call(key)
+      complete(key, function(*args))
+    return outputs
+
+  # Only importing multiprocessing when needed, as it takes long to import
+  from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+  running = dict()
+  with ProcessPoolExecutor(max_workers=jobs) as pool:
+    while ready or running:
+
+      # Starting the ready tasks, as long as there are processes available
+      while ready and (len(running) < jobs or tasks[ready[0][2]].local):
+        *_, key = heapq.heappop(ready)
+        function, args = call(key)
+        if tasks[key].local:
+          complete(key, function(*args))
+        else:
+          running[pool.submit(function, *args)] = key
+
+      if running:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+          complete(running.pop(future), future.result())
+
+  return outputs
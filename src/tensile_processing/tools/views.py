@@ -0,0 +1,114 @@
+# coding: utf-8
+
+"""This file contains functions for selecting parts of the data without copying
+it whenever possible, and for applying lazily the trimming recorded in the
+trimming index files."""
+
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+from .fields import identifier_field, extension_field, stress_field, \
+  start_index_field, stop_index_field, extension_scale_field, \
+  stress_offset_field
+from .get_nr import get_nr
+from .storage import read_data
+
+
+def mask_to_slice(mask: np.ndarray) -> Optional[slice]:
+  """Converts a boolean mask into the equivalent slice, if the True values of
+  the mask are all contiguous.
+
+  Args:
+    mask: The boolean mask to convert.
+
+  Returns:
+    The slice selecting the same values as the mask, or None if the selected
+    values are not contiguous.
+  """
+
+  first = int(np.argmax(mask)) if mask.size else 0
+  if not mask.size or not mask[first]:
+    return slice(0, 0)
+  last = mask.size - int(np.argmax(mask[::-1]))
+  if mask[first:last].all():
+    return slice(first, last)
+  return None
+
+
+def select_rows(data: pd.DataFrame, mask: pd.Series) -> pd.DataFrame:
+  """Selects the rows of the data for which the mask is True.
+
+  If the selected rows are contiguous, which is always the case for the
+  trimming of monotonic stress-strain data, the returned DataFrame is a view
+  on the original data and no copy is made. The index of the returned
+  DataFrame is reset, as if the data had been written and read again.
+
+  Args:
+    data: The DataFrame containing the data to select.
+    mask: The boolean mask indicating the rows to select.
+
+  Returns:
+    The DataFrame containing only the selected rows.
+  """
+
+  rows = mask_to_slice(mask.to_numpy())
+  if rows is not None:
+    return data.iloc[rows].reset_index(drop=True)
+  return data[mask].reset_index(drop=True)
+
+
+def trim_view(data: pd.DataFrame,
+              start: int,
+              stop: int,
+              extension_scale: float = 1.,
+              stress_offset: float = 0.) -> pd.DataFrame:
+  """Returns the stress-strain data between the given sample indices, with the
+  extension divided by the scale and the stress offset by the given value.
+
+  The selected rows are a view on the original data, and the columns are only
+  copied if they need to be normalised.
+
+  Args:
+    data: The DataFrame containing the stress-strain data.
+    start: The index of the first sample to keep.
+    stop: The index following the last sample to keep.
+    extension_scale: The value by which to divide the extension.
+    stress_offset: The value to subtract from the stress.
+
+  Returns:
+    The trimmed and normalised stress-strain data.
+  """
+
+  trimmed = data.iloc[start:stop].reset_index(drop=True)
+  if extension_scale == 1. and stress_offset == 0.:
+    return trimmed
+  return pd.DataFrame(
+    {extension_field: trimmed[extension_field].to_numpy() / extension_scale,
+     stress_field: trimmed[stress_field].to_numpy() - stress_offset},
+    copy=False)
+
+
+def read_trimmed(path: Path, index: Optional[pd.DataFrame]) -> pd.DataFrame:
+  """Reads the stress-strain data from the given file, and applies to it the
+  trimming recorded for its test in the trimming index, if any.
+
+  Args:
+    path: The path to the file containing the stress-strain data.
+    index: The DataFrame containing the trimming index of all the tests, or
+      None if the data in the file is already trimmed.
+
+  Returns:
+    The trimmed stress-strain data.
+  """
+
+  data = read_data(path)
+  if index is None:
+    return data
+
+  row = index[index[identifier_field] == get_nr(path)].iloc[0]
+  return trim_view(data, int(row[start_index_field]),
+                   int(row[stop_index_field]),
+                   float(row[extension_scale_field]),
+                   float(row[stress_offset_field]))
@@ -1,9 +1,67 @@
 # coding: utf-8
 
-"""This file contains the definition of the second-oder Yeoh model."""
+"""This file contains the definition of the Yeoh model with any number of
+terms, and the functions for fitting it to stress-strain data."""
 
+from collections.abc import Sequence
+from typing import Optional
 import numpy as np
 
+# The relative norm of the projected gradient below which a bounded fit is
+# considered converged
+_tolerance = 1e-12
+
+# The maximum number of times the step of a bounded fit is halved, beyond
+# which the projected gradient is followed instead of the Newton step
+_max_halvings = 30
+
+# The number of samples whose basis functions are computed at once when
+# accumulating the normal equations, which bounds the memory used for long
+# recordings
+_chunk_size = 2 ** 16
+
+
+def yeoh(x: np.ndarray, *coefficients: float) -> np.ndarray:
+  """Function implementing the Yeoh hyperelastic model with as many terms as
+  coefficients.
+
+  The strain energy is the sum of the coefficients multiplied by the
+  successive powers of (I1 - 3), the coefficient c0 being the one of the first
+  power.
+
+  Args:
+    x: The input array containing the extension data points.
+    *coefficients: The Yeoh parameters, in increasing order.
+
+  Returns:
+    The array containing the stress data as predicted by the model.
+  """
+
+  return yeoh_basis(x, len(coefficients)) @ np.asarray(coefficients)
+
+
+def yeoh_basis(x: np.ndarray, order: int) -> np.ndarray:
+  """Returns the basis functions of the Yeoh model with the given number of
+  terms, of which the predicted stress is a linear combination with the
+  coefficients.
+
+  As the model is linear in its coefficients, the basis functions are also the
+  analytic Jacobian of the predicted stress with respect to the coefficients.
+
+  Args:
+    x: The input array containing the extension data points, of any shape.
+    order: The number of terms of the model.
+
+  Returns:
+    The array containing the values of the basis functions along a new last
+    axis. All the basis functions are null at an extension of 1.
+  """
+
+  strain = 2 * (x - 1 / x ** 2)
+  invariant = x ** 2 + 2 / x - 3
+  return np.stack([(term + 1) * strain * invariant ** term
+                   for term in range(order)], axis=-1)
+
 
 def yeoh_2(x: np.ndarray, c0: float, c1: float) -> np.ndarray:
   """Function implementing the second order Yeoh hyperelastic model.
@@ -18,3 +76,342 @@ def yeoh_2(x: np.ndarray, c0: float, c1: float) -> np.ndarray:
   """
 
   return 2 * (x - 1 / x ** 2) * (c0 + 2 * c1 * (x ** 2 + 2 / x - 3))
+
+
+def yeoh_2_basis(x: np.ndarray) -> np.ndarray:
+  """Returns the two basis functions of the second order Yeoh model, of which
+  the predicted stress is a linear combination with the coefficients c0 and c1.
+
+  Args:
+    x: The input array containing the extension data points, of any shape.
+
+  Returns:
+    The array containing the values of the two basis functions along a new
+    last axis. Both basis functions are null at an extension of 1.
+  """
+
+  return yeoh_basis(x, 2)
+
+
+def positive_bounds(order: int) -> tuple[tuple[float, ...],
+                                          tuple[float, ...]]:
+  """Returns the bounds constraining all the coefficients of the Yeoh model
+  with the given number of terms to be positive.
+
+  Args:
+    order: The number of terms of the model.
+
+  Returns:
+    A tuple containing the lower bounds and a tuple containing the upper
+    bounds of the coefficients.
+  """
+
+  return (0.,) * order, (np.inf,) * order
+
+
+def group_guesses(coefficients: np.ndarray,
+                  groups: Sequence) -> np.ndarray:
+  """Returns for each curve the median of the coefficients fitted to all the
+  curves of its group, for starting the fits from the neighbouring curves.
+
+  Args:
+    coefficients: The array containing the coefficients of each curve, one
+      curve per row.
+    groups: The group of each curve, for example its test condition.
+
+  Returns:
+    The array containing the median coefficients of the group of each curve.
+  """
+
+  _, inverse = np.unique(np.asarray(groups, dtype=str), return_inverse=True)
+  inverse = inverse.ravel()
+  medians = np.array([np.median(coefficients[inverse == group], axis=0)
+                      for group in range(inverse.max(initial=-1) + 1)])
+  return medians[inverse] if medians.size else coefficients.copy()
+
+
+def _bounded_fit(r: np.ndarray,
+                 qty: np.ndarray,
+                 start: np.ndarray,
+                 lower: np.ndarray,
+                 upper: np.ndarray,
+                 max_iterations: int) -> np.ndarray:
+  """Solves the bounded least squares problems min |r c - qty|² of several
+  curves at once, by a projected Newton method starting from the given
+  coefficients.
+
+  At each iteration, the coefficients held at a bound by the gradient are
+  fixed, and a Newton step is taken on the other ones. The step is projected
+  on the bounds and halved until the residuals decrease, or replaced by the
+  projected gradient if it is not a descent direction. As the problems are
+  quadratic, the iterations stop as soon as the right coefficients are fixed.
+  """
+
+  hessian = np.einsum('kji,kjl->kil', r, r)
+  identity = np.eye(r.shape[-1], dtype=bool)
+  scale = np.linalg.norm(np.einsum('kji,kj->ki', r, qty), axis=-1)
+
+  def residuals(c: np.ndarray) -> np.ndarray:
+    """Returns half the squared norm of the residuals of each curve."""
+
+    return .5 * np.sum((np.einsum('kij,kj->ki', r, c) - qty) ** 2, axis=-1)
+
+  def search(c: np.ndarray,
+             cost: np.ndarray,
+             gradient: np.ndarray,
+             step: np.ndarray,
+             rows: np.ndarray) -> np.ndarray:
+    """Halves the projected step of each row until the cost decreases enough,
+    and returns the rows for which it never did."""
+
+    length = np.ones(c.shape[0])
+    pending = rows.copy()
+    for _ in range(_max_halvings):
+      candidate = np.clip(c + length[:, None] * step, lower, upper)
+      change = np.sum(gradient * (candidate - c), axis=-1)
+      accepted = pending & (change < 0) & (
+        residuals(candidate) <= cost + 1e-4 * change)
+      c[accepted] = candidate[accepted]
+      pending &= ~accepted
+      if not pending.any():
+        break
+      length[pending] /= 2
+    return pending
+
+  c = np.clip(start, lower, upper)
+  for _ in range(max_iterations):
+    gradient = (np.einsum('kij,kj->ki', hessian, c) -
+                np.einsum('kji,kj->ki', r, qty))
+    fixed = (((c <= lower) & (gradient > 0)) |
+             ((c >= upper) & (gradient < 0)))
+    projected = np.where(fixed, 0., gradient)
+    active = np.linalg.norm(projected, axis=-1) > _tolerance * scale
+    if not active.any():
+      break
+
+    # Newton step over the free coefficients, the fixed ones being left as is
+    reduced = np.where(fixed[:, :, None] | fixed[:, None, :], identity,
+                       hessian)
+    step = -np.linalg.solve(reduced, projected[..., None])[..., 0]
+    cost = residuals(c)
+    failed = search(c, cost, gradient, step, active)
+    if failed.any():
+      search(c, cost, gradient, -projected, failed)
+  return c
+
+
+def fit_yeoh_n(extensions: Sequence[np.ndarray],
+               stresses: Sequence[np.ndarray],
+               order: int = 2,
+               bounds: Optional[tuple[Sequence[float],
+                                      Sequence[float]]] = None,
+               initial: Optional[np.ndarray] = None,
+               groups: Optional[Sequence] = None,
+               max_iterations: int = 50) -> np.ndarray:
+  """Fits the Yeoh model with the given number of terms to several
+  stress-strain curves at once, in a single vectorized call.
+
+  The curves may have different lengths. They are packed into arrays padded
+  with an extension of 1 and a stress of 0, which contribute nothing to the
+  fit since the basis functions are null there. As the model is linear in its
+  coefficients, the unbounded fits are solved directly by linear least
+  squares.
+
+  If the coefficients are bounded, the fits are refined by a projected Newton
+  method using the analytic Jacobian of the model. The problems being
+  quadratic, each curve converges in a few iterations from a warm start. By
+  default, a curve starts from its linear least squares solution projected on
+  the bounds, or from the median solution of its group if it fits the curve
+  better.
+
+  Args:
+    extensions: The arrays containing the extension data of each curve.
+    stresses: The arrays containing the stress data of each curve.
+    order: The number of terms of the model.
+    bounds: The lower and upper bounds of the coefficients, as a tuple
+      containing the lower bounds and a tuple containing the upper bounds. The
+      bounds may be infinite. If not given, the coefficients are not
+      constrained.
+    initial: The coefficients from which to start the bounded fits, one curve
+      per row. Overrides the default warm start.
+    groups: The group of each curve, for example its test condition, for
+      starting the bounded fits from the neighbouring curves.
+    max_iterations: The maximum number of iterations of the bounded fits.
+
+  Returns:
+    An array of shape (number of curves, order) containing the fitted Yeoh
+    coefficients of each curve.
+
+  Raises:
+    numpy.linalg.LinAlgError: Raised in case the fit is underdetermined for one
+      of the curves, for example if it contains less points than coefficients.
+  """
+
+  lengths = np.array([len(extension) for extension in extensions], dtype=int)
+  if not lengths.size:
+    return np.empty((0, order))
+
+  # Packing all the curves into padded arrays
+  valid = np.arange(lengths.max()) < lengths[:, np.newaxis]
+  x = np.ones(valid.shape)
+  y = np.zeros(valid.shape)
+  x[valid] = np.concatenate(extensions)
+  y[valid] = np.concatenate(stresses)
+
+  # Solving all the least squares problems with a QR decomposition
+  q, r = np.linalg.qr(yeoh_basis(x, order))
+  qty = np.einsum('kni,kn->ki', q, y)
+  fit = np.linalg.solve(r, qty[..., np.newaxis])[..., 0]
+  if bounds is None:
+    return fit
+
+  # Choosing the warm start of each curve
+  lower = np.broadcast_to(np.asarray(bounds[0], dtype=np.float64), (order,))
+  upper = np.broadcast_to(np.asarray(bounds[1], dtype=np.float64), (order,))
+  if np.any(lower > upper):
+    raise ValueError("The lower bounds cannot exceed the upper bounds !")
+  if initial is not None:
+    start = np.array(initial, dtype=np.float64)
+  else:
+    start = np.clip(fit, lower, upper)
+    if groups is not None:
+      guesses = np.clip(group_guesses(start, groups), lower, upper)
+      closer = (np.linalg.norm(np.einsum('kij,kj->ki', r, guesses) - qty,
+                               axis=-1) <
+                np.linalg.norm(np.einsum('kij,kj->ki', r, start) - qty,
+                               axis=-1))
+      start[closer] = guesses[closer]
+
+  return _bounded_fit(r, qty, start, lower, upper, max_iterations)
+
+
+def yeoh_normal_equations(x: np.ndarray,
+                          y: np.ndarray,
+                          order: int = 2) -> tuple[np.ndarray, np.ndarray]:
+  """Computes the normal equations of the fit of the Yeoh model to a
+  stress-strain curve, to be solved by solve_yeoh_normal.
+
+  The products of the basis functions are accumulated over chunks of samples,
+  so that the memory used does not grow with the length of the curve.
+
+  Args:
+    x: The array containing the extension data of the curve.
+    y: The array containing the stress data of the curve.
+    order: The number of terms of the model.
+
+  Returns:
+    The array of shape (order, order) containing the sums of the products of
+    the basis functions, and the array of shape (order,) containing the sums
+    of the products of the basis functions with the stress.
+  """
+
+  gram = np.zeros((order, order))
+  moments = np.zeros(order)
+  for start in range(0, len(x), _chunk_size):
+    basis = yeoh_basis(np.asarray(x[start:start + _chunk_size]), order)
+    gram += basis.T @ basis
+    moments += basis.T @ np.asarray(y[start:start + _chunk_size])
+  return gram, moments
+
+
+def solve_yeoh_normal(gram: np.ndarray,
+                      moments: np.ndarray,
+                      bounds: Optional[tuple[Sequence[float],
+                                             Sequence[float]]] = None,
+                      groups: Optional[Sequence] = None,
+                      max_iterations: int = 50) -> np.ndarray:
+  """Solves several fits of the Yeoh model at once from their normal
+  equations, for fits whose sums of products of the data are already known,
+  like the bootstrap resamples of a curve.
+
+  The successive basis functions differ by orders of magnitude, so the
+  equations are first scaled to a unit diagonal. They are then solved through
+  the eigendecomposition of the scaled matrices, which also provides the
+  factors needed by the projected Newton method if the coefficients are
+  bounded.
+
+  Args:
+    gram: The array of shape (number of fits, order, order) containing the
+      sums of the products of the basis functions for each fit.
+    moments: The array of shape (number of fits, order) containing the sums of
+      the products of the basis functions with the stress for each fit.
+    bounds: The lower and upper bounds of the coefficients, as a tuple
+      containing the lower bounds and a tuple containing the upper bounds. If
+      not given, the coefficients are not constrained.
+    groups: The group of each fit, for example its test condition. Each
+      bounded fit then starts from the closest of its linear solution and of
+      the median solution of its group, as in fit_yeoh_n.
+    max_iterations: The maximum number of iterations of the bounded fits.
+
+  Returns:
+    An array of shape (number of fits, order) containing the fitted Yeoh
+    coefficients of each fit. The coefficients of the fits whose normal
+    equations are singular are NaN.
+  """
+
+  order = gram.shape[-1]
+  scale = np.sqrt(np.diagonal(gram, axis1=-2, axis2=-1))
+  valid = np.all(np.isfinite(scale) & (scale > 0), axis=-1)
+  scale = np.where(valid[:, np.newaxis], scale, 1.)
+  identity = np.eye(order)
+  scaled = np.where(valid[:, np.newaxis, np.newaxis],
+                    gram / (scale[:, :, np.newaxis] * scale[:, np.newaxis, :]),
+                    identity)
+  moments = np.where(valid[:, np.newaxis], moments / scale, 0.)
+
+  # Only keeping the fits whose scaled equations are well conditioned
+  values, vectors = np.linalg.eigh(scaled)
+  valid &= values[:, 0] > order * np.finfo(np.float64).eps * values[:, -1]
+  values = np.where(valid[:, np.newaxis], values, 1.)
+
+  # The factor r is such that r^T r is the scaled matrix
+  root = np.sqrt(values)
+  r = root[:, :, np.newaxis] * np.swapaxes(vectors, -1, -2)
+  qty = np.einsum('kji,kj->ki', vectors, moments) / root
+  fit = np.einsum('kij,kj->ki', vectors, qty / root)
+
+  if bounds is not None:
+    lower = np.broadcast_to(np.asarray(bounds[0], dtype=np.float64), (order,))
+    upper = np.broadcast_to(np.asarray(bounds[1], dtype=np.float64), (order,))
+    if np.any(lower > upper):
+      raise ValueError("The lower bounds cannot exceed the upper bounds !")
+    lower = lower * scale
+    upper = upper * scale
+    start = np.clip(fit, lower, upper)
+    if groups is not None and valid.any():
+      # The medians are taken on the unscaled coefficients of the valid fits
+      guesses = start.copy()
+      guesses[valid] = group_guesses(start[valid] / scale[valid],
+                                     np.asarray(groups)[valid]) * scale[valid]
+      guesses = np.clip(guesses, lower, upper)
+      closer = (np.linalg.norm(np.einsum('kij,kj->ki', r, guesses) - qty,
+                               axis=-1) <
+                np.linalg.norm(np.einsum('kij,kj->ki', r, start) - qty,
+                               axis=-1))
+      start[closer] = guesses[closer]
+    fit = _bounded_fit(r, qty, start, lower, upper, max_iterations)
+
+  fit = fit / scale
+  fit[~valid] = np.nan
+  return fit
+
+
+def fit_yeoh_2(extensions: Sequence[np.ndarray],
+               stresses: Sequence[np.ndarray]) -> np.ndarray:
+  """Fits the second order Yeoh model to several stress-strain curves at once,
+  by solving the linear least squares problems in a single vectorized call.
+
+  Args:
+    extensions: The arrays containing the extension data of each curve.
+    stresses: The arrays containing the stress data of each curve.
+
+  Returns:
+    An array of shape (number of curves, 2) containing the two fitted Yeoh
+    coefficients of each curve.
+
+  Raises:
+    numpy.linalg.LinAlgError: Raised in case the fit is underdetermined for one
+      of the curves, for example if it contains less than two points.
+  """
+
+  return fit_yeoh_n(extensions, stresses, 2)
@@ -0,0 +1,58 @@
+# coding: utf-8
+
+"""This file contains the fixtures and helpers shared by the tests, which run
+the Makefile recipes on synthetic tests."""
+
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import pytest
+
+from tensile_processing.benchmark.synthetic import generate_directory
+
+_root = Path(__file__).resolve().parents[1]
+_package = _root / 'src' / 'tensile_processing'
+
+
+def run_make(raw_data: Path,
+             directory: Path,
+             target: str,
+             **variables: str) -> None:
+  """Runs a target of the Makefile in a copy of the synthetic directory, made
+  on the first run in the given directory so that the next runs only update
+  the outdated targets.
+
+  Args:
+    raw_data: The directory containing the raw data of the synthetic tests.
+    directory: The directory where to copy the raw data and run the target.
+    target: The target of the Makefile to run.
+    **variables: The variables of the Makefile to override.
+  """
+
+  if shutil.which('make') is None:
+    pytest.skip("make is not available")
+
+  if not (directory / 'Makefile').exists():
+    shutil.copytree(raw_data, directory, dirs_exist_ok=True)
+    for name in ('Makefile', 'parameters'):
+      (directory / name).symlink_to(_root / name)
+  environment = {**os.environ,
+                 'PYTHONPATH': os.pathsep.join(
+                   filter(None, (str(_root / 'src'),
+                                 os.environ.get('PYTHONPATH'))))}
+  subprocess.run(['make', '-s', target, f'PYTHON_EXE={sys.executable}',
+                  f'PYTHON_FOLDER={_package}', 'NB_JOBS=1',
+                  *(f'{name}={value}' for name, value in variables.items())],
+                 cwd=directory, env=environment, check=True,
+                 stdout=subprocess.DEVNULL)
+
+
+@pytest.fixture(scope='session')
+def raw_data(tmp_path_factory: pytest.TempPathFactory) -> Path:
+  """Generates the raw data of a few synthetic tests."""
+
+  directory = tmp_path_factory.mktemp('raw')
+  generate_directory(directory, nb_tests=6, nb_samples=4000, seed=1)
+  return directory
@@ -0,0 +1,121 @@
+# coding: utf-8
+
+"""Checks the cache storing the results of the processing functions."""
+
+from pathlib import Path
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+
+from tensile_processing.tools.cache import hash_arguments, ResultCache, \
+  CachedFunction
+
+
+def test_hash_depends_on_whole_content() -> None:
+  """Large arrays differing in the middle, whose representations are
+  identical, and values of different types have different hashes."""
+
+  first = np.zeros(10000)
+  second = first.copy()
+  second[5000] = 1
+  assert repr(first) == repr(second)
+  assert hash_arguments(first) != hash_arguments(second)
+  assert (hash_arguments(pd.DataFrame({'a': first})) !=
+          hash_arguments(pd.DataFrame({'a': second})))
+  assert hash_arguments(1) != hash_arguments(True)
+  assert hash_arguments(first) != hash_arguments(first.astype(np.float32))
+  assert hash_arguments(first) != hash_arguments(first.reshape(100, 100))
+  assert (hash_arguments(np.array(['a', None], dtype=object), Path('a')) ==
+          hash_arguments(np.array(['a', None], dtype=object), Path('a')))
+
+
+def test_hash_rejects_unknown_types() -> None:
+  """The values whose representation may not describe their content, for
+  example because it contains their address, cannot be hashed."""
+
+  with pytest.raises(TypeError):
+    hash_arguments(object())
+  with pytest.raises(TypeError):
+    hash_arguments((1, {'key': object()}))
+
+
+def test_eviction_only_lists_folder_when_full(tmp_path: Path,
+                                              monkeypatch: pytest.MonkeyPatch
+                                              ) -> None:
+  """The folder is only listed when the cache grows over its limit, and the
+  least recently used results are then discarded."""
+
+  result = np.zeros(1000)
+  cache = ResultCache(tmp_path, 20 * result.nbytes)
+  scans = list()
+  evict = ResultCache._evict
+  monkeypatch.setattr(ResultCache, '_evict',
+                      lambda self: scans.append(1) or evict(self))
+
+  for key in range(10):
+    cache.store(str(key), result)
+  assert len(scans) == 1
+
+  cache.load('0')
+  for key in range(10, 30):
+    cache.store(str(key), result)
+  assert 1 < len(scans) < 10
+  size = sum(path.stat().st_size for path in tmp_path.glob('*.pkl'))
+  assert size <= cache.max_size
+  np.testing.assert_array_equal(cache.load('29'), result)
+  with pytest.raises(KeyError):
+    cache.load('1')
+
+
+def test_unreadable_results_are_missing(tmp_path: Path) -> None:
+  """The results referring to modules or classes that do not exist anymore
+  are considered missing, and computed again."""
+
+  missing_module = b'cno_such_module\nResult\n.'
+  missing_class = b'ctensile_processing\nNoSuchResult\n.'
+  with pytest.raises(ModuleNotFoundError):
+    pickle.loads(missing_module)
+  with pytest.raises(AttributeError):
+    pickle.loads(missing_class)
+
+  cache = ResultCache(tmp_path, 2 ** 20)
+  function = CachedFunction(abs, cache)
+  for stale in (missing_module, missing_class):
+    key = hash_arguments(function._version, -1)
+    (tmp_path / f'{key}.pkl').write_bytes(stale)
+    with pytest.raises(KeyError):
+      cache.load(key)
+    assert function(-1) == 1
+    assert cache.load(key) == 1
+
+
+def test_cached_function_hits_and_misses(tmp_path: Path) -> None:
+  """A result is only computed once for the same data and parameters, and
+  computed again when either of them changes, also from another instance of
+  the cache as in the processes of a pool."""
+
+  calls = list()
+
+  def scale(data: pd.DataFrame, factor: float) -> pd.DataFrame:
+    calls.append(factor)
+    return data * factor
+
+  data = pd.DataFrame({'a': np.arange(10.), 'b': np.ones(10)})
+  function = CachedFunction(scale, ResultCache(tmp_path, 2 ** 20))
+  pd.testing.assert_frame_equal(function(data, 2.), data * 2.)
+  pd.testing.assert_frame_equal(function(data, 2.), data * 2.)
+  assert calls == [2.]
+
+  other = CachedFunction(scale, ResultCache(tmp_path, 2 ** 20))
+  pd.testing.assert_frame_equal(other(data.copy(), 2.), data * 2.)
+  assert calls == [2.]
+
+  function(data, 3.)
+  assert calls == [2., 3.]
+  modified = data.copy()
+  modified.loc[5, 'b'] = 2.
+  pd.testing.assert_frame_equal(function(modified, 2.), modified * 2.)
+  assert calls == [2., 3., 2.]
+  function(data.rename(columns={'b': 'c'}), 2.)
+  assert calls == [2., 3., 2., 2.]
@@ -0,0 +1,76 @@
+# coding: utf-8
+
+"""Checks that the Makefile recipes, in all the data formats and trimming
+modes, and the in-memory pipeline produce exactly the same results on
+synthetic tests."""
+
+from pathlib import Path
+import pandas as pd
+import pytest
+
+from conftest import run_make
+
+
+def _make(raw_data: Path,
+          directory: Path,
+          target: str,
+          output: str,
+          **variables: str) -> pd.DataFrame:
+  """Runs a target of the Makefile in a copy of the synthetic directory, and
+  returns the given table it wrote."""
+
+  run_make(raw_data, directory, target, **variables)
+  return pd.read_csv(directory / output, float_precision='round_trip')
+
+
+@pytest.fixture(scope='module')
+def pipeline_results(raw_data: Path,
+                     tmp_path_factory: pytest.TempPathFactory) -> pd.DataFrame:
+  """Computes the results of the synthetic tests with the pipeline."""
+
+  return _make(raw_data, tmp_path_factory.mktemp('pipeline'), 'pipeline',
+               'results.csv')
+
+
+@pytest.mark.parametrize('data_format, trim_mode', [('npz', 'files'),
+                                                    ('csv', 'files'),
+                                                    ('npz', 'index')])
+def test_makefile_matches_pipeline(raw_data: Path,
+                                   pipeline_results: pd.DataFrame,
+                                   tmp_path: Path,
+                                   data_format: str,
+                                   trim_mode: str) -> None:
+  """The results computed stage by stage by the Makefile are bit-exact with
+  the ones of the pipeline, which are never written to and read back from
+  .csv files between the stages."""
+
+  results = _make(raw_data, tmp_path, 'results', 'results.csv',
+                  DATA_FORMAT=data_format, TRIM_MODE=trim_mode)
+  pd.testing.assert_frame_equal(results, pipeline_results, check_exact=True)
+
+
+def test_bounded_yeoh_matches_pipeline(raw_data: Path, tmp_path: Path) -> None:
+  """The bounded Yeoh fit of all the tests at once gives the same
+  coefficients in the Makefile and in the pipeline, both starting from the
+  tests of the same condition. The confidence intervals are bootstrapped for
+  the same model, with one interval per coefficient."""
+
+  variables = dict(YEOH_ORDER='3', YEOH_POSITIVE='true')
+  pipeline = _make(raw_data, tmp_path / 'pipeline', 'pipeline',
+                   'computed_data/yeoh_interpolation.csv', **variables)
+  makefile = _make(raw_data, tmp_path / 'makefile', 'yeoh_interpolation',
+                   'computed_data/yeoh_interpolation.csv', **variables)
+  assert len(makefile.columns) == 4
+  assert (makefile.iloc[:, 1:] >= 0).all(axis=None)
+  pd.testing.assert_frame_equal(makefile, pipeline, check_exact=True)
+
+  pipeline = pd.read_csv(tmp_path / 'pipeline/computed_data/bootstrap.csv',
+                         float_precision='round_trip')
+  makefile = _make(raw_data, tmp_path / 'makefile', 'bootstrap',
+                   'computed_data/bootstrap.csv', **variables)
+  assert 'Yeoh C2 CI high (kPa)' in makefile.columns
+  assert 'Yeoh C3 CI low (kPa)' not in makefile.columns
+  low = makefile.iloc[:, 1:7:2].to_numpy()
+  high = makefile.iloc[:, 2:7:2].to_numpy()
+  assert (low >= 0).all() and (low <= high).all()
+  pd.testing.assert_frame_equal(makefile, pipeline, check_exact=True)
@@ -0,0 +1,79 @@
+# coding: utf-8
+
+"""Checks that the search for the first stress peak through the index of the
+peaks gives the same result as scipy.signal.find_peaks."""
+
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pytest
+from scipy import signal
+
+from tensile_processing.tools.peaks import compute_peak_index, first_peak, \
+  save_peak_indices, load_peak_indices
+
+
+def _expected(x: np.ndarray,
+              min_prominence: float,
+              max_width: float) -> Optional[int]:
+  """Returns the first peak found by scipy with the given conditions."""
+
+  peaks, _ = signal.find_peaks(x, prominence=(min_prominence, None),
+                               width=(None, max_width), rel_height=1)
+  return int(peaks[0]) if peaks.size else None
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_first_peak_matches_find_peaks(seed: int) -> None:
+  """The first peak found from the index of the whole signal is the one
+  scipy finds on parts of the signal, also offset by a constant. The signal
+  contains plateaus, and peaks whose bases lie outside of the parts."""
+
+  rng = np.random.default_rng(seed)
+  x = np.round(np.cumsum(rng.normal(0, 1, 3000)), 0)
+  index = compute_peak_index(x)
+
+  for _ in range(50):
+    start = int(rng.integers(0, x.size - 10))
+    stop = int(rng.integers(start + 10, x.size + 1))
+    part = x[start:stop]
+    min_prominence = float(rng.uniform(0, 3 * np.ptp(part) / 4))
+    max_width = float(rng.choice([np.inf, rng.uniform(1, 500)]))
+    expected = _expected(part, min_prominence, max_width)
+
+    assert first_peak(part, min_prominence, max_width) == expected
+    assert first_peak(part, min_prominence, max_width, index,
+                      start) == expected
+    assert first_peak(part - 7.5, min_prominence, max_width, index,
+                      start) == expected
+
+
+def test_mismatching_index_is_ignored() -> None:
+  """A signal that is not part of the indexed one is searched directly."""
+
+  rng = np.random.default_rng(0)
+  x = np.cumsum(rng.normal(0, 1, 1000))
+  other = np.cumsum(rng.normal(0, 1, 1000))
+  index = compute_peak_index(x)
+  assert (first_peak(other, 5., np.inf, index) ==
+          _expected(other, 5., np.inf))
+  assert (first_peak(x[:500], 5., np.inf, index, start=600) ==
+          _expected(x[:500], 5., np.inf))
+
+
+def test_saved_indices_are_identical(tmp_path: Path) -> None:
+  """The peak indices of several tests are loaded back identical, including
+  the ones of the tests without any peak."""
+
+  rng = np.random.default_rng(0)
+  indices = {nr: compute_peak_index(np.cumsum(rng.normal(0, 1, size)))
+             for nr, size in ((1, 500), (3, 2000))}
+  indices[4] = compute_peak_index(np.arange(100.))
+  save_peak_indices(indices, tmp_path / 'peaks.npz')
+  loaded = load_peak_indices(tmp_path / 'peaks.npz')
+
+  assert list(loaded) == list(indices)
+  for nr, index in indices.items():
+    assert loaded[nr].length == index.length
+    for expected, actual in zip(index[1:], loaded[nr][1:]):
+      np.testing.assert_array_equal(actual, expected)
@@ -0,0 +1,54 @@
+# coding: utf-8
+
+"""Checks that the plots of the Yeoh fit are drawn with all the coefficients
+of the fitted model, one test at a time and in the batch plotting mode."""
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import run_make
+
+pytest.importorskip('matplotlib')
+
+from tensile_processing.plotting.interpolated_curve import InterpolatedFigure
+from tensile_processing.tools.fields import identifier_field, yeoh_fields, \
+  extension_field
+from tensile_processing.tools.storage import read_data
+from tensile_processing.tools.yeoh_model import yeoh
+
+
+@pytest.mark.parametrize('batch', ['false', 'true'])
+def test_interpolation_plots(raw_data: Path, tmp_path: Path,
+                             batch: str) -> None:
+  """Each test gets a plot of its fit with a 3-term Yeoh model."""
+
+  run_make(raw_data, tmp_path, 'yeoh_interpolation_plots', YEOH_ORDER='3',
+           BATCH_PLOTS=batch)
+  plots = sorted((tmp_path / 'plots').rglob('*.tiff'))
+  assert [plot.stem for plot in plots] == [f'{nr:03d}' for nr in range(1, 7)]
+  assert all(plot.stat().st_size for plot in plots)
+
+
+def test_draw_fitted_curve(raw_data: Path, tmp_path: Path) -> None:
+  """The fitted curve is the stress predicted with the coefficients of the
+  test read from the Yeoh file."""
+
+  run_make(raw_data, tmp_path, 'yeoh_interpolation', YEOH_ORDER='3')
+  table = pd.read_csv(tmp_path / 'computed_data' / 'yeoh_interpolation.csv',
+                      float_precision='round_trip')
+  row = table[table[identifier_field] == 2].iloc[0]
+  coefficients = [float(row[field]) for field in yeoh_fields
+                  if field in table.columns]
+  assert len(coefficients) == 3
+
+  data = read_data(tmp_path / 'computed_data' /
+                   'trimmed_fit_stress_strain' / '002.npz')
+  figure = InterpolatedFigure()
+  figure.draw(data, *coefficients)
+  extension, fitted = figure.lines[1].get_data()
+  np.testing.assert_array_equal(extension, data[extension_field].values)
+  np.testing.assert_allclose(fitted, yeoh(extension, *coefficients))
+  figure.save(tmp_path / 'fit.tiff')
+  assert (tmp_path / 'fit.tiff').stat().st_size
@@ -0,0 +1,63 @@
+# coding: utf-8
+
+"""Checks the records of the per-test results, used for only processing the
+new or modified tests on rerun."""
+
+from itertools import repeat
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from tensile_processing.tools.parallel import map_files
+from tensile_processing.tools.record import read_record, write_record
+from tensile_processing.tools.storage import write_data
+
+
+def test_unreadable_record_is_empty(tmp_path: Path) -> None:
+  """A record referring to modules or classes that do not exist anymore is
+  read as empty, so that all the tests are processed again."""
+
+  path = tmp_path / 'record.pkl'
+  assert read_record(path) == dict()
+  write_record(path, {'key': (1., 2.)})
+  assert read_record(path) == {'key': (1., 2.)}
+
+  for stale in (b'cno_such_module\nResult\n.',
+                b'ctensile_processing\nNoSuchResult\n.'):
+    path.write_bytes(stale)
+    assert read_record(path) == dict()
+
+
+def test_only_modified_tests_are_processed(tmp_path: Path) -> None:
+  """On rerun, only the new tests and the tests whose data or arguments
+  changed are read and processed again, and the removed tests are dropped
+  from the record."""
+
+  calls = list()
+
+  def total(data: pd.DataFrame, factor: float) -> float:
+    calls.append(int(data['value'].iloc[0]))
+    return float(data['value'].sum() * factor)
+
+  paths = [tmp_path / f'test_{nr}.csv' for nr in (1, 2, 3)]
+  for nr, path in enumerate(paths, start=1):
+    write_data(pd.DataFrame({'value': np.full(10, nr)}), path)
+  record = tmp_path / 'records' / 'total.pkl'
+
+  def run(paths: list[Path], factor: float = 1.) -> list[float]:
+    return map_files(total, paths, repeat(factor), record=record)
+
+  assert run(paths) == [10., 20., 30.]
+  assert calls == [1, 2, 3]
+  assert run(paths) == [10., 20., 30.]
+  assert calls == [1, 2, 3]
+
+  write_data(pd.DataFrame({'value': np.full(10, 4)}), paths[1])
+  new = tmp_path / 'test_5.csv'
+  write_data(pd.DataFrame({'value': np.full(10, 5)}), new)
+  assert run([*paths, new]) == [10., 40., 30., 50.]
+  assert calls == [1, 2, 3, 4, 5]
+
+  assert run(paths[:2], 2.) == [20., 80.]
+  assert calls == [1, 2, 3, 4, 5, 1, 4]
+  assert len(read_record(record)) == 2
@@ -0,0 +1,72 @@
+# coding: utf-8
+
+"""Checks that the Savitzky-Golay filters computed by FFT give the same
+output as the one of scipy."""
+
+import numpy as np
+import pytest
+from scipy import signal
+
+from tensile_processing.tools.savgol import savgol_filter, \
+  batch_savgol_filter
+from tensile_processing.tools.packing import pack_rows
+
+
+def _signal(size: int, seed: int = 0) -> np.ndarray:
+  """Returns a noisy signal made of a trend and of oscillations."""
+
+  rng = np.random.default_rng(seed)
+  time = np.linspace(0, 1, size)
+  return (50 * time ** 2 + np.sin(40 * time) +
+          rng.normal(0, .1, size))
+
+
+def _close(actual: np.ndarray, expected: np.ndarray) -> None:
+  """Checks that two filtered signals only differ by rounding errors."""
+
+  np.testing.assert_allclose(actual, expected, rtol=0,
+                             atol=1e-9 * np.abs(expected).max())
+
+
+@pytest.mark.parametrize('window_length', [65, 100, 501, 2000])
+@pytest.mark.parametrize('polyorder, deriv', [(3, 0), (3, 1), (2, 2)])
+def test_fft_matches_scipy(window_length: int,
+                           polyorder: int,
+                           deriv: int) -> None:
+  """The FFT convolution gives the output of scipy, including on the edges,
+  for odd and even windows and for the derivatives."""
+
+  x = _signal(5000)
+  expected = signal.savgol_filter(x, window_length, polyorder, deriv=deriv,
+                                  delta=.01)
+  _close(savgol_filter(x, window_length, polyorder, deriv=deriv, delta=.01,
+                       method='fft'), expected)
+  _close(savgol_filter(x, window_length, polyorder, deriv=deriv, delta=.01),
+         expected)
+
+
+def test_batch_matches_scipy() -> None:
+  """The filters applied to a batch of signals of different lengths, each with
+  its own window, give the output of scipy on each signal."""
+
+  signals = [_signal(size, seed) for seed, size in enumerate((800, 3000,
+                                                              1501))]
+  window_lengths = np.array([11, 1001, 300])
+  packed, lengths = pack_rows(signals)
+
+  for deriv in (0, 1):
+    filtered = batch_savgol_filter(packed, lengths, window_lengths, 3, deriv)
+    for row, (x, window_length) in enumerate(zip(signals, window_lengths)):
+      _close(filtered[row, :x.size],
+             signal.savgol_filter(x, window_length, 3, deriv=deriv))
+      assert np.isnan(filtered[row, x.size:]).all()
+
+
+def test_invalid_arguments() -> None:
+  """The unknown methods and the windows longer than the signal are
+  rejected."""
+
+  with pytest.raises(ValueError):
+    savgol_filter(_signal(100), 11, 3, method='unknown')
+  with pytest.raises(ValueError):
+    savgol_filter(_signal(100), 101, 3, method='fft')
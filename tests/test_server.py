@@ -0,0 +1,35 @@
+# coding: utf-8
+
+"""Checks that starting the worker server only removes the sockets of the
+servers that are no longer running."""
+
+from pathlib import Path
+import socket
+import pytest
+
+from tensile_processing.server import clear_socket
+
+
+def test_clear_socket(tmp_path: Path) -> None:
+  """The socket of a running server and the regular files are kept, and only
+  the stale sockets are removed."""
+
+  path = tmp_path / 'server.sock'
+  clear_socket(path)
+
+  path.write_text('data')
+  with pytest.raises(FileExistsError, match='not a socket'):
+    clear_socket(path)
+  assert path.read_text() == 'data'
+  path.unlink()
+
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+    server.bind(str(path))
+    server.listen()
+    with pytest.raises(FileExistsError, match='already running'):
+      clear_socket(path)
+    assert path.is_socket()
+
+  # The socket file is left behind once the server is closed
+  clear_socket(path)
+  assert not path.exists()
@@ -0,0 +1,72 @@
+# coding: utf-8
+
+"""Checks that processing the data by chunks gives the same results as
+processing it all at once."""
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from tensile_processing.processing.smooth import smooth_data, smooth_chunks
+from tensile_processing.processing.stress_strain import \
+  compute_stress_strain, stress_strain_chunks
+from tensile_processing.tools.storage import read_data
+from tensile_processing.tools.streaming import iter_chunks
+
+
+def _concat(chunks: list[pd.DataFrame]) -> pd.DataFrame:
+  """Gathers the chunks of data into a single DataFrame."""
+
+  return pd.concat(chunks, ignore_index=True)
+
+
+@pytest.fixture(scope='module')
+def test_data(raw_data: Path) -> tuple[Path, Path, pd.DataFrame]:
+  """The paths to the raw position and effort data of a synthetic test, and
+  the notes of the tests."""
+
+  folder = raw_data / 'test_data' / '002'
+  return (folder / 'position.csv', folder / 'effort.csv',
+          pd.read_csv(raw_data / 'test_data' / 'notes.csv'))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 357, 100000])
+def test_chunked_stress_strain(test_data: tuple[Path, Path, pd.DataFrame],
+                               chunk_size: int) -> None:
+  """The extension and the stress computed by chunks are bit-identical to the
+  ones computed over the entire data."""
+
+  position, effort, notes = test_data
+  expected = compute_stress_strain(read_data(position), read_data(effort),
+                                   notes, 2)
+  chunked = _concat(list(stress_strain_chunks(
+    iter_chunks(position, chunk_size), iter_chunks(effort, chunk_size),
+    notes, 2)))
+  pd.testing.assert_frame_equal(chunked, expected, check_exact=True)
+
+
+@pytest.mark.parametrize('nb_points, chunk_size', [(31, 1), (31, 357),
+                                                   (501, 357), (501, 100000)])
+def test_chunked_smooth(test_data: tuple[Path, Path, pd.DataFrame],
+                        nb_points: int,
+                        chunk_size: int) -> None:
+  """The data smoothened by chunks is identical to the data smoothened at
+  once for the short filters, computed by direct convolution. For the long
+  filters computed by FFT, the rounding errors depend on the length of the
+  convolved blocks, so both only agree to within them."""
+
+  data = read_data(test_data[1])
+  expected = smooth_data(data, nb_points)
+  chunks = (data.iloc[start:start + chunk_size]
+            for start in range(0, len(data), chunk_size))
+  chunked = _concat(list(smooth_chunks(chunks, nb_points)))
+
+  if nb_points < 64:
+    pd.testing.assert_frame_equal(chunked, expected, check_exact=True)
+  else:
+    pd.testing.assert_index_equal(chunked.columns, expected.columns)
+    np.testing.assert_array_equal(chunked.iloc[:, 0], expected.iloc[:, 0])
+    smoothed = expected.iloc[:, 1].to_numpy()
+    np.testing.assert_allclose(chunked.iloc[:, 1], smoothed, rtol=0,
+                               atol=1e-12 * np.abs(smoothed).max())
@@ -0,0 +1,33 @@
+# coding: utf-8
+
+"""Checks that the parameter sweep describes the same Yeoh model as the one
+written to the results."""
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from conftest import run_make
+
+
+def test_sweep_uses_configured_yeoh_model(raw_data: Path,
+                                          tmp_path: Path) -> None:
+  """With the default sweep, which only tries the current parameters, the
+  Yeoh coefficients of each test are the ones of the bounded 3-term fit of the
+  Makefile, and the R² is the one of that model."""
+
+  variables = dict(YEOH_ORDER='3', YEOH_POSITIVE='true')
+  run_make(raw_data, tmp_path, 'yeoh_interpolation', **variables)
+  run_make(raw_data, tmp_path, 'sweep', **variables)
+  yeoh = pd.read_csv(tmp_path / 'computed_data/yeoh_interpolation.csv',
+                     float_precision='round_trip')
+  sweep = pd.read_csv(tmp_path / 'sweep.csv',
+                      float_precision='round_trip')
+  summary = pd.read_csv(tmp_path / 'sweep_summary.csv')
+
+  fields = list(yeoh.columns)
+  assert 'Yeoh C3 (kPa)' not in sweep.columns
+  assert 'Yeoh C2 (kPa) mean' in summary.columns
+  np.testing.assert_allclose(sweep[fields].to_numpy(), yeoh.to_numpy(),
+                             rtol=1e-8, atol=1e-8)
+  assert (sweep['Yeoh R2'] > 0.9).all()
@@ -0,0 +1,54 @@
+# coding: utf-8
+
+"""Checks that the trimming index selects the same samples as the trimming
+scripts, and that it warns when the extension crosses the cutoff several
+times."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tensile_processing.processing.trim_begin import trim_begin
+from tensile_processing.processing.trim_end import trim_end
+from tensile_processing.processing.trim_index import trim_range
+from tensile_processing.tools.fields import extension_field, stress_field
+
+
+def _data(extension: np.ndarray) -> pd.DataFrame:
+  """Builds stress-strain data with the given extension."""
+
+  return pd.DataFrame({extension_field: extension,
+                       stress_field: np.linspace(0, 1, extension.size)})
+
+
+def test_monotonic_extension() -> None:
+  """With a monotonic extension, both modes keep the same samples."""
+
+  data = _data(np.linspace(1, 3, 1000))
+
+  first, last = trim_range(data, 2.5, False)
+  np.testing.assert_array_equal(data.iloc[first:last].to_numpy(),
+                                trim_end(data, 2.5).to_numpy())
+
+  first, last = trim_range(data, 1.5, True)
+  expected = data.iloc[first:last] / [data[extension_field].iloc[first], 1]
+  expected -= [0, expected[stress_field].iloc[0]]
+  np.testing.assert_array_equal(expected.to_numpy(),
+                                trim_begin(data, 1.5).to_numpy())
+
+
+def test_noisy_extension() -> None:
+  """With a noisy extension, the index keeps the samples on the wrong side of
+  the cutoff that lie within the range, and warns about them."""
+
+  rng = np.random.default_rng(0)
+  data = _data(np.linspace(1, 3, 1000) + rng.normal(0, 0.05, 1000))
+
+  with pytest.warns(UserWarning, match='crosses the cutoff'):
+    first, last = trim_range(data, 2.5, False)
+
+  kept = data.iloc[first:last]
+  above = kept[extension_field] > 2.5
+  assert above.any()
+  np.testing.assert_array_equal(kept[~above].to_numpy(),
+                                trim_end(data, 2.5).to_numpy())
@@ -0,0 +1,65 @@
+# coding: utf-8
+
+"""Checks the fit of the Yeoh model to several tests from the normal
+equations of each test."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tensile_processing.processing.yeoh import yeoh_normal, fit_yeoh_tests
+from tensile_processing.tools.fields import identifier_field, \
+  condition_field, extension_field, stress_field
+from tensile_processing.tools.yeoh_model import yeoh, fit_yeoh_n, \
+  positive_bounds
+
+
+def _tests(nb_tests: int, order: int) -> list[pd.DataFrame]:
+  """Generates noisy stress-strain curves of various lengths following a Yeoh
+  model."""
+
+  rng = np.random.default_rng(0)
+  tests = list()
+  for nb in range(nb_tests):
+    extension = np.linspace(1, 1.5 + .1 * nb, 20000 + 5000 * nb)
+    stress = (yeoh(extension, *(10., -2., 1., .5)[:order]) +
+              rng.normal(0, .2, extension.size))
+    tests.append(pd.DataFrame({extension_field: extension,
+                               stress_field: stress}))
+  return tests
+
+
+@pytest.mark.parametrize('order, positive', [(2, False), (3, False),
+                                             (4, True)])
+def test_fit_matches_padded_fit(order: int, positive: bool) -> None:
+  """Fitting the tests from their normal equations, accumulated by chunks,
+  gives the same coefficients as fitting the padded tests at once."""
+
+  tests = _tests(4, order)
+  nrs = list(range(1, len(tests) + 1))
+  notes = pd.DataFrame({identifier_field: nrs,
+                        condition_field: ['a', 'a', 'b', 'b']})
+  bounds = positive_bounds(order) if positive else None
+
+  fits = fit_yeoh_tests([yeoh_normal(test, order) for test in tests], nrs,
+                        notes, bounds, order)
+  expected = fit_yeoh_n([test[extension_field].values for test in tests],
+                        [test[stress_field].values for test in tests], order,
+                        bounds, groups=notes[condition_field])
+  np.testing.assert_allclose(fits, expected, rtol=1e-8, atol=1e-10)
+
+
+def test_underdetermined_test_only_fails_alone() -> None:
+  """A test with too few points gets NaN coefficients and a warning, without
+  preventing the other tests from being fitted."""
+
+  tests = _tests(3, 2)
+  tests[1] = tests[1].iloc[:1]
+  nrs = [1, 2, 3]
+  notes = pd.DataFrame({identifier_field: nrs})
+
+  with pytest.warns(UserWarning, match='tests 2'):
+    fits = fit_yeoh_tests([yeoh_normal(test) for test in tests], nrs, notes,
+                          positive_bounds(2))
+  assert np.isnan(fits[1]).all()
+  assert np.isfinite(fits[[0, 2]]).all()